@@ -0,0 +1,241 @@
+# 구조화(JSON Lines) 접근 로그 (api_server / ai_server 공용)
+#   요청당 한 줄: ts, service, method, route, status, latency_ms, user(해시), db_ms, ai_ms, tokens, trace_id, error
+#   요청 스레드는 큐에 넣기만 하고 쓰기는 QueueListener 스레드가 처리 (큐가 가득 차면 버리고 dropped 로 셈)
+#   ACCESS_LOG_FILE 이 있으면 크기 기준 회전(RotatingFileHandler), 없으면 stdout
+#     gunicorn 워커끼리 같은 파일을 회전시키지 않도록 경로에 {pid} 를 넣을 수 있음 (예: /logs/apiserver-{pid}.jsonl)
+#   프로세스의 초당 요청 수가 ACCESS_LOG_SAMPLE_ABOVE 를 넘으면 성공 요청은 ACCESS_LOG_SAMPLE_RATE 비율만 기록
+#     (4xx/5xx 와 ACCESS_LOG_SLOW_MS 이상 걸린 요청은 항상 기록. 각 줄의 sample_rate 로 원래 건수 추정)
+#   db_ms / ai_ms / tokens 는 metrics.span / record_usage 가 모은 현재 요청 값을 사용
+import atexit
+import contextvars
+import datetime
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+import metrics
+import tracing
+
+ACCESS_LOG_FILE = os.getenv("ACCESS_LOG_FILE", "")
+MAX_BYTES = int(os.getenv("ACCESS_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+BACKUP_COUNT = int(os.getenv("ACCESS_LOG_BACKUPS", "5"))
+QUEUE_SIZE = int(os.getenv("ACCESS_LOG_QUEUE_SIZE", "10000"))
+SAMPLE_ABOVE_RPS = float(os.getenv("ACCESS_LOG_SAMPLE_ABOVE", "50"))
+SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "0.1"))
+SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+# 로그에는 user_id 대신 솔트를 붙인 해시만 남김 (워커/서버 간 같은 값이 되도록 고정 솔트 사용)
+# 솔트가 없으면 정수 id 를 차례로 넣어 해시를 되돌릴 수 있으므로 user 필드를 남기지 않음
+USER_HASH_SALT = os.getenv("ACCESS_LOG_SALT") or os.getenv("SECRET_KEY", "")
+if not USER_HASH_SALT:
+    logging.getLogger(__name__).warning("ACCESS_LOG_SALT/SECRET_KEY 가 없어 접근 로그에 user 를 남기지 않습니다.")
+
+DB_SPANS = ("db",)
+AI_SPANS = ("ai_upstream", "ai_upstream_first_chunk", "openai", "openai_stream")
+
+_logger = logging.getLogger("access")
+_logger.propagate = False
+_logger.setLevel(logging.INFO)
+
+_state = contextvars.ContextVar("access_log_state", default=None)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    # 기본 QueueHandler 는 큐가 가득 차면 예외를 내므로, 요청을 막지 않도록 버림
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def _ensure_listener():
+    # fork 된 워커마다 한 번 시작 (preload 된 마스터의 스레드는 fork 되지 않음)
+    global _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        if ACCESS_LOG_FILE:
+            path = ACCESS_LOG_FILE.format(pid=os.getpid())
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            target = logging.handlers.RotatingFileHandler(
+                path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8")
+        else:
+            target = logging.StreamHandler(sys.stdout)
+        target.setFormatter(logging.Formatter("%(message)s"))
+
+        q = queue.Queue(QUEUE_SIZE)
+        for handler in list(_logger.handlers):
+            _logger.removeHandler(handler)
+        _logger.addHandler(_DroppingQueueHandler(q))
+        listener = logging.handlers.QueueListener(q, target)
+        listener.start()
+        atexit.register(listener.stop)
+        _listener_pid = os.getpid()
+
+
+class _RateMeter:
+    # 프로세스 단위 초당 요청 수 (직전 1초와 현재 1초 중 큰 값)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._second = 0
+        self._count = 0
+        self._previous = 0
+
+    def tick(self):
+        now = int(time.monotonic())
+        with self._lock:
+            if now != self._second:
+                self._previous = self._count if now == self._second + 1 else 0
+                self._second = now
+                self._count = 0
+            self._count += 1
+            return max(self._previous, self._count)
+
+
+_meter = _RateMeter()
+
+
+# -----------------------------------------------------------
+# 요청 중 기록 (핸들러에서 호출)
+# -----------------------------------------------------------
+def start_request():
+    return _state.set({"user": None, "error": None, "tokens": {}})
+
+
+def reset_request(token):
+    _state.reset(token)
+
+
+def set_user(user_id):
+    state = _state.get()
+    if state is not None and user_id is not None:
+        state["user"] = user_id
+
+
+def note_error(message):
+    state = _state.get()
+    if state is not None:
+        state["error"] = str(message)[:500]
+
+
+def add_tokens(usage):
+    # 다른 서버가 돌려준 usage ({"prompt": n, "completion": n}) 를 이 요청 로그에 합침
+    state = _state.get()
+    if state is None or not usage:
+        return
+    for kind in ("prompt", "completion"):
+        n = usage.get(kind) or 0
+        if n:
+            state["tokens"][kind] = state["tokens"].get(kind, 0) + n
+
+
+def hash_user(user_id):
+    if not USER_HASH_SALT:
+        return None
+    return hashlib.sha256(f"{USER_HASH_SALT}:{user_id}".encode("utf-8")).hexdigest()[:16]
+
+
+def _ms(spans, names):
+    total = sum(spans.get(name, 0.0) for name in names)
+    return round(total * 1000, 2) if total else None
+
+
+def log_request(service, method, route, status, elapsed):
+    rps = _meter.tick()
+    latency_ms = elapsed * 1000
+    sample_rate = 1.0
+    if status < 400 and latency_ms < SLOW_MS and rps > SAMPLE_ABOVE_RPS:
+        sample_rate = SAMPLE_RATE
+        if random.random() >= sample_rate:
+            return
+
+    state = _state.get() or {"user": None, "error": None, "tokens": {}}
+    timings = metrics.request_timings() or {"spans": {}, "tokens": {}}
+    tokens = dict(timings["tokens"])
+    for kind, n in state["tokens"].items():
+        tokens[kind] = tokens.get(kind, 0) + n
+    trace = tracing.current()
+
+    record = {
+        "ts": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds"),
+        "service": service,
+        "method": method,
+        "route": route,
+        "status": status,
+        "latency_ms": round(latency_ms, 2),
+        "user": hash_user(state["user"]) if state["user"] is not None else None,
+        "db_ms": _ms(timings["spans"], DB_SPANS),
+        "ai_ms": _ms(timings["spans"], AI_SPANS),
+        "tokens": tokens or None,
+        "trace_id": trace.trace_id if trace is not None else None,
+        "sample_rate": sample_rate,
+        "error": state["error"],
+    }
+    _ensure_listener()
+    _logger.info(json.dumps(record, ensure_ascii=False))
+
+
+# -----------------------------------------------------------
+# 프레임워크 연동
+# -----------------------------------------------------------
+def init_flask(app, service):
+    from flask import g, request
+
+    @app.before_request
+    def _access_start():
+        g._access_start = time.perf_counter()
+        g._access_token = start_request()
+
+    @app.after_request
+    def _access_log(response):
+        start = g.pop("_access_start", None)
+        if start is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        log_request(service, request.method, route, response.status_code, time.perf_counter() - start)
+        return response
+
+    @app.teardown_request
+    def _access_teardown(exc):
+        token = g.pop("_access_token", None)
+        if token is not None:
+            reset_request(token)
+
+
+def init_fastapi(app, service):
+    # metrics / tracing 미들웨어보다 먼저(= 안쪽에) 등록해야 그 요청 값(db_ms, trace_id 등)을 읽을 수 있음
+    @app.middleware("http")
+    async def _access_middleware(request, call_next):
+        token = start_request()
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        except Exception as e:
+            note_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            route = request.scope.get("route")
+            log_request(service, request.method, getattr(route, "path", "unmatched"), status,
+                        time.perf_counter() - start)
+            reset_request(token)
@@ -0,0 +1,145 @@
+import math
+import os
+from collections import OrderedDict
+from decimal import Decimal
+
+# 프롬프트에 넣을 계좌 정보의 최대 토큰 수
+ACCOUNT_CONTEXT_TOKENS = int(os.getenv("ACCOUNT_CONTEXT_TOKENS", "1200"))
+NOTE_MAX_CHARS = 30
+MATURITY_LINES = 5
+
+_encoding = None
+_encoding_loaded = False
+
+
+# -----------------------------------------------------------
+# 토큰 수 계산 (tiktoken 이 없거나 인코딩을 못 받으면 근사치)
+# -----------------------------------------------------------
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # 한글은 대략 글자당 1토큰, 영문/숫자는 4글자당 1토큰
+    hangul = sum(1 for ch in text if "가" <= ch <= "힣")
+    return hangul + math.ceil((len(text) - hangul) / 4)
+
+
+def fit_to_budget(text: str, budget: int = ACCOUNT_CONTEXT_TOKENS) -> str:
+    # 줄 단위로 잘라 budget 토큰 안에 들어오게 함
+    if count_tokens(text) <= budget:
+        return text
+    kept, used = [], 0
+    lines = text.splitlines()
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    omitted = len(lines) - len(kept)
+    if omitted:
+        kept.append(f"...(이하 {omitted}줄 생략)")
+    return "\n".join(kept)
+
+
+# -----------------------------------------------------------
+# 계좌 목록 → 압축된 표 형식 문자열
+# -----------------------------------------------------------
+def _num(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, (Decimal, float)) and value == int(value):
+        return str(int(value))
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f")
+    return str(value)
+
+
+def _aggregate(accounts, field):
+    groups = OrderedDict()
+    for acc in accounts:
+        name = acc.get(field) or "기타"
+        count, total = groups.get(name, (0, Decimal(0)))
+        groups[name] = (count + 1, total + Decimal(str(acc.get("balance") or 0)))
+    return " | ".join(f"{name} {count}개 {_num(total)}원" for name, (count, total) in groups.items())
+
+
+def _row(acc) -> str:
+    note = (acc.get("note") or "").replace("\n", " ").replace("|", "/")
+    if len(note) > NOTE_MAX_CHARS:
+        note = note[:NOTE_MAX_CHARS] + "…"
+    return "|".join([
+        acc.get("bank_name") or "-",
+        acc.get("account_type") or "-",
+        acc.get("product_name") or "-",
+        _num(acc.get("balance")),
+        _num(acc.get("interest_rate")),
+        str(acc.get("maturity_date") or "-"),
+        "Y" if acc.get("auto_transfer") else "N",
+        note or "-",
+    ])
+
+
+def _projection_lines(projection):
+    totals = projection["totals"]
+    months = len(projection["months"])
+    lines = [
+        f"[전망] 향후 {months}개월 예상 이자 {_num(totals['interest'])}원(세후 {_num(totals['interest_after_tax'])}원), "
+        f"적금 납입 {_num(totals['deposits'])}원, 만기 지급 {_num(totals['maturity_payout'])}원"
+    ]
+    maturities = projection["maturities"]
+    if maturities:
+        items = " | ".join(
+            f"{m['maturity_date']} {m['bank_name'] or '-'} {m['product_name'] or m['account_type'] or '-'} "
+            f"{_num(m['payout'])}원(세후 {_num(m['payout_after_tax'])}원)"
+            for m in maturities[:MATURITY_LINES]
+        )
+        more = f" 외 {len(maturities) - MATURITY_LINES}건" if len(maturities) > MATURITY_LINES else ""
+        lines.append(f"[만기예정] {items}{more}")
+    return lines
+
+
+def encode_accounts(accounts, budget: int = ACCOUNT_CONTEXT_TOKENS, summary=None, projection=None) -> str:
+    # 합계/유형별/은행별 집계는 항상 포함하고, 계좌 행은 잔액이 큰 순서로 budget 까지 채움
+    # summary: portfolio.get_summary 결과 (있으면 가중평균 금리/다음 만기일/자동이체 수 추가)
+    # projection: projection.project 결과 (있으면 예상 이자/만기 지급액 추가)
+    total = sum(Decimal(str(acc.get("balance") or 0)) for acc in accounts)
+    header = [
+        f"[합계] 계좌 {len(accounts)}개, 총잔액 {_num(total)}원",
+        f"[유형별] {_aggregate(accounts, 'account_type')}",
+        f"[은행별] {_aggregate(accounts, 'bank_name')}",
+    ]
+    if summary:
+        header.append(
+            f"[요약] 잔액가중 평균금리 {_num(summary['weighted_avg_interest_rate'])}%, "
+            f"다음 만기일 {summary['next_maturity_date'] or '-'}, "
+            f"자동이체 {summary['auto_transfer_count']}건"
+        )
+    if projection:
+        header.extend(_projection_lines(projection))
+    header.append("[계좌] 은행|유형|상품|잔액(원)|금리(%)|만기일|자동이체|메모")
+    lines = list(header)
+    used = sum(count_tokens(line) + 1 for line in lines)
+
+    rows = sorted(accounts, key=lambda acc: Decimal(str(acc.get("balance") or 0)), reverse=True)
+    for i, acc in enumerate(rows):
+        line = _row(acc)
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            lines.append(f"...(잔액이 작은 계좌 {len(rows) - i}개 생략)")
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines)
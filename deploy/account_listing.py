@@ -0,0 +1,178 @@
+# 계좌 목록 조회 (/api/accounts)
+#   fields 로 컬럼 선택, account_type/bank_name 필터, 정렬, id 기반 keyset 페이지네이션
+#   정렬 컬럼마다 (user_id, <컬럼>) 인덱스가 있고 InnoDB 보조 인덱스에는 PK(id)가 붙어 있어
+#   ORDER BY <컬럼>, id 가 인덱스 순서대로 읽힘 (db/init/init.sql 참고)
+#   sort=id 는 전용 인덱스 없이 그 사용자의 행만 읽어 정렬 (사용자당 계좌 수만큼의 filesort)
+import base64
+import datetime
+import hashlib
+import json
+from decimal import Decimal
+
+ALL_FIELDS = (
+    "id", "account_number", "bank_name", "product_name", "account_type", "balance",
+    "interest_rate", "maturity_date", "is_fixed_term", "monthly_limit", "auto_transfer",
+    "note", "created_at",
+)
+# fields 를 지정하지 않았을 때 (기존 응답과 동일한 컬럼)
+DEFAULT_FIELDS = (
+    "account_number", "bank_name", "product_name", "account_type", "balance",
+    "interest_rate", "maturity_date", "monthly_limit", "auto_transfer", "note",
+)
+SORT_FIELDS = ("id", "balance", "interest_rate", "maturity_date")
+NULLABLE_SORT_FIELDS = ("maturity_date",)
+MAX_LIMIT = 500
+
+
+class ListingError(ValueError):
+    pass
+
+
+class ListingQuery:
+    def __init__(self, fields, account_types, bank_names, sort, descending, limit, cursor):
+        self.fields = fields
+        self.account_types = account_types
+        self.bank_names = bank_names
+        self.sort = sort
+        self.descending = descending
+        self.limit = limit
+        self.cursor = cursor
+
+    def variant(self):
+        # 계좌 목록 캐시 키에 들어갈 조회 조건 식별자
+        if self.limit is None and self.fields == DEFAULT_FIELDS and not (self.account_types or self.bank_names) \
+                and self.sort == "id" and not self.descending:
+            return "all"
+        raw = json.dumps([self.fields, self.account_types, self.bank_names, self.sort,
+                          self.descending, self.limit, self.cursor], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+# -----------------------------------------------------------
+# 요청 파라미터 파싱
+# -----------------------------------------------------------
+def _str_list(value, name):
+    if value in (None, "", []):
+        return []
+    if isinstance(value, str):
+        value = [v.strip() for v in value.split(",") if v.strip()]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ListingError(f"{name} 형식 오류")
+    return sorted(set(value))
+
+
+def _encode_cursor(sort, value, row_id):
+    if isinstance(value, (Decimal, datetime.date)):
+        value = str(value)
+    raw = json.dumps([sort, value, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor, sort):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, row_id = json.loads(raw)
+        row_id = int(row_id)
+    except Exception:
+        raise ListingError("잘못된 cursor 입니다.")
+    if cursor_sort != sort:
+        raise ListingError("cursor 와 sort 가 일치하지 않습니다.")
+    return value, row_id
+
+
+def parse_query(data):
+    fields = _str_list(data.get("fields"), "fields")
+    unknown = [f for f in fields if f not in ALL_FIELDS]
+    if unknown:
+        raise ListingError(f"알 수 없는 필드: {', '.join(unknown)}")
+    fields = tuple(f for f in ALL_FIELDS if f in fields) if fields else DEFAULT_FIELDS
+
+    sort = data.get("sort") or "id"
+    if not isinstance(sort, str):
+        raise ListingError("sort 형식 오류")
+    descending = sort.startswith("-")
+    sort = sort.lstrip("-")
+    if sort not in SORT_FIELDS:
+        raise ListingError(f"sort 는 {', '.join(SORT_FIELDS)} 중 하나여야 합니다.")
+
+    limit = data.get("limit")
+    cursor = data.get("cursor") or None
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            raise ListingError("limit 형식 오류")
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ListingError(f"limit 는 1~{MAX_LIMIT} 사이여야 합니다.")
+    elif cursor:
+        raise ListingError("cursor 는 limit 와 함께 사용해야 합니다.")
+    if cursor:
+        _decode_cursor(cursor, sort)
+
+    return ListingQuery(
+        fields,
+        _str_list(data.get("account_type"), "account_type"),
+        _str_list(data.get("bank_name"), "bank_name"),
+        sort, descending, limit, cursor,
+    )
+
+
+# -----------------------------------------------------------
+# SQL 생성 / 실행
+# -----------------------------------------------------------
+def _keyset_condition(q):
+    # (sort 값, id) 가 cursor 보다 뒤인 행. MySQL 은 NULL 을 가장 작은 값으로 정렬
+    value, row_id = _decode_cursor(q.cursor, q.sort)
+    col = q.sort
+    cmp = "<" if q.descending else ">"
+    if col == "id":
+        return f"id {cmp} %s", [row_id]
+    if col in NULLABLE_SORT_FIELDS:
+        if value is None:
+            if q.descending:
+                return f"({col} IS NULL AND id < %s)", [row_id]
+            return f"(({col} IS NULL AND id > %s) OR {col} IS NOT NULL)", [row_id]
+        if q.descending:
+            return f"({col} < %s OR ({col} = %s AND id < %s) OR {col} IS NULL)", [value, value, row_id]
+    return f"({col} {cmp} %s OR ({col} = %s AND id {cmp} %s))", [value, value, row_id]
+
+
+def build_sql(user_id, q):
+    select = list(q.fields)
+    for extra in (q.sort, "id"):
+        if q.limit is not None and extra not in select:
+            select.append(extra)
+    where, params = ["user_id = %s"], [user_id]
+    for col, values in (("account_type", q.account_types), ("bank_name", q.bank_names)):
+        if values:
+            where.append(f"{col} IN ({', '.join(['%s'] * len(values))})")
+            params.extend(values)
+    if q.cursor:
+        cond, cond_params = _keyset_condition(q)
+        where.append(cond)
+        params.extend(cond_params)
+    direction = "DESC" if q.descending else "ASC"
+    order = f"id {direction}" if q.sort == "id" else f"{q.sort} {direction}, id {direction}"
+    sql = f"SELECT {', '.join(select)} FROM account WHERE {' AND '.join(where)} ORDER BY {order}"
+    if q.limit is not None:
+        # 한 건 더 읽어 다음 페이지 존재 여부 판단
+        sql += " LIMIT %s"
+        params.append(q.limit + 1)
+    return sql, params
+
+
+def fetch_accounts(cursor, user_id, q):
+    sql, params = build_sql(user_id, q)
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    next_cursor = None
+    if q.limit is not None and len(rows) > q.limit:
+        rows = rows[:q.limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(q.sort, last[q.sort], last["id"])
+    if q.limit is not None:
+        rows = [{f: row[f] for f in q.fields} for row in rows]
+    result = {"accounts": rows}
+    if q.limit is not None:
+        result["next_cursor"] = next_cursor
+    return result
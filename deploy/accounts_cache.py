@@ -0,0 +1,168 @@
+import fcntl
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+
+# -----------------------------------------------------------
+# Redis 명령(get/set/incr/delete) 일부를 흉내 낸 프로세스 내 캐시
+#   REDIS_URL 이 없을 때 대신 사용. TTL + 크기 제한 LRU
+# -----------------------------------------------------------
+class LocalCache:
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data = OrderedDict()   # key -> (value, expires_at or None)
+        self.evictions = 0
+
+    def _alive(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return item
+
+    def get(self, key):
+        with self._lock:
+            item = self._alive(key)
+            return item[0] if item else None
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def incr(self, key):
+        with self._lock:
+            item = self._alive(key)
+            value = int(item[0]) + 1 if item else 1
+            self._data[key] = (value, item[1] if item else None)
+            return value
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def dbsize(self):
+        with self._lock:
+            return len(self._data)
+
+
+# -----------------------------------------------------------
+# 같은 호스트의 gunicorn 워커끼리 공유하는 버전 카운터 (mmap 파일)
+#   user_id 를 슬롯에 해싱하므로 충돌 시 불필요한 무효화가 생길 뿐 오래된 값은 보이지 않음
+# -----------------------------------------------------------
+class SharedVersions:
+    SLOTS = 65536
+    _FMT = "<Q"
+
+    def __init__(self, path=None):
+        if path is None:
+            base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            path = os.path.join(base, "account_system_cache_versions")
+        size = self.SLOTS * 8
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    def _offset(self, name):
+        return (zlib.crc32(str(name).encode("utf-8")) % self.SLOTS) * 8
+
+    def get(self, name):
+        return struct.unpack_from(self._FMT, self._map, self._offset(name))[0]
+
+    def incr(self, name):
+        offset = self._offset(name)
+        # 워커 간 증가가 유실되지 않도록 파일 잠금
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 8, offset)
+        try:
+            value = struct.unpack_from(self._FMT, self._map, offset)[0] + 1
+            struct.pack_into(self._FMT, self._map, offset, value)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 8, offset)
+        return value
+
+
+class RedisVersions:
+    def __init__(self, client):
+        self._client = client
+
+    def get(self, name):
+        return int(self._client.get(f"accounts:ver:{name}") or 0)
+
+    def incr(self, name):
+        return self._client.incr(f"accounts:ver:{name}")
+
+
+# -----------------------------------------------------------
+# 사용자별 계좌 목록 read-through 캐시
+#   키: accounts:<user_id>:v<version>:<variant>, 계좌가 바뀌면 version 증가
+# -----------------------------------------------------------
+class AccountsCache:
+    def __init__(self, store, versions, ttl=300):
+        self.store = store
+        self.versions = versions
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def _key(self, user_id, variant):
+        return f"accounts:{user_id}:v{self.versions.get(user_id)}:{variant}"
+
+    def get_or_load(self, user_id, loader, variant="all"):
+        # loader() 는 캐시에 넣을 직렬화된 응답 본문(str)을 반환
+        key = self._key(user_id, variant)
+        cached = self.store.get(key)
+        if cached is not None:
+            with self._lock:
+                self._stats["hits"] += 1
+            return cached.decode("utf-8") if isinstance(cached, bytes) else cached
+        with self._lock:
+            self._stats["misses"] += 1
+        body = loader()
+        self.store.set(key, body, ex=self.ttl)
+        return body
+
+    def invalidate(self, user_id):
+        self.versions.incr(user_id)
+        with self._lock:
+            self._stats["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+        lookups = s["hits"] + s["misses"]
+        s["hit_rate"] = round(s["hits"] / lookups, 4) if lookups else 0.0
+        if isinstance(self.store, LocalCache):
+            s.update(backend="local", size=self.store.dbsize(), evictions=self.store.evictions)
+        else:
+            s["backend"] = "redis"
+        return s
+
+
+def create_accounts_cache():
+    ttl = int(os.getenv("ACCOUNTS_CACHE_TTL", "300"))
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        import redis
+
+        client = redis.Redis.from_url(redis_url)
+        return AccountsCache(client, RedisVersions(client), ttl)
+    return AccountsCache(
+        LocalCache(maxsize=int(os.getenv("ACCOUNTS_CACHE_SIZE", "10000"))),
+        SharedVersions(os.getenv("ACCOUNTS_CACHE_VERSION_FILE")),
+        ttl,
+    )
@@ -0,0 +1,225 @@
+import json
+import threading
+import time
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+import service_auth
+import tracing
+
+CHUNK_SIZE = 64 * 1024
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class AIBusyError(Exception):
+    pass
+
+
+# -----------------------------------------------------------
+# 서킷 브레이커 (closed → open → half-open)
+# -----------------------------------------------------------
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        # 이번 호출이 half-open 시험 요청이면 True (결과를 보고하지 못하면 release_probe 로 반납)
+        with self._lock:
+            state = self._state_locked()
+            if state == "open":
+                raise CircuitOpenError("AI 서버가 불안정하여 요청을 잠시 차단했습니다.")
+            if state == "half_open":
+                # half-open 상태에서는 시험 요청 1개만 통과
+                if self._probing:
+                    raise CircuitOpenError("AI 서버 상태 확인 중입니다.")
+                self._probing = True
+                return True
+            return False
+
+    def on_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def on_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release_probe(self):
+        # 결과를 판단하지 않고 끝난 요청(예: 4xx)은 시험 슬롯만 반납
+        with self._lock:
+            self._probing = False
+
+
+# -----------------------------------------------------------
+# API → AI 서버 클라이언트
+# -----------------------------------------------------------
+def _read_until(resp, deadline):
+    # requests 의 읽기 timeout 은 소켓 read 한 번마다 적용되므로, 조금씩 흘려보내는 업스트림도
+    # 끊을 수 있게 도착한 만큼씩(read1) 읽으면서 전체 기한(monotonic)을 확인
+    # (기한은 읽기 사이에서 확인하므로 최대 소켓 읽기 timeout 한 번만큼 넘을 수 있음)
+    # HTTPResponse.read1 은 urllib3 2.1 부터 있음 (requirements_api.txt 에서 고정)
+    while True:
+        if time.monotonic() > deadline:
+            raise requests.exceptions.ReadTimeout("AI 서버 응답이 전체 기한을 넘었습니다.")
+        try:
+            chunk = resp.raw.read1(CHUNK_SIZE, decode_content=True)
+        except urllib3.exceptions.ReadTimeoutError as e:
+            raise requests.exceptions.ReadTimeout(e)
+        except urllib3.exceptions.ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _encode(payload):
+    # 서명한 바이트를 그대로 보내야 하므로 JSON 직렬화를 직접 함
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+class AIClient:
+    # timeout        : 일반 호출의 전체 응답 기한(초)이자 소켓 읽기 한 번의 최대 대기 시간
+    # stream_timeout : 스트리밍 호출의 전체 기한(초). 청크 사이 대기는 timeout 으로 제한
+    def __init__(self, base_url, timeout=60, connect_timeout=3,
+                 max_concurrency=16, acquire_timeout=2,
+                 failure_threshold=5, reset_timeout=30, stream_timeout=300):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.stream_timeout = stream_timeout
+        self.connect_timeout = connect_timeout
+        self.acquire_timeout = acquire_timeout
+        self.max_concurrency = max_concurrency
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+        # keep-alive 세션 (requests.Session 은 스레드 간 공유 시 어댑터 풀을 통해 연결 재사용)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, path, payload, timeout=None):
+        return self._request("POST", path, body=_encode(payload), timeout=timeout)
+
+    def get(self, path, timeout=None):
+        return self._request("GET", path, timeout=timeout)
+
+    def _headers(self, method, path, body=b""):
+        # 분산 추적 헤더 + AI 서버가 검증하는 서비스 서명 헤더
+        headers = {"Content-Type": "application/json"} if body else {}
+        return service_auth.sign(method, path, body, tracing.inject(headers))
+
+    def _request(self, method, path, body=b"", timeout=None):
+        # timeout: 이번 호출의 전체 응답 기한(초, 연결 제외). 없으면 기본값 사용
+        timeout = timeout or self.timeout
+        probe = self.breaker.before_call()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            if probe:
+                self.breaker.release_probe()
+            raise AIBusyError("AI 요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            deadline = time.monotonic() + timeout
+            resp = self.session.request(
+                method,
+                f"{self.base_url}{path}",
+                data=body or None,
+                timeout=(self.connect_timeout, timeout),
+                headers=self._headers(method, path, body),
+                stream=True,
+            )
+            with resp:
+                # 본문을 기한 안에 모두 읽어 두고 반환 (resp.json() / resp.text 는 그대로 사용)
+                resp._content = b"".join(_read_until(resp, deadline))
+            if resp.status_code >= 500:
+                self.breaker.on_failure()
+            else:
+                self.breaker.on_success()
+            resp.raise_for_status()
+            return resp
+        except requests.HTTPError:
+            raise
+        except requests.RequestException:
+            # 타임아웃/연결 실패는 업스트림 장애로 간주
+            self.breaker.on_failure()
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def stream(self, path, payload, timeout=None):
+        # 응답 본문을 도착하는 대로 내보내는 제너레이터. 스트림이 끝날 때까지 슬롯을 점유함
+        # (timeout 은 청크 사이 최대 대기 시간, 전체 기한은 stream_timeout)
+        probe = self.breaker.before_call()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            if probe:
+                self.breaker.release_probe()
+            raise AIBusyError("AI 요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.")
+        with self._lock:
+            self._in_flight += 1
+        try:
+            deadline = time.monotonic() + self.stream_timeout
+            body = _encode(payload)
+            try:
+                resp = self.session.post(
+                    f"{self.base_url}{path}",
+                    data=body,
+                    timeout=(self.connect_timeout, timeout or self.timeout),
+                    headers=self._headers("POST", path, body),
+                    stream=True,
+                )
+            except requests.RequestException:
+                self.breaker.on_failure()
+                raise
+            with resp:
+                if resp.status_code >= 500:
+                    self.breaker.on_failure()
+                else:
+                    self.breaker.on_success()
+                resp.raise_for_status()
+                yield from _read_until(resp, deadline)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "circuit": self.breaker.state,
+            "in_flight": in_flight,
+            "max_concurrency": self.max_concurrency,
+        }
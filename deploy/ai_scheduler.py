@@ -0,0 +1,163 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+import openai
+
+
+class SchedulerBusy(Exception):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+# -----------------------------------------------------------
+# OpenAI 호출 스케줄러
+#   - 동시 호출 수 제한
+#   - 사용자별 대기열을 라운드로빈으로 처리 (한 사용자가 슬롯을 독점하지 않도록)
+#   - 요청 기한(deadline) 초과 시 대기/호출 중단
+#   - 429 응답 시 Retry-After/지수 백오프 후 재시도, 그동안 새 호출 배정을 멈춤
+# -----------------------------------------------------------
+class RequestScheduler:
+    def __init__(self, max_concurrency=8, max_queue=256, max_retries=3,
+                 base_backoff=1.0, max_backoff=20.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self._queues = OrderedDict()   # user_key -> deque[Future]
+        self._waiting = 0
+        self._active = 0
+        self._paused_until = 0.0
+        self._resume_handle = None
+        self._stats = {"completed": 0, "rejected": 0, "deadline_exceeded": 0, "rate_limited": 0, "retries": 0}
+
+    # ---------------- 슬롯 배정 ----------------
+    def _dispatch(self):
+        now = time.monotonic()
+        if now < self._paused_until:
+            if self._resume_handle is None:
+                loop = asyncio.get_running_loop()
+                self._resume_handle = loop.call_later(self._paused_until - now, self._resume)
+            return
+        while self._active < self.max_concurrency and self._queues:
+            user_key, queue = next(iter(self._queues.items()))
+            ticket = queue.popleft()
+            # 이 사용자는 대기열 맨 뒤로 (라운드로빈)
+            if queue:
+                self._queues.move_to_end(user_key)
+            else:
+                del self._queues[user_key]
+            self._waiting -= 1
+            if ticket.done():
+                continue
+            self._active += 1
+            ticket.set_result(None)
+
+    def _resume(self):
+        self._resume_handle = None
+        self._dispatch()
+
+    def _remove(self, user_key, ticket):
+        queue = self._queues.get(user_key)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            self._waiting -= 1
+            if not queue:
+                del self._queues[user_key]
+
+    @asynccontextmanager
+    async def slot(self, user_key, deadline):
+        # deadline: time.monotonic() 기준 절대 시각
+        if self._waiting >= self.max_queue:
+            self._stats["rejected"] += 1
+            raise SchedulerBusy("AI 요청 대기열이 가득 찼습니다.")
+
+        ticket = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(user_key, deque()).append(ticket)
+        self._waiting += 1
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(ticket), timeout=max(0.0, deadline - time.monotonic()))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if ticket.done() and not ticket.cancelled():
+                # 타임아웃과 동시에 슬롯이 배정된 경우 반납
+                self._release()
+            else:
+                ticket.cancel()
+                self._remove(user_key, ticket)
+            if isinstance(e, asyncio.TimeoutError):
+                self._stats["deadline_exceeded"] += 1
+                raise DeadlineExceeded("AI 요청 대기 시간이 기한을 넘었습니다.") from None
+            raise
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self):
+        self._active -= 1
+        self._dispatch()
+
+    def _pause(self, seconds):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _backoff(self, attempt, error):
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = None
+        if retry_after is None:
+            retry_after = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+        return retry_after * (1 + random.random() * 0.25)
+
+    # ---------------- 공개 API ----------------
+    async def call(self, user_key, make_call, timeout):
+        # make_call: 인자 없는 코루틴 함수. 429 면 백오프 후 재시도
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            async with self.slot(user_key, deadline):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["deadline_exceeded"] += 1
+                    raise DeadlineExceeded("AI 요청 기한을 넘었습니다.")
+                try:
+                    result = await asyncio.wait_for(make_call(), timeout=remaining)
+                    self._stats["completed"] += 1
+                    return result
+                except asyncio.TimeoutError:
+                    self._stats["deadline_exceeded"] += 1
+                    raise DeadlineExceeded("AI 응답이 기한 내에 도착하지 않았습니다.") from None
+                except openai.RateLimitError as e:
+                    self._stats["rate_limited"] += 1
+                    if attempt >= self.max_retries:
+                        raise
+                    wait = self._backoff(attempt, e)
+                    if time.monotonic() + wait >= deadline:
+                        raise
+                    # 다른 요청도 같은 한도에 걸리므로 전체 배정을 잠시 멈춤
+                    self._pause(wait)
+            attempt += 1
+            self._stats["retries"] += 1
+
+    def stats(self):
+        s = dict(self._stats)
+        s.update(
+            active=self._active,
+            waiting=self._waiting,
+            waiting_users=len(self._queues),
+            max_concurrency=self.max_concurrency,
+            paused_for=max(0.0, round(self._paused_until - time.monotonic(), 2)),
+        )
+        return s
@@ -1,37 +1,412 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from openai import OpenAI
+from openai import AsyncOpenAI, RateLimitError
 from dotenv import load_dotenv
+import hashlib
+import json
 import os
+import asyncio
+import time
+from typing import Optional
+
+from ai_scheduler import RequestScheduler, SchedulerBusy, DeadlineExceeded
+from response_cache import ResponseCache, make_key
+from semantic_cache import SemanticCache
+from account_context import fit_to_budget
+from conversation_store import ConversationStore
+import access_log
+import metrics
+import service_auth
+import tracing
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
 app = FastAPI()
+# 접근 로그는 metrics/tracing 값을 읽으므로 먼저(안쪽 미들웨어로) 등록
+access_log.init_fastapi(app, "ai_server")
+metrics.init_fastapi(app, "ai_server")
+tracing.init_fastapi(app, "ai_server")
+
+# 동시 호출 수/대기열/기한은 업스트림 한도에 맞춰 조정
+AI_DEADLINE = float(os.getenv("AI_DEADLINE", "55"))
+scheduler = RequestScheduler(
+    max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("OPENAI_MAX_QUEUE", "256")),
+    max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "3")),
+)
+
+MODEL = "gpt-4"
+# 프롬프트(build_messages)를 바꾸면 올려서 이전 캐시를 무효화
+PROMPT_VERSION = "4"
+response_cache = ResponseCache(
+    maxsize=int(os.getenv("AI_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("AI_CACHE_TTL", "600")),
+)
+semantic_cache = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9")),
+    ttl=float(os.getenv("AI_CACHE_TTL", "600")),
+)
+# 유사 질문 재사용은 오적중 위험이 있어 기본은 꺼 둠 (semantic_cache.py 참고)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "0") == "1"
+
+# 대화 기록: 최근 CONVERSATION_MAX_TURNS 개 메시지는 원문, 그 이전은 요약으로 유지
+conversations = ConversationStore(
+    path=os.getenv("CONVERSATION_DB", "conversations.db"),
+    max_turns=int(os.getenv("CONVERSATION_MAX_TURNS", "6")),
+)
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
+SUMMARY_TOKENS = int(os.getenv("SUMMARY_TOKENS", "300"))
+_summarizing = set()
 
 class AIPayload(BaseModel):
     message: str
     account_info: str
+    user_id: Optional[str] = None
+    session_id: Optional[str] = None
+
+
+class ConversationPayload(BaseModel):
+    user_id: str
+    session_id: str
+
+
+class InvalidatePayload(BaseModel):
+    user_id: str
+
+
+class FalseHitPayload(BaseModel):
+    user_id: str
+    account_info: str
+    message: str
+
+
+def cache_key(payload: AIPayload) -> str:
+    return make_key(payload.message, payload.account_info, MODEL, PROMPT_VERSION)
+
+
+def semantic_scope(user_id: str, account_info: str) -> str:
+    # 같은 사용자 + 같은 계좌 스냅샷 안에서만 비슷한 질문을 재사용
+    snapshot = hashlib.sha256(f"{account_info}\0{MODEL}\0{PROMPT_VERSION}".encode("utf-8")).hexdigest()[:16]
+    return f"{user_id}|{snapshot}"
 
-@app.post("/ai")
-def get_ai_response(payload: AIPayload):
+
+def cached_answer(payload: AIPayload, key: str):
+    answer = response_cache.get(key)
+    if answer is not None:
+        return answer, "exact"
+    if SEMANTIC_CACHE_ENABLED and payload.user_id:
+        hit = semantic_cache.lookup(semantic_scope(payload.user_id, payload.account_info), payload.message)
+        if hit is not None:
+            return hit[0], "semantic"
+    return None, None
+
+
+def store_answer(payload: AIPayload, key: str, answer: str):
+    response_cache.set(key, answer, scope=payload.user_id)
+    if SEMANTIC_CACHE_ENABLED and payload.user_id:
+        semantic_cache.add(semantic_scope(payload.user_id, payload.account_info), payload.message, answer)
+
+
+def require_admin(x_admin_token: str = Header(default="")):
+    # 사용자 질문 원문을 보여 주거나 다른 사용자 항목을 지우는 관리 API 용 (api_server 의 ADMIN_TOKEN 과 같은 값)
+    if not service_auth.is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다.")
+
+
+async def require_service(request: Request,
+                          x_service_timestamp: str = Header(default=""),
+                          x_service_signature: str = Header(default="")):
+    # 본문의 user_id / session_id 를 믿을 수 있도록 API 서버가 서명한 요청만 받음 (service_auth 참고)
+    body = await request.body()
+    if not service_auth.verify(request.method, request.url.path, body, x_service_timestamp, x_service_signature):
+        raise HTTPException(status_code=403, detail="서비스 서명이 올바르지 않습니다.")
+
+
+def user_key(payload: AIPayload, request: Request) -> str:
+    # 사용자 식별값이 없으면 호출한 클라이언트 주소 단위로 공정성 적용
+    if payload.user_id:
+        return f"user:{payload.user_id}"
+    return f"addr:{request.client.host if request.client else 'unknown'}"
+
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    # OpenAI 호출 없이 설정 상태만 확인 (프로브마다 토큰을 쓰지 않도록)
+    if not client.api_key:
+        raise HTTPException(status_code=503, detail="OPENAI_API_KEY not configured")
+    if not service_auth.service_key():
+        raise HTTPException(status_code=503, detail="AI_SERVICE_KEY not configured")
+    return {"status": "ok", "scheduler": scheduler.stats()}
+
+
+def build_messages(payload: AIPayload, conv=None):
     system_prompt = f"""
 너는 은행 계좌 정보를 기반으로 금융 상담을 해주는 친절한 한국어 챗봇이야.
 
-아래는 사용자의 계좌 정보야. 모든 정보는 신뢰할 만하며, 질문에 답변할 때 꼭 참고해:
-{payload.account_info}
+아래는 사용자의 계좌 정보야. 모든 정보는 신뢰할 만하며, 질문에 답변할 때 꼭 참고해.
+[합계]/[유형별]/[은행별]/[요약]/[전망]/[만기예정] 은 미리 계산된 값이고, [계좌] 아래는 '|' 로 구분된 계좌별 행이야:
+{fit_to_budget(payload.account_info)}
 
 응답을 구성할 때는 다음을 반영해:
 - 각 계좌의 상품명, 이자율, 잔액, 만기일, 자동이체 여부 등을 기반으로 정리하거나 조언해줘
+- 예상 이자나 만기 지급액은 직접 계산하지 말고 [전망]/[만기예정] 값을 그대로 사용해
 - 숫자는 천단위로 쉼표를 찍고, %, 원 등의 단위를 붙여
 - 질문이 없더라도 계좌정보의 특징을 요약해서 말해줘
 - 필요한 경우 사용자가 어떤 계좌를 어떻게 활용할 수 있을지 상담해줘
 """
+    messages = [{"role": "system", "content": system_prompt}]
+    if conv is not None:
+        if conv.summary:
+            messages.append({
+                "role": "system",
+                "content": "지금까지의 대화 요약:\n" + fit_to_budget(conv.summary, SUMMARY_TOKENS),
+            })
+        messages.extend(conv.pending)
+        messages.extend(conv.turns)
+    messages.append({"role": "user", "content": payload.message})
+    return messages
+
 
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": payload.message}
-        ]
+# -----------------------------------------------------------
+# 대화 기록
+# -----------------------------------------------------------
+def conversation_key(payload: AIPayload):
+    if not (payload.user_id and payload.session_id):
+        return None
+    return ConversationStore.make_key(payload.user_id, payload.session_id)
+
+
+async def summarize_conversation(conv_key, fairness_key):
+    # 오래된 메시지를 기존 요약에 합쳐 SUMMARY_TOKENS 이내로 갱신 (응답 후 백그라운드 실행)
+    if conv_key in _summarizing:
+        return
+    _summarizing.add(conv_key)
+    try:
+        summary, pending = await asyncio.to_thread(conversations.take_pending, conv_key)
+        if not pending:
+            return
+        transcript = "\n".join(
+            f"{'사용자' if m['role'] == 'user' else 'AI'}: {m['content']}" for m in pending
+        )
+        try:
+            response = await scheduler.call(
+                fairness_key,
+                lambda: client.chat.completions.create(
+                    model=SUMMARY_MODEL,
+                    messages=[
+                        {"role": "system", "content": (
+                            "다음은 금융 상담 대화의 기존 요약과 그 뒤에 이어진 대화야. "
+                            "사용자의 관심사, 질문, 중요한 답변 내용을 담아 "
+                            f"{SUMMARY_TOKENS}토큰 이내의 한국어 요약으로 갱신해줘."
+                        )},
+                        {"role": "user", "content": f"[기존 요약]\n{summary or '(없음)'}\n\n[이어진 대화]\n{transcript}"},
+                    ],
+                    max_tokens=SUMMARY_TOKENS,
+                ),
+                timeout=AI_DEADLINE,
+            )
+            metrics.record_usage(SUMMARY_MODEL, response.usage)
+            new_summary = response.choices[0].message.content.strip()
+        except Exception:
+            # 요약 호출이 실패하면 원문을 이어 붙여 상한까지만 유지
+            new_summary = f"{summary}\n{transcript}".strip()
+        await asyncio.to_thread(
+            conversations.commit_summary, conv_key, fit_to_budget(new_summary, SUMMARY_TOKENS), len(pending))
+    finally:
+        _summarizing.discard(conv_key)
+
+
+async def load_conversation(conv_key):
+    # SQLite 읽기/WAL 커밋이 이벤트 루프(다른 요청과 스트림)를 막지 않도록 대화 기록은 스레드에서 처리
+    if conv_key is None:
+        return None
+    return await asyncio.to_thread(conversations.load, conv_key)
+
+
+async def remember_turn(conv_key, fairness_key, payload: AIPayload, answer: str):
+    if conv_key is None:
+        return
+    if await asyncio.to_thread(conversations.append, conv_key, payload.message, answer):
+        asyncio.get_running_loop().create_task(summarize_conversation(conv_key, fairness_key))
+
+
+def remaining(deadline) -> float:
+    return max(0.0, deadline - time.monotonic())
+
+
+def sse(data) -> str:
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/ai", dependencies=[Depends(require_service)])
+async def get_ai_response(payload: AIPayload, request: Request):
+    fairness_key = user_key(payload, request)
+    access_log.set_user(payload.user_id)
+    conv_key = conversation_key(payload)
+    conv = await load_conversation(conv_key)
+    # 이전 대화가 있으면 답변이 맥락에 따라 달라지므로 캐시를 쓰지 않음
+    use_cache = conv is None or conv.is_empty()
+
+    key = cache_key(payload)
+    if use_cache:
+        cached, source = cached_answer(payload, key)
+        if cached is not None:
+            await remember_turn(conv_key, fairness_key, payload, cached)
+            return {"response": cached, "cached": source}
+
+    try:
+        # 대기열 대기 + 429 재시도 시간까지 포함
+        with metrics.span("openai"):
+            response = await scheduler.call(
+                fairness_key,
+                lambda: client.chat.completions.create(
+                    model=MODEL,
+                    messages=build_messages(payload, conv)
+                ),
+                timeout=AI_DEADLINE,
+            )
+    except SchedulerBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except RateLimitError:
+        raise HTTPException(status_code=429, detail="OpenAI 요청 한도를 초과했습니다.")
+
+    metrics.record_usage(MODEL, response.usage)
+    answer = response.choices[0].message.content.strip()
+    if answer:
+        if use_cache:
+            store_answer(payload, key, answer)
+        await remember_turn(conv_key, fairness_key, payload, answer)
+    # 호출한 API 서버가 자기 접근 로그에 토큰 수를 남길 수 있도록 함께 반환
+    usage = response.usage
+    return {
+        "response": answer,
+        "usage": {"prompt": usage.prompt_tokens, "completion": usage.completion_tokens} if usage else None,
+    }
+
+
+# -----------------------------------------------------------
+# 스트리밍 응답 (SSE: data: {"delta": ...} ... data: [DONE])
+# -----------------------------------------------------------
+@app.post("/ai/stream", dependencies=[Depends(require_service)])
+async def stream_ai_response(payload: AIPayload, request: Request):
+    fairness_key = user_key(payload, request)
+    access_log.set_user(payload.user_id)
+    conv_key = conversation_key(payload)
+    conv = await load_conversation(conv_key)
+    use_cache = conv is None or conv.is_empty()
+
+    key = cache_key(payload)
+    cached, source = cached_answer(payload, key) if use_cache else (None, None)
+
+    async def events():
+        if cached is not None:
+            await remember_turn(conv_key, fairness_key, payload, cached)
+            yield sse({"delta": cached, "cached": source})
+            yield "data: [DONE]\n\n"
+            return
+
+        deadline = time.monotonic() + AI_DEADLINE
+        started = time.perf_counter()
+        # 응답 본문은 서버 span 이 끝난 뒤에 흘러가므로 스트림 구간은 따로 span 으로 기록
+        stream_span = tracing.Span("openai_stream")
+        parts = []
+        complete = False
+        try:
+            # 스트림이 끝날 때까지 슬롯을 점유
+            async with scheduler.slot(fairness_key, deadline):
+                # 첫 토큰 전이나 토큰 사이에서 멈춰도 기한에 끊기도록 응답 대기와 청크마다 남은 시간으로 제한
+                stream = await asyncio.wait_for(
+                    client.chat.completions.create(
+                        model=MODEL,
+                        messages=build_messages(payload, conv),
+                        stream=True,
+                        stream_options={"include_usage": True},
+                    ),
+                    timeout=remaining(deadline),
+                )
+                try:
+                    chunks = stream.__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining(deadline))
+                        except StopAsyncIteration:
+                            complete = True
+                            break
+                        if not chunk.choices:
+                            # 마지막 청크에만 usage 가 담겨 옴
+                            metrics.record_usage(MODEL, chunk.usage)
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            if not parts:
+                                metrics.observe_span("openai_first_token", time.perf_counter() - started)
+                                stream_span.set(first_token_ms=round((time.perf_counter() - started) * 1000, 1))
+                            parts.append(delta)
+                            yield sse({"delta": delta})
+                finally:
+                    await stream.close()
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            yield sse({"error": "AI 응답이 기한 내에 끝나지 않았습니다."})
+        except RateLimitError:
+            yield sse({"error": "OpenAI 요청 한도를 초과했습니다."})
+        except Exception as e:
+            yield sse({"error": str(e)})
+        metrics.observe_span("openai_stream", time.perf_counter() - started)
+        stream_span.set(complete=complete, chunks=len(parts))
+        stream_span.end()
+        # 끝까지 받은 응답만 캐시/대화 기록에 반영
+        answer = "".join(parts).strip()
+        if complete and answer:
+            if use_cache:
+                store_answer(payload, key, answer)
+            await remember_turn(conv_key, fairness_key, payload, answer)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return {"response": response.choices[0].message.content.strip()}
\ No newline at end of file
+
+
+# -----------------------------------------------------------
+# 응답 캐시 관리
+# -----------------------------------------------------------
+@app.post("/cache/invalidate", dependencies=[Depends(require_service)])
+def invalidate_cache(payload: InvalidatePayload):
+    semantic_cache.invalidate_prefix(f"{payload.user_id}|")
+    return {"invalidated": response_cache.invalidate(payload.user_id)}
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {"exact": response_cache.stats(), "semantic": semantic_cache.stats()}
+
+
+@app.get("/cache/semantic/audit", dependencies=[Depends(require_admin)])
+def semantic_audit(limit: int = 100):
+    # 최근 의미 유사도 적중 내역 (질문, 적중한 원래 질문, 유사도) - 질문 원문이 담기므로 관리자 전용
+    return {"hits": semantic_cache.audit_log(limit)}
+
+
+@app.post("/cache/semantic/report", dependencies=[Depends(require_admin)])
+def report_false_hit(payload: FalseHitPayload):
+    # 잘못 재사용된 답변 신고 → 해당 항목 제거 및 오적중 집계 (임의 user_id 를 지울 수 있으므로 관리자 전용)
+    scope = semantic_scope(payload.user_id, payload.account_info)
+    return {"removed": semantic_cache.report_false_hit(scope, payload.message)}
+
+
+# -----------------------------------------------------------
+# 대화 기록 관리
+# -----------------------------------------------------------
+@app.post("/conversation/reset", dependencies=[Depends(require_service)])
+def reset_conversation(payload: ConversationPayload):
+    conversations.reset(ConversationStore.make_key(payload.user_id, payload.session_id))
+    return {"status": "ok"}
@@ -0,0 +1,184 @@
+# 관리자용 집계 API (/api/admin/analytics/...)
+#   모든 집계는 MySQL GROUP BY 로 처리하고, 각 쿼리는 커버링 인덱스만 읽도록 구성 (db/init/init.sql 참고)
+#     은행별 잔액   : idx_account_bank_type_balance (bank_name, account_type, balance)
+#     유형별 계좌 수: idx_account_bank_type_balance 전체 스캔 (유형 수만큼의 그룹이라 임시 테이블이 작음)
+#     만기 도래     : idx_account_maturity_balance (maturity_date, balance)
+#     금리 분포     : idx_account_user_rate (user_id, interest_rate) 전체 스캔
+#   전체 집계 두 개는 전용 인덱스를 두어도 어차피 인덱스 전체를 읽으므로, 계좌 INSERT 비용을 줄이려고 기존 인덱스를 씀
+#   결과는 ANALYTICS_CACHE_TTL 초 동안 캐시 (직렬화된 응답 본문 그대로)
+#   ADMIN_TOKEN 이 설정되지 않으면 모든 엔드포인트가 403
+import datetime
+import os
+from decimal import Decimal
+
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from accounts_cache import LocalCache
+from db import get_connection
+from service_auth import is_admin_token
+
+ANALYTICS_CACHE_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "60"))
+MAX_WINDOW_DAYS = 366
+
+bp = Blueprint("analytics", __name__, url_prefix="/api/admin/analytics")
+_cache = LocalCache(maxsize=256)
+
+
+class AnalyticsError(ValueError):
+    pass
+
+
+@bp.before_request
+def require_admin():
+    if not is_admin_token(request.headers.get("X-Admin-Token")):
+        return jsonify({"message": "관리자 권한이 필요합니다."}), 403
+
+
+@bp.errorhandler(AnalyticsError)
+def bad_request(e):
+    return jsonify({"message": str(e)}), 400
+
+
+def _query(sql, params=()):
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+
+def _cached(key, compute):
+    body = _cache.get(key)
+    if body is None:
+        result = compute()
+        result["generated_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+        body = current_app.json.dumps(result)
+        _cache.set(key, body, ex=ANALYTICS_CACHE_TTL)
+    return Response(body, mimetype="application/json")
+
+
+def _date_arg(name, default):
+    value = request.args.get(name)
+    if not value:
+        return default
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise AnalyticsError(f"{name} 날짜 형식 오류(YYYY-MM-DD): {value}")
+
+
+# -----------------------------------------------------------
+# 은행별 예치금 (유형별 세부 포함)
+# -----------------------------------------------------------
+@bp.get("/deposits-by-bank")
+def deposits_by_bank():
+    def compute():
+        rows = _query(
+            """
+            SELECT bank_name, account_type, COUNT(*) AS account_count, SUM(balance) AS total_balance
+            FROM account
+            GROUP BY bank_name, account_type
+            """
+        )
+        banks = {}
+        for row in rows:
+            bank = banks.setdefault(row["bank_name"], {
+                "bank_name": row["bank_name"], "account_count": 0, "total_balance": Decimal(0), "by_type": {},
+            })
+            bank["account_count"] += row["account_count"]
+            bank["total_balance"] += row["total_balance"]
+            bank["by_type"][row["account_type"]] = {
+                "count": row["account_count"], "balance": row["total_balance"],
+            }
+        return {"banks": sorted(banks.values(), key=lambda b: b["total_balance"], reverse=True)}
+
+    return _cached("deposits-by-bank", compute)
+
+
+# -----------------------------------------------------------
+# 유형별 계좌 수
+# -----------------------------------------------------------
+@bp.get("/types")
+def account_types():
+    def compute():
+        rows = _query(
+            """
+            SELECT account_type, COUNT(*) AS account_count, SUM(balance) AS total_balance
+            FROM account
+            GROUP BY account_type
+            ORDER BY account_count DESC
+            """
+        )
+        return {"types": rows}
+
+    return _cached("types", compute)
+
+
+# -----------------------------------------------------------
+# 기간 내 만기 도래 계좌 (일자별)
+#   ?from=YYYY-MM-DD&to=YYYY-MM-DD (기본: 오늘부터 30일)
+# -----------------------------------------------------------
+@bp.get("/maturing")
+def maturing():
+    start = _date_arg("from", datetime.date.today())
+    end = _date_arg("to", start + datetime.timedelta(days=30))
+    if end < start:
+        raise AnalyticsError("to 는 from 이후여야 합니다.")
+    if (end - start).days > MAX_WINDOW_DAYS:
+        raise AnalyticsError(f"조회 기간은 최대 {MAX_WINDOW_DAYS}일입니다.")
+
+    def compute():
+        rows = _query(
+            """
+            SELECT maturity_date, COUNT(*) AS account_count, SUM(balance) AS total_balance
+            FROM account
+            WHERE maturity_date BETWEEN %s AND %s
+            GROUP BY maturity_date
+            ORDER BY maturity_date
+            """,
+            (start, end),
+        )
+        for r in rows:
+            r["maturity_date"] = r["maturity_date"].isoformat()
+        return {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "account_count": sum(r["account_count"] for r in rows),
+            "total_balance": sum((r["total_balance"] for r in rows), Decimal(0)),
+            "by_date": rows,
+        }
+
+    return _cached(f"maturing:{start}:{end}", compute)
+
+
+# -----------------------------------------------------------
+# 금리 분포
+#   ?bucket=0.5 (구간 폭, %p)
+# -----------------------------------------------------------
+@bp.get("/rate-histogram")
+def rate_histogram():
+    try:
+        width = Decimal(request.args.get("bucket", "0.5"))
+    except ArithmeticError:
+        raise AnalyticsError("bucket 형식 오류")
+    if not width.is_finite() or not Decimal("0.05") <= width <= Decimal("10"):
+        raise AnalyticsError("bucket 은 0.05~10 사이여야 합니다.")
+
+    def compute():
+        rows = _query(
+            """
+            SELECT FLOOR(interest_rate / %s) AS bucket, COUNT(*) AS account_count
+            FROM account
+            GROUP BY bucket
+            ORDER BY bucket
+            """,
+            (width,),
+        )
+        return {
+            "bucket_width": width,
+            "buckets": [
+                {"from": r["bucket"] * width, "to": (r["bucket"] + 1) * width, "count": r["account_count"]}
+                for r in rows
+            ],
+        }
+
+    return _cached(f"rate-histogram:{width.normalize()}", compute)
@@ -1,31 +1,138 @@
-from flask import Flask, request, jsonify, session, redirect, url_for
-from werkzeug.security import generate_password_hash, check_password_hash
-from db import get_connection
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from db import get_connection, pool_stats
+import datetime
+import functools
+import json
 import os
-import requests
+import threading
+import time
 from requests.exceptions import Timeout, HTTPError, RequestException, ConnectionError as ReqConnectionError
-from flask_bcrypt import Bcrypt
+from ai_client import AIClient, AIBusyError, CircuitOpenError
+from password_hasher import PasswordHasher, HasherBusyError, process_share
+from account_context import encode_accounts
+import portfolio
+import bulk_import
+import account_listing
+import analytics
+import profiler
+import projection
+import metrics
+import tracing
+import access_log
+import auth_tokens
+from accounts_cache import create_accounts_cache
 
 app = Flask(__name__)
-app.secret_key = os.urandom(24)
-
-bcrypt = Bcrypt(app)
-
-AI_ENDPOINT = "http://aiserver:8000/ai"
-AI_TIMEOUT = 60 
+# SECRET_KEY 가 없으면 시작하지 않음 (gunicorn 은 preload 된 마스터가 앱을 로드할 때 실패)
+app.secret_key = auth_tokens.secret_key()
+tokens = auth_tokens.TokenAuthority(
+    app.secret_key,
+    os.getenv("SECRET_KEY_PREVIOUS"),
+    revocation_store=auth_tokens.DBRevocationStore(),
+)
+
+accounts_cache = create_accounts_cache()
+app.register_blueprint(analytics.bp)
+app.register_blueprint(profiler.bp)
+# 라우트별 요청 수/처리 시간 + /metrics
+metrics.init_flask(app, "api_server")
+# traceparent 를 이어받아 요청/구간 span 기록
+tracing.init_flask(app, "api_server")
+# 요청별 JSON 접근 로그 (gunicorn 기본 access log 대신)
+access_log.init_flask(app, "api_server")
+
+# BCRYPT_WORKERS 는 웹 워커 하나의 bcrypt 프로세스 수 (기본: CPU 코어 수 / 웹 워커 수),
+# BCRYPT_MAX_PENDING 은 호스트 전체의 대기 상한으로 웹 워커 수만큼 나눠 가짐
+hasher = PasswordHasher(
+    rounds=int(os.getenv("BCRYPT_LOG_ROUNDS", "12")),
+    workers=int(os.getenv("BCRYPT_WORKERS", "0")) or None,
+    max_pending=process_share(int(os.getenv("BCRYPT_MAX_PENDING", "64"))),
+)
+
+AI_BASE_URL = os.getenv("AI_BASE_URL", "http://aiserver:8000")
+AI_ENDPOINT = f"{AI_BASE_URL}/ai"
+AI_TIMEOUT = int(os.getenv("AI_TIMEOUT", "60"))
+
+ai_client = AIClient(
+    AI_BASE_URL,
+    timeout=AI_TIMEOUT,
+    max_concurrency=int(os.getenv("AI_MAX_CONCURRENCY", "16")),
+    failure_threshold=int(os.getenv("AI_BREAKER_FAILURES", "5")),
+    reset_timeout=int(os.getenv("AI_BREAKER_RESET", "30")),
+    stream_timeout=int(os.getenv("AI_STREAM_TIMEOUT", "300")),
+)
 
 # -----------------------------------------------------------
 # 유틸
 # -----------------------------------------------------------
 def json_error(message: str, status: int = 500):
+    if status >= 500:
+        access_log.note_error(message)
     return jsonify({"message": message}), status
 
 
+def invalidate_ai_cache(user_id):
+    # 계좌가 바뀐 사용자의 AI 응답 캐시 제거 (실패해도 요청은 성공 처리.
+    # 캐시 키에 계좌 정보가 포함되어 있어 오래된 답변이 재사용되지는 않음)
+    try:
+        ai_client.post("/cache/invalidate", {"user_id": str(user_id)}, timeout=2)
+    except Exception:
+        pass
+
+
+def login_required(view):
+    # Authorization: Bearer <token> 을 로컬에서 검증하고 g.user_id 에 사용자 id 를 넣음
+    # (요청 본문의 user_id 는 더 이상 신뢰하지 않음)
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            g.token_claims = tokens.verify(auth_tokens.bearer_token(request.headers.get("Authorization")))
+        except auth_tokens.AuthError as e:
+            return json_error(f"🔒 {e}", 401)
+        g.user_id = g.token_claims["uid"]
+        access_log.set_user(g.user_id)
+        return view(*args, **kwargs)
+    return wrapper
+
+
 # -----------------------------------------------------------
 # 헬스체크
+#   /healthz : 프로세스 생존 여부만 확인 (DB/AI 호출 없음)
+#   /readyz  : 풀 커넥션으로 DB 확인 + AI 서버 /readyz 결과를 TTL 동안 캐시
 # -----------------------------------------------------------
-@app.get("/health")
-def health():
+AI_READY_TTL = float(os.getenv("AI_READY_TTL", "15"))
+_ai_ready_cache = {"checked_at": 0.0, "ok": False, "detail": "not checked"}
+_ai_ready_lock = threading.Lock()
+
+
+def check_ai_ready():
+    now = time.monotonic()
+    with _ai_ready_lock:
+        if now - _ai_ready_cache["checked_at"] < AI_READY_TTL:
+            return _ai_ready_cache["ok"], _ai_ready_cache["detail"]
+        # 동시에 들어온 다른 프로브는 갱신이 끝날 때까지 이전 결과를 사용
+        _ai_ready_cache["checked_at"] = now
+
+    try:
+        ai_client.get("/readyz", timeout=3)
+        ok, detail = True, "ok"
+    except HTTPError as e:
+        ok, detail = False, f"status {e.response.status_code}"
+    except Exception as e:
+        ok, detail = False, str(e)
+
+    with _ai_ready_lock:
+        _ai_ready_cache.update(checked_at=time.monotonic(), ok=ok, detail=detail)
+    return ok, detail
+
+
+@app.get("/healthz")
+def healthz():
+    return jsonify({"status": "ok"}), 200
+
+
+@app.get("/readyz")
+def readyz():
     # DB 연결 체크
     try:
         with get_connection() as conn:
@@ -33,21 +140,24 @@ def health():
                 cursor.execute("SELECT 1")
                 _ = cursor.fetchone()
     except Exception as e:
-        return json_error(f"DB unhealthy: {e}", 500)
+        return json_error(f"DB unhealthy: {e}", 503)
 
-    # AI 서버 간단 체크
-    try:
-        r = requests.post(
-            AI_ENDPOINT,
-            json={"message": "ping", "account_info": "healthcheck"},
-            timeout=10,
-        )
-        if r.status_code != 200:
-            return json_error(f"AI unhealthy: {r.status_code}", 502)
-    except Exception as e:
-        return json_error(f"AI unhealthy: {e}", 502)
+    # AI 서버 체크 (캐시된 결과)
+    ai_ok, ai_detail = check_ai_ready()
+    if not ai_ok:
+        return json_error(f"AI unhealthy: {ai_detail}", 503)
+
+    return jsonify({
+        "status": "ok",
+        "db_pool": pool_stats(),
+        "ai_client": ai_client.stats(),
+        "hasher": hasher.stats(),
+        "accounts_cache": accounts_cache.stats(),
+    }), 200
 
-    return jsonify({"status": "ok"}), 200
+
+# 기존 프로브 경로 호환
+app.add_url_rule("/health", "health", readyz)
 
 
 # -----------------------------------------------------------
@@ -73,7 +183,7 @@ def register():
                 if cursor.fetchone():
                     return json_error("❌ 이미 사용 중인 아이디입니다.", 409)
 
-                hashed_pw = bcrypt.generate_password_hash(password).decode("utf-8")
+                hashed_pw = hasher.hash(password)
                 cursor.execute(
                     """
                     INSERT INTO login (username, password, email, phone_number, address, birthdate)
@@ -81,10 +191,13 @@ def register():
                     """,
                     (username, hashed_pw, email, phone, address, birthdate),
                 )
+                portfolio.init_summary(cursor, cursor.lastrowid)
                 conn.commit()
 
         return jsonify({"message": "✅ 회원가입 성공!"}), 200
 
+    except HasherBusyError as e:
+        return json_error(f"⏳ {e}", 503)
     except Exception as e:
         return json_error(f"❗ 서버 오류: {str(e)}", 500)
 
@@ -99,26 +212,49 @@ def api_login():
         username = data.get("username")
         password = data.get("password")
 
+        if not username or not password:
+            return jsonify({"error": "로그인 실패"}), 401
+
+        # 검증에 필요한 컬럼만 조회 (주소 등 개인정보는 읽지 않음)
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                cursor.execute("SELECT * FROM login WHERE username=%s", (username,))
+                cursor.execute("SELECT id, password FROM login WHERE username=%s", (username,))
                 user = cursor.fetchone()
 
-                if not user or not bcrypt.check_password_hash(user["password"], password):
-                    return jsonify({"error": "로그인 실패"}), 401
-
-                cursor.execute(
-                    """
-                    SELECT account_number, bank_name, product_name, account_type, balance,
-                           interest_rate, maturity_date, monthly_limit, auto_transfer, note
-                    FROM account WHERE user_id = %s
-                    """,
-                    (user["id"],),
-                )
-                accounts = cursor.fetchall()
+        if not user or not hasher.verify(user["password"], password):
+            return jsonify({"error": "로그인 실패"}), 401
+
+        # 비용(cost factor) 설정이 바뀌었으면 로그인 성공 시점에 새 해시로 교체
+        if hasher.needs_rehash(user["password"]):
+            new_hash = hasher.hash(password)
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("UPDATE login SET password=%s WHERE id=%s", (new_hash, user["id"]))
+                    conn.commit()
+
+        # 계좌 목록은 /api/accounts 로 필요할 때 조회
+        token, claims = tokens.issue(user["id"])
+        access_log.set_user(user["id"])
+        return jsonify({
+            "user_id": user["id"],
+            "token": token,
+            "token_type": "Bearer",
+            "expires_in": claims["exp"] - claims["iat"],
+        }), 200
+
+    except HasherBusyError as e:
+        return json_error(f"⏳ {e}", 503)
+    except Exception as e:
+        return json_error(f"❗ 서버 오류: {str(e)}", 500)
 
-        return jsonify({"user_id": user["id"], "accounts": accounts}), 200
 
+@app.post("/api/logout")
+@login_required
+def api_logout():
+    # 이 토큰을 폐기 목록에 추가 (다른 워커/노드는 AUTH_REVOCATION_REFRESH 이내에 반영)
+    try:
+        tokens.revoke(g.token_claims)
+        return jsonify({"message": "✅ 로그아웃되었습니다."}), 200
     except Exception as e:
         return json_error(f"❗ 서버 오류: {str(e)}", 500)
 
@@ -127,10 +263,11 @@ def api_login():
 # 계좌 추가
 # -----------------------------------------------------------
 @app.post("/api/add_account")
+@login_required
 def add_account():
     try:
         data = request.get_json(force=True)
-        user_id        = data.get("user_id")
+        user_id        = g.user_id
         account_number = data.get("account_number")
         bank_name      = data.get("bank_name")
         balance        = data.get("balance", 0.0)
@@ -143,7 +280,7 @@ def add_account():
         auto_transfer  = data.get("auto_transfer", False)
         note           = data.get("note")
 
-        if not user_id or not account_number:
+        if not account_number:
             return json_error("❌ 필수 데이터 누락", 400)
 
         with get_connection() as conn:
@@ -172,8 +309,18 @@ def add_account():
                         note,
                     ),
                 )
+                # 같은 트랜잭션 안에서 요약 테이블 증분 갱신
+                portfolio.apply_accounts_added(cursor, user_id, [{
+                    "balance": balance,
+                    "account_type": account_type,
+                    "interest_rate": interest_rate,
+                    "maturity_date": maturity_date,
+                    "auto_transfer": auto_transfer,
+                }])
                 conn.commit()
 
+        accounts_cache.invalidate(user_id)
+        invalidate_ai_cache(user_id)
         return jsonify({"message": "✅ 계좌가 등록되었습니다."}), 200
 
     except Exception as e:
@@ -182,126 +329,212 @@ def add_account():
 
 
 # -----------------------------------------------------------
-# 계좌 목록
+# 계좌 일괄 등록
+#   JSON: {"accounts": [{...}, ...]}
+#   CSV : Content-Type: text/csv, 첫 줄은 컬럼명 (add_account 필드와 동일)
+#   청크마다 커밋하므로 실패한 행만 errors 에 담기고 나머지는 등록됨
 # -----------------------------------------------------------
-@app.post("/api/accounts")
-def get_accounts():
-    try:
-        data = request.get_json(force=True)
-        user_id = data.get("user_id")
-        if not user_id:
-            return json_error("user_id가 없습니다.", 400)
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
 
-        with get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    SELECT account_number, bank_name, product_name, account_type, balance,
-                           interest_rate, maturity_date, monthly_limit, auto_transfer, note
-                    FROM account WHERE user_id = %s
-                    """,
-                    (user_id,),
-                )
-                accounts = cursor.fetchall()
 
-        return jsonify({"accounts": accounts}), 200
+@app.post("/api/accounts/bulk")
+@login_required
+def bulk_add_accounts():
+    try:
+        user_id = g.user_id
+        if request.mimetype in ("text/csv", "application/csv"):
+            rows = bulk_import.iter_csv_rows(request.stream)
+        else:
+            data = request.get_json(force=True, silent=True) or {}
+            items = data.get("accounts")
+            if not isinstance(items, list):
+                return json_error("accounts 배열이 필요합니다.", 400)
+            rows = bulk_import.iter_json_rows(items)
+
+        try:
+            with get_connection() as conn:
+                result = bulk_import.import_rows(conn, user_id, rows, chunk_size=BULK_CHUNK_SIZE)
+        except bulk_import.ImportAborted as e:
+            # 앞선 청크는 이미 커밋됨 → 등록된 건수와 마지막 커밋 행 번호를 함께 반환
+            if e.result.inserted:
+                accounts_cache.invalidate(user_id)
+                invalidate_ai_cache(user_id)
+            message = f"❗ 서버 오류: {str(e)}"
+            access_log.note_error(message)
+            return jsonify({"message": message, **e.result.to_dict()}), 500
+
+        if result.inserted:
+            accounts_cache.invalidate(user_id)
+            invalidate_ai_cache(user_id)
+        return jsonify(result.to_dict()), 200
 
     except Exception as e:
         return json_error(f"❗ 서버 오류: {str(e)}", 500)
 
 
 # -----------------------------------------------------------
-# 간단 HTML 페이지 (세션 기반, 사용 안 하면 무시)
+# 계좌 목록
+#   선택 파라미터 (account_listing.py 참고)
+#     fields       : 반환할 컬럼 목록 (기본: note 포함 기존 10개 컬럼)
+#     account_type, bank_name : 필터 (문자열 또는 배열)
+#     sort         : id | balance | interest_rate | maturity_date, 앞에 "-" 면 내림차순
+#     limit, cursor: limit 를 주면 페이지 단위로 반환하고 다음 페이지용 next_cursor 포함
 # -----------------------------------------------------------
-@app.get("/accounts")
-def my_accounts():
-    if "user_id" not in session:
-        return redirect(url_for("login"))
+@app.post("/api/accounts")
+@login_required
+def get_accounts():
+    try:
+        data = request.get_json(force=True, silent=True) or {}
+        user_id = g.user_id
+        query = account_listing.parse_query(data)
+
+        def load():
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    result = account_listing.fetch_accounts(cursor, user_id, query)
+            return app.json.dumps(result)
+
+        # 계좌가 바뀌지 않았으면 DB 를 거치지 않고 직렬화된 응답을 그대로 반환
+        body = accounts_cache.get_or_load(user_id, load, variant=query.variant())
+        return Response(body, mimetype="application/json"), 200
+
+    except account_listing.ListingError as e:
+        return json_error(str(e), 400)
+    except Exception as e:
+        return json_error(f"❗ 서버 오류: {str(e)}", 500)
+
 
-    user_id = session["user_id"]
-    conn = get_connection()
+# -----------------------------------------------------------
+# 포트폴리오 요약
+# -----------------------------------------------------------
+@app.post("/api/summary")
+@login_required
+def get_summary():
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT * FROM account WHERE user_id=%s", (user_id,))
-            accounts = cursor.fetchall()
+        user_id = g.user_id
+
+        with get_connection() as conn:
+            summary = portfolio.get_summary(conn, user_id)
+
+        return jsonify({"summary": summary}), 200
 
-        result = "<h2>📒 내 계좌 목록</h2><ul>"
-        for acc in accounts:
-            result += f"<li>{acc['bank_name']} / {acc['account_number']} / {acc['balance']}원 / {acc['account_type']}</li>"
-        result += "</ul>"
-        return result
-    finally:
-        conn.close()
+    except Exception as e:
+        return json_error(f"❗ 서버 오류: {str(e)}", 500)
 
 
+# -----------------------------------------------------------
+# 안내 페이지
+#   로그인은 Bearer 토큰만 발급하고 Flask 세션에는 아무것도 쓰지 않으므로 세션 기반 HTML 페이지는 두지 않음
+#   (계좌 목록은 POST /api/accounts)
+# -----------------------------------------------------------
 @app.get("/")
 def home():
-    if "user_id" in session:
-        return redirect(url_for("my_accounts"))
-    # 별도 로그인 페이지가 없으므로 단순 안내
     return "API 서버 동작 중입니다.", 200
 
 
 # -----------------------------------------------------------
 # AI 요청
 # -----------------------------------------------------------
+def load_account_info(user_id):
+    # 계좌 조회 후 프롬프트용 문자열 생성 (계좌가 없으면 None)
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT bank_name, product_name, balance, account_type, maturity_date,
+                       interest_rate, is_fixed_term, monthly_limit, note, auto_transfer, created_at
+                FROM account WHERE user_id=%s
+                """,
+                (user_id,),
+            )
+            accounts = cursor.fetchall()
+        if not accounts:
+            return None
+        summary = portfolio.get_summary(conn, user_id)
+
+    # 만기/이자 계산은 모델에 맡기지 않고 미리 계산해서 전달
+    with metrics.span("context_build"):
+        return encode_accounts(accounts, summary=summary, projection=projection.project(accounts))
+
+
+# -----------------------------------------------------------
+# 만기/이자 예측
+#   {"months": 12} → 월별 예상 잔액/이자/납입액/만기 지급액, 만기 예정 목록
+# -----------------------------------------------------------
+@app.post("/api/projection")
+@login_required
+def get_projection():
+    try:
+        data = request.get_json(force=True, silent=True) or {}
+        user_id = g.user_id
+        try:
+            months = int(data.get("months") or projection.DEFAULT_MONTHS)
+        except (TypeError, ValueError):
+            return json_error("months 형식 오류", 400)
+        if not 1 <= months <= projection.MAX_MONTHS:
+            return json_error(f"months 는 1~{projection.MAX_MONTHS} 사이여야 합니다.", 400)
+
+        def load():
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        SELECT bank_name, product_name, account_type, balance, interest_rate,
+                               maturity_date, is_fixed_term, monthly_limit, created_at
+                        FROM account WHERE user_id = %s
+                        """,
+                        (user_id,),
+                    )
+                    accounts = cursor.fetchall()
+            return app.json.dumps({"projection": projection.project(accounts, months)})
+
+        # 계좌 목록 캐시와 같은 버전으로 무효화, 날짜가 바뀌면 다시 계산
+        variant = f"projection:{months}:{datetime.date.today().isoformat()}"
+        body = accounts_cache.get_or_load(user_id, load, variant=variant)
+        return Response(body, mimetype="application/json"), 200
+
+    except Exception as e:
+        return json_error(f"❗ 서버 오류: {str(e)}", 500)
+
+
 @app.post("/ask")
+@login_required
 def ask():
     try:
         data = request.get_json(force=True)
-        user_id = data.get("user_id")
+        user_id = g.user_id
         user_message = data.get("message")
 
-        if not user_id or not user_message:
+        if not user_message:
             return jsonify({"response": "❌ 요청이 올바르지 않습니다."}), 400
 
-        # 계좌 조회
-        with get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    SELECT bank_name, account_number, balance, account_type,
-                           maturity_date, interest_rate, note, auto_transfer
-                    FROM account WHERE user_id=%s
-                    """,
-                    (user_id,),
-                )
-                accounts = cursor.fetchall()
-
-        if not accounts:
+        account_info = load_account_info(user_id)
+        if account_info is None:
             return jsonify({"response": "❗ 계좌 정보가 없습니다."})
 
-        account_info = " | ".join(
-            [
-                "은행명: {bank_name}, 계좌유형: {account_type}, 잔액: {balance}원, "
-                "이자율: {interest_rate}%, 만기일: {maturity_date}, "
-                "자동이체: {auto}, 메모: {note}".format(
-                    bank_name=acc["bank_name"],
-                    account_type=acc["account_type"],
-                    balance=acc["balance"],
-                    interest_rate=acc["interest_rate"],
-                    maturity_date=acc["maturity_date"],
-                    auto=("있음" if acc["auto_transfer"] else "없음"),
-                    note=(acc["note"] or ""),
-                )
-                for acc in accounts
-            ]
-        )
-
         # AI 서버 호출
         try:
-            resp = requests.post(
-                AI_ENDPOINT,
-                json={"message": user_message, "account_info": account_info},
-                timeout=AI_TIMEOUT,
-            )
-            resp.raise_for_status()
+            with metrics.span("ai_upstream"):
+                resp = ai_client.post(
+                    "/ai",
+                    {
+                        "message": user_message,
+                        "account_info": account_info,
+                        "user_id": str(user_id),
+                        "session_id": data.get("session_id"),
+                    },
+                )
             data = resp.json()
+            access_log.add_tokens(data.get("usage"))
             answer = data.get("response", "").strip()
             if not answer:
                 return jsonify({"response": "❗ AI 서버가 빈 응답을 반환했습니다."}), 502
             return jsonify({"response": answer}), 200
 
+        except CircuitOpenError as e:
+            return jsonify({"response": f"⛔ {e}"}), 503
+        except AIBusyError as e:
+            return jsonify({"response": f"⏳ {e}"}), 503
         except Timeout:
             return jsonify({"response": "⏱️ AI 서버 응답이 지연되었습니다. 잠시 후 다시 시도해 주세요."}), 504
         except HTTPError as e:
@@ -316,6 +549,71 @@ def ask():
         return jsonify({"response": f"❗ 서버 오류: {str(e)}"}), 500
 
 
+# -----------------------------------------------------------
+# AI 요청 (스트리밍) - AI 서버의 SSE 를 버퍼링 없이 그대로 전달
+# -----------------------------------------------------------
+def sse_error(message: str):
+    return "data: " + json.dumps({"error": message}, ensure_ascii=False) + "\n\ndata: [DONE]\n\n"
+
+
+@app.post("/ask/stream")
+@login_required
+def ask_stream():
+    try:
+        data = request.get_json(force=True)
+        user_id = g.user_id
+        user_message = data.get("message")
+
+        if not user_message:
+            return jsonify({"response": "❌ 요청이 올바르지 않습니다."}), 400
+
+        account_info = load_account_info(user_id)
+        if account_info is None:
+            return jsonify({"response": "❗ 계좌 정보가 없습니다."})
+
+        # 첫 청크까지 받아 본 뒤 응답을 시작해야 연결 오류를 상태 코드로 돌려줄 수 있음
+        try:
+            chunks = ai_client.stream(
+                "/ai/stream",
+                {
+                    "message": user_message,
+                    "account_info": account_info,
+                    "user_id": str(user_id),
+                    "session_id": data.get("session_id"),
+                },
+            )
+            with metrics.span("ai_upstream_first_chunk"):
+                first = next(chunks, b"")
+        except CircuitOpenError as e:
+            return jsonify({"response": f"⛔ {e}"}), 503
+        except AIBusyError as e:
+            return jsonify({"response": f"⏳ {e}"}), 503
+        except Timeout:
+            return jsonify({"response": "⏱️ AI 서버 응답이 지연되었습니다. 잠시 후 다시 시도해 주세요."}), 504
+        except HTTPError as e:
+            return jsonify({"response": f"❗ AI 서버 오류 ({e.response.status_code})"}), 502
+        except RequestException as e:
+            return jsonify({"response": f"❗ AI 서버에 연결할 수 없습니다: {str(e)}"}), 502
+
+        def relay():
+            try:
+                yield first
+                yield from chunks
+            except RequestException as e:
+                yield sse_error(f"AI 스트림이 중단되었습니다: {e}")
+            finally:
+                chunks.close()
+
+        return Response(
+            stream_with_context(relay()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    except Exception as e:
+        return jsonify({"response": f"❗ 서버 오류: {str(e)}"}), 500
+
+
 if __name__ == "__main__":
     # 도커에서 외부 접근 가능하도록 0.0.0.0 바인딩
     app.run(debug=True, host="0.0.0.0")
@@ -0,0 +1,312 @@
+# api_server 의 /ask 를 asyncio 기반으로 처리하는 서버
+#   uvicorn api_server_async:app --host 0.0.0.0 --port 5001
+# DB 는 aiomysql, AI 서버 호출은 httpx.AsyncClient 를 사용해
+# 한 프로세스가 수백 개의 AI 대화를 동시에 기다릴 수 있음
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+
+import aiomysql
+import httpx
+from dotenv import load_dotenv
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from account_context import encode_accounts
+from portfolio import summarize_accounts
+from projection import project
+from ai_client import CircuitBreaker, CircuitOpenError
+import access_log
+import auth_tokens
+import metrics
+import service_auth
+import tracing
+
+load_dotenv()
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST"),
+    "port": int(os.getenv("DB_PORT", "3306")),
+    "user": os.getenv("DB_USER"),
+    "password": os.getenv("DB_PASSWORD"),
+    "db": os.getenv("DB_NAME"),
+    "charset": "utf8mb4",
+    "cursorclass": aiomysql.DictCursor,
+    "autocommit": True,
+}
+
+AI_BASE_URL = os.getenv("AI_BASE_URL", "http://aiserver:8000")
+# httpx.Timeout 은 연결/읽기/쓰기 한 번마다의 제한이므로 전체 기한은 asyncio.wait_for 로 따로 적용
+AI_TIMEOUT = float(os.getenv("AI_TIMEOUT", "60"))
+AI_STREAM_TIMEOUT = float(os.getenv("AI_STREAM_TIMEOUT", "300"))
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY_ASYNC", "512"))
+
+state = {}
+
+# api_server 가 발급한 토큰을 같은 SECRET_KEY 로 검증 (폐기 목록은 백그라운드 스레드가 DB 에서 동기화)
+tokens = auth_tokens.TokenAuthority(
+    auth_tokens.secret_key(),
+    os.getenv("SECRET_KEY_PREVIOUS"),
+    revocation_store=auth_tokens.DBRevocationStore(),
+)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    state["db"] = await aiomysql.create_pool(
+        minsize=int(os.getenv("DB_POOL_MIN", "2")),
+        maxsize=int(os.getenv("DB_POOL_MAX", "10")),
+        pool_recycle=int(os.getenv("DB_POOL_IDLE_TIMEOUT", "300")),
+        **DB_CONFIG,
+    )
+    state["http"] = httpx.AsyncClient(
+        base_url=AI_BASE_URL,
+        timeout=httpx.Timeout(AI_TIMEOUT, connect=3),
+        limits=httpx.Limits(max_connections=AI_MAX_CONCURRENCY, max_keepalive_connections=64),
+    )
+    state["ai_slots"] = asyncio.Semaphore(AI_MAX_CONCURRENCY)
+    state["breaker"] = CircuitBreaker(
+        int(os.getenv("AI_BREAKER_FAILURES", "5")),
+        int(os.getenv("AI_BREAKER_RESET", "30")),
+    )
+    try:
+        yield
+    finally:
+        await state["http"].aclose()
+        state["db"].close()
+        await state["db"].wait_closed()
+
+
+app = FastAPI(lifespan=lifespan)
+# 접근 로그는 metrics/tracing 값을 읽으므로 먼저(안쪽 미들웨어로) 등록
+access_log.init_fastapi(app, "api_server_async")
+metrics.init_fastapi(app, "api_server_async")
+tracing.init_fastapi(app, "api_server_async")
+
+
+def reply(message: str, status: int = 200):
+    return JSONResponse({"response": message}, status_code=status)
+
+
+def authenticate(request: Request):
+    # Authorization: Bearer <token> 의 사용자 id (실패 시 AuthError)
+    user_id = tokens.verify(auth_tokens.bearer_token(request.headers.get("authorization")))["uid"]
+    access_log.set_user(user_id)
+    return user_id
+
+
+async def fetch_accounts(user_id):
+    async with state["db"].acquire() as conn:
+        async with conn.cursor() as cursor:
+            with metrics.span("db"):
+                await cursor.execute(
+                    """
+                    SELECT bank_name, product_name, balance, account_type, maturity_date,
+                           interest_rate, is_fixed_term, monthly_limit, note, auto_transfer, created_at
+                    FROM account WHERE user_id=%s
+                    """,
+                    (user_id,),
+                )
+            return await cursor.fetchall()
+
+
+def ai_request(path, payload):
+    # 서명한 바이트를 그대로 보내야 하므로 JSON 직렬화를 직접 하고 추적/서비스 서명 헤더를 붙임
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    headers = service_auth.sign("POST", path, body, tracing.inject({"Content-Type": "application/json"}))
+    return {"content": body, "headers": headers}
+
+
+def remaining(deadline):
+    return max(0.0, deadline - asyncio.get_running_loop().time())
+
+
+async def call_ai(payload):
+    breaker = state["breaker"]
+    probe = breaker.before_call()
+    try:
+        async with state["ai_slots"]:
+            with metrics.span("ai_upstream"):
+                # 조금씩 흘려보내는 응답도 AI_TIMEOUT 안에 끝나도록 본문 수신까지 포함해 제한
+                resp = await asyncio.wait_for(
+                    state["http"].post("/ai", **ai_request("/ai", payload)), timeout=AI_TIMEOUT)
+    except asyncio.TimeoutError:
+        breaker.on_failure()
+        raise httpx.ReadTimeout("AI 서버 응답이 전체 기한을 넘었습니다.") from None
+    except httpx.RequestError:
+        breaker.on_failure()
+        raise
+    except BaseException:
+        # 취소(클라이언트 연결 끊김 등)는 업스트림 실패가 아니므로 half-open 시험 슬롯만 반납
+        if probe:
+            breaker.release_probe()
+        raise
+    if resp.status_code >= 500:
+        breaker.on_failure()
+    else:
+        breaker.on_success()
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def read_json(request: Request):
+    # 본문이 JSON 객체가 아니면 None
+    try:
+        data = await request.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def build_account_info(accounts):
+    # 토큰 계산(tiktoken)/예측 계산은 CPU 작업이므로 asyncio.to_thread 로 실행
+    # [요약] 은 api_server 와 같은 프롬프트(= 같은 AI 캐시 키)가 되도록 같은 계좌 행에서 계산
+    # (portfolio_summary 는 동기 커넥션용 코드라 읽지 않고, 정의가 같은 summarize_accounts 사용)
+    return encode_accounts(accounts, summary=summarize_accounts(accounts), projection=project(accounts))
+
+
+# -----------------------------------------------------------
+# 헬스체크
+# -----------------------------------------------------------
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+# -----------------------------------------------------------
+# AI 요청
+# -----------------------------------------------------------
+@app.post("/ask")
+async def ask(request: Request):
+    try:
+        try:
+            user_id = authenticate(request)
+        except auth_tokens.AuthError as e:
+            return reply(f"🔒 {e}", 401)
+        data = await read_json(request)
+        if data is None or not data.get("message"):
+            return reply("❌ 요청이 올바르지 않습니다.", 400)
+        user_message = data["message"]
+
+        accounts = await fetch_accounts(user_id)
+        if not accounts:
+            return reply("❗ 계좌 정보가 없습니다.")
+
+        account_info = await asyncio.to_thread(build_account_info, accounts)
+
+        try:
+            result = await call_ai({
+                "message": user_message,
+                "account_info": account_info,
+                "user_id": str(user_id),
+                "session_id": data.get("session_id"),
+            })
+            access_log.add_tokens(result.get("usage"))
+            answer = result.get("response", "").strip()
+            if not answer:
+                return reply("❗ AI 서버가 빈 응답을 반환했습니다.", 502)
+            return reply(answer)
+
+        except CircuitOpenError as e:
+            return reply(f"⛔ {e}", 503)
+        except httpx.TimeoutException:
+            return reply("⏱️ AI 서버 응답이 지연되었습니다. 잠시 후 다시 시도해 주세요.", 504)
+        except httpx.HTTPStatusError as e:
+            return reply(f"❗ AI 서버 오류 ({e.response.status_code}): {e.response.text[:400]}", 502)
+        except httpx.ConnectError as e:
+            return reply(f"❗ AI 서버에 연결할 수 없습니다: {str(e)}", 502)
+        except httpx.HTTPError as e:
+            return reply(f"❗ AI 요청 중 오류가 발생했습니다: {str(e)}", 502)
+
+    except Exception as e:
+        return reply(f"❗ 서버 오류: {str(e)}", 500)
+
+
+# -----------------------------------------------------------
+# AI 요청 (스트리밍) - AI 서버의 SSE 를 그대로 전달
+# -----------------------------------------------------------
+def sse_error(message: str):
+    return "data: " + json.dumps({"error": message}, ensure_ascii=False) + "\n\ndata: [DONE]\n\n"
+
+
+@app.post("/ask/stream")
+async def ask_stream(request: Request):
+    try:
+        try:
+            user_id = authenticate(request)
+        except auth_tokens.AuthError as e:
+            return reply(f"🔒 {e}", 401)
+        data = await read_json(request)
+        if data is None or not data.get("message"):
+            return reply("❌ 요청이 올바르지 않습니다.", 400)
+
+        breaker = state["breaker"]
+        # 차단 중이면 바로 503 (시험 슬롯은 실제로 호출하는 relay 안에서 잡음)
+        if breaker.state == "open":
+            return reply("⛔ AI 서버가 불안정하여 요청을 잠시 차단했습니다.", 503)
+
+        accounts = await fetch_accounts(user_id)
+        if not accounts:
+            return reply("❗ 계좌 정보가 없습니다.")
+
+        payload = {
+            "message": data["message"],
+            "account_info": await asyncio.to_thread(build_account_info, accounts),
+            "user_id": str(user_id),
+            "session_id": data.get("session_id"),
+        }
+    except Exception as e:
+        return reply(f"❗ 서버 오류: {str(e)}", 500)
+
+    async def relay():
+        # 응답 본문이 시작되지 않으면(클라이언트가 먼저 끊음) 이 제너레이터는 실행되지 않으므로
+        # before_call 과 결과 보고를 모두 여기서 처리
+        try:
+            probe = breaker.before_call()
+        except CircuitOpenError as e:
+            yield sse_error(str(e))
+            return
+        reported = False
+        deadline = asyncio.get_running_loop().time() + AI_STREAM_TIMEOUT
+        try:
+            async with state["ai_slots"]:
+                # 응답 시작과 청크마다 남은 시간으로 제한 (청크 사이 대기는 httpx 읽기 timeout 으로도 제한)
+                upstream = state["http"].build_request("POST", "/ai/stream", **ai_request("/ai/stream", payload))
+                resp = await asyncio.wait_for(state["http"].send(upstream, stream=True), timeout=remaining(deadline))
+                try:
+                    reported = True
+                    if resp.status_code >= 500:
+                        breaker.on_failure()
+                    else:
+                        breaker.on_success()
+                    if resp.status_code != 200:
+                        yield sse_error(f"AI 서버 오류 ({resp.status_code})")
+                        return
+                    chunks = resp.aiter_raw()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining(deadline))
+                        except StopAsyncIteration:
+                            break
+                        yield chunk
+                finally:
+                    await resp.aclose()
+        except asyncio.TimeoutError:
+            reported = True
+            breaker.on_failure()
+            yield sse_error("AI 응답이 전체 기한을 넘었습니다.")
+        except httpx.HTTPError as e:
+            reported = True
+            breaker.on_failure()
+            yield sse_error(f"AI 스트림이 중단되었습니다: {e}")
+        finally:
+            # 응답 헤더 전에 취소된 경우 half-open 시험 슬롯 반납
+            if probe and not reported:
+                breaker.release_probe()
+
+    return StreamingResponse(
+        relay(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,16 +1,28 @@
+import json
+import uuid
 import gradio as gr
 import requests
+import tracing
 import pandas as pd
 
 API_BASE = "http://localhost:5000"
 SESSION = {"active_tab": "로그인"}  # 시작 탭: 로그인
 
+def api_post(path, **kwargs):
+    # 요청마다 UI span 을 열고 traceparent 헤더로 API 서버에 전달 (분산 추적의 시작점)
+    # 로그인 후에는 발급받은 액세스 토큰을 Authorization 헤더로 보냄
+    headers = kwargs.pop("headers", None) or {}
+    if SESSION.get("token"):
+        headers["Authorization"] = f"Bearer {SESSION['token']}"
+    with tracing.start_span(f"ui POST {path}"):
+        return requests.post(f"{API_BASE}{path}", headers=tracing.inject(headers), **kwargs)
+
 def signup_fn(username, password, pw2, email, phone, address, birthdate):
     if not username or not password:
         return "❗ 아이디와 비밀번호는 필수입니다."
     if password != pw2:
         return "❌ 비밀번호가 일치하지 않습니다."
-    res = requests.post(f"{API_BASE}/register", json={
+    res = api_post("/register", json={
         "username": username,
         "password": password,
         "email": email,
@@ -27,14 +39,17 @@ def signup_fn(username, password, pw2, email, phone, address, birthdate):
             return f"❌ 회원가입 실패: {res.text}"
 
 def login_fn(username, password):
-    res = requests.post(f"{API_BASE}/api/login", json={
+    res = api_post("/api/login", json={
         "username": username,
         "password": password
     })
     if res.status_code == 200:
         data = res.json()
         SESSION['user_id'] = data["user_id"]
-        SESSION['accounts'] = data.get("accounts", [])
+        SESSION['token'] = data.get("token")
+        SESSION['chat_session_id'] = uuid.uuid4().hex
+        acc_res = api_post("/api/accounts", json={})
+        SESSION['accounts'] = acc_res.json().get("accounts", []) if acc_res.status_code == 200 else []
         SESSION['login_pw'] = password
         SESSION["active_tab"] = "계좌/AI 챗봇"  # 탭 이동 상태 저장
 
@@ -58,8 +73,7 @@ def login_fn(username, password):
 def add_account(acct_num, bank, p_name, a_type, bal, ir, matd, is_fixed, monlim, autotr, note):
     if not SESSION.get("user_id"):
         return "먼저 로그인 후 사용하세요."
-    res = requests.post(f"{API_BASE}/api/add_account", json={
-        "user_id": SESSION["user_id"],
+    res = api_post("/api/add_account", json={
         "account_number": acct_num,
         "bank_name": bank,
         "balance": bal,
@@ -73,7 +87,7 @@ def add_account(acct_num, bank, p_name, a_type, bal, ir, matd, is_fixed, monlim,
         "note": note
     })
     if res.status_code == 200:
-        acc_res = requests.post(f"{API_BASE}/api/accounts", json={"user_id": SESSION["user_id"]})
+        acc_res = api_post("/api/accounts", json={})
         if acc_res.status_code == 200:
             SESSION['accounts'] = acc_res.json().get("accounts", [])
         return "✅ 계좌 등록 완료!"
@@ -87,7 +101,7 @@ def get_accounts():
     
     if not SESSION.get("user_id"):
         return pd.DataFrame()
-    acc_res = requests.post(f"{API_BASE}/api/accounts", json={"user_id": SESSION["user_id"]})
+    acc_res = api_post("/api/accounts", json={})
     if acc_res.status_code == 200:
         SESSION['accounts'] = acc_res.json().get("accounts", [])
     accs = SESSION.get('accounts', [])
@@ -95,18 +109,38 @@ def get_accounts():
         return pd.DataFrame()
     return pd.DataFrame(accs)
 
+def iter_sse(res):
+    # "data: {...}" 줄 단위로 이벤트를 꺼냄 ("data: [DONE]" 에서 종료)
+    for line in res.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        yield json.loads(data)
+
 def ai_chat_fn(user_msg, history):
     if not SESSION.get("user_id"):
-        return history + [["", "먼저 로그인 해주세요!"]]
-    res = requests.post(f"{API_BASE}/ask", json={
-        "user_id": SESSION["user_id"],
+        yield history + [["", "먼저 로그인 해주세요!"]]
+        return
+    with api_post("/ask/stream", json={
+        "session_id": SESSION.get("chat_session_id"),
         "message": user_msg
-    })
-    if res.status_code == 200:
-        answer = res.json().get("response", "AI 서버 오류")
-    else:
-        answer = f"❗ 서버 오류: {res.text}"
-    return history + [[user_msg, answer]]
+    }, stream=True, timeout=(5, 120)) as res:
+        if res.status_code != 200:
+            yield history + [[user_msg, f"❗ 서버 오류: {res.text}"]]
+            return
+        if not res.headers.get("Content-Type", "").startswith("text/event-stream"):
+            yield history + [[user_msg, res.json().get("response", "AI 서버 오류")]]
+            return
+        answer = ""
+        for event in iter_sse(res):
+            if "error" in event:
+                answer += f"\n\n❗ {event['error']}"
+                break
+            answer += event.get("delta", "")
+            yield history + [[user_msg, answer]]
+        yield history + [[user_msg, answer]]
 
 # 로그인 후 '계좌/AI 챗봇' 탭으로 이동하는 함수
 def go_to_accounts():
@@ -0,0 +1,197 @@
+# 서명된 무상태 액세스 토큰 (/api/login 에서 발급, 요청은 Authorization: Bearer <token>)
+#   형식: v1.<payload>.<signature>
+#     payload   = base64url JSON {"uid", "iat", "exp", "jti"}
+#     signature = base64url HMAC-SHA256(SECRET_KEY, "v1.<payload>")
+#   검증은 각 워커가 로컬에서 처리 (공유 세션 저장소나 요청마다의 DB 조회 없음)
+#     - 검증에 성공한 토큰은 만료 시각까지 LRU(AUTH_CACHE_SIZE) 에 두어 서명 계산/JSON 해석을 건너뜀
+#     - 로그아웃한 토큰은 revoked_token 테이블에 기록하고, 워커마다 AUTH_REVOCATION_REFRESH 초 간격으로
+#       새로 추가된 행만 읽어 메모리의 폐기 목록에 반영 (다른 워커/노드에는 최대 이 간격만큼 늦게 전파)
+#   여러 워커/노드가 같은 토큰을 검증하려면 SECRET_KEY 가 같아야 함
+#   키 교체: 새 키를 SECRET_KEY, 이전 키를 SECRET_KEY_PREVIOUS 로 두면 기존 토큰도 만료까지 유효
+#   SECRET_KEY 가 없으면 서버가 시작하지 않음 (임의 키는 워커/재시작마다 달라 토큰이 모두 무효가 됨)
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from accounts_cache import LocalCache
+
+TOKEN_VERSION = "v1"
+ACCESS_TOKEN_TTL = int(os.getenv("ACCESS_TOKEN_TTL", str(12 * 3600)))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+REVOCATION_REFRESH = float(os.getenv("AUTH_REVOCATION_REFRESH", "30"))
+
+log = logging.getLogger(__name__)
+
+
+class AuthError(ValueError):
+    pass
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def secret_key():
+    key = os.getenv("SECRET_KEY")
+    if not key:
+        raise RuntimeError("SECRET_KEY 환경 변수가 설정되지 않았습니다. 모든 API 서버에 같은 값을 설정하세요.")
+    return key
+
+
+def bearer_token(header):
+    # "Bearer <token>" 에서 토큰만 꺼냄
+    scheme, _, token = (header or "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        raise AuthError("로그인이 필요합니다.")
+    return token.strip()
+
+
+# -----------------------------------------------------------
+# 폐기 목록 저장소 (revoked_token 테이블)
+# -----------------------------------------------------------
+class DBRevocationStore:
+    def add(self, jti, user_id, expires_at):
+        from db import get_connection
+
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "INSERT IGNORE INTO revoked_token (jti, user_id, expires_at) VALUES (%s, %s, FROM_UNIXTIME(%s))",
+                    (jti, user_id, int(expires_at)),
+                )
+                conn.commit()
+
+    def load_since(self, last_id):
+        # [(id, jti, 만료 epoch)] - 아직 만료되지 않은 새 행만
+        from db import get_connection
+
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id, jti, UNIX_TIMESTAMP(expires_at) AS expires_at
+                    FROM revoked_token
+                    WHERE id > %s AND expires_at > NOW()
+                    ORDER BY id
+                    """,
+                    (last_id,),
+                )
+                return [(r["id"], r["jti"], float(r["expires_at"])) for r in cursor.fetchall()]
+
+
+# -----------------------------------------------------------
+# 발급 / 검증
+# -----------------------------------------------------------
+class TokenAuthority:
+    def __init__(self, secret, previous_secret=None, ttl=ACCESS_TOKEN_TTL, cache_size=AUTH_CACHE_SIZE,
+                 revocation_store=None, refresh_interval=REVOCATION_REFRESH):
+        self._keys = [k.encode("utf-8") if isinstance(k, str) else k for k in (secret, previous_secret) if k]
+        if not self._keys:
+            raise ValueError("서명 키가 필요합니다.")
+        self.ttl = ttl
+        self._cache = LocalCache(maxsize=cache_size)
+        self._store = revocation_store
+        self._refresh_interval = refresh_interval
+        self._revoked = {}   # jti -> 만료 epoch
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._refresher_lock = threading.Lock()
+        self._refresher_pid = None
+
+    def _sign(self, key, signing_input):
+        return _b64encode(hmac.new(key, signing_input.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, user_id):
+        now = int(time.time())
+        claims = {"uid": int(user_id), "iat": now, "exp": now + self.ttl, "jti": uuid.uuid4().hex}
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        signing_input = f"{TOKEN_VERSION}.{payload}"
+        return f"{signing_input}.{self._sign(self._keys[0], signing_input)}", claims
+
+    def _decode(self, token):
+        parts = token.split(".")
+        if len(parts) != 3 or parts[0] != TOKEN_VERSION:
+            raise AuthError("토큰 형식이 올바르지 않습니다.")
+        signing_input = f"{parts[0]}.{parts[1]}"
+        signature = parts[2].encode("utf-8")
+        if not any(hmac.compare_digest(signature, self._sign(k, signing_input).encode("ascii")) for k in self._keys):
+            raise AuthError("토큰 서명이 올바르지 않습니다.")
+        try:
+            claims = json.loads(_b64decode(parts[1]))
+        except (ValueError, binascii.Error):
+            raise AuthError("토큰 형식이 올바르지 않습니다.")
+        if not (isinstance(claims, dict) and isinstance(claims.get("uid"), int)
+                and isinstance(claims.get("exp"), int) and isinstance(claims.get("jti"), str)):
+            raise AuthError("토큰 형식이 올바르지 않습니다.")
+        return claims
+
+    def verify(self, token):
+        # 유효하면 claims ({"uid", "iat", "exp", "jti"}) 반환, 아니면 AuthError
+        self._ensure_refresher()
+        claims = self._cache.get(token)
+        if claims is None:
+            claims = self._decode(token)
+            remaining = claims["exp"] - time.time()
+            if remaining <= 0:
+                raise AuthError("토큰이 만료되었습니다. 다시 로그인해 주세요.")
+            # 캐시 항목도 토큰 만료 시각에 같이 사라짐
+            self._cache.set(token, claims, ex=remaining)
+        if claims["jti"] in self._revoked:
+            raise AuthError("로그아웃된 토큰입니다. 다시 로그인해 주세요.")
+        return claims
+
+    def revoke(self, claims):
+        with self._lock:
+            self._revoked[claims["jti"]] = claims["exp"]
+        if self._store is not None:
+            self._store.add(claims["jti"], claims["uid"], claims["exp"])
+
+    # -------------------------------------------------------
+    # 폐기 목록 동기화 (워커마다 백그라운드 스레드 하나)
+    # -------------------------------------------------------
+    def refresh_revocations(self):
+        rows = self._store.load_since(self._last_id)
+        now = time.time()
+        with self._lock:
+            for row_id, jti, expires_at in rows:
+                self._last_id = max(self._last_id, row_id)
+                self._revoked[jti] = expires_at
+            # 만료된 토큰은 서명 검증 단계에서 거부되므로 목록에서 제거
+            for jti in [j for j, expires_at in self._revoked.items() if expires_at <= now]:
+                del self._revoked[jti]
+
+    def _ensure_refresher(self):
+        # fork 이후 워커마다 한 번씩 시작 (preload 된 마스터의 스레드는 fork 되지 않음)
+        # 워커의 첫 검증이 폐기 목록 없이 통과하지 않도록 처음 한 번은 직접 읽고 나서 스레드를 시작
+        # (같은 워커의 다른 요청도 이 읽기가 끝날 때까지 기다림)
+        if self._store is None or self._refresher_pid == os.getpid():
+            return
+        with self._refresher_lock:
+            if self._refresher_pid == os.getpid():
+                return
+            self._refresh_once()
+            self._refresher_pid = os.getpid()
+            threading.Thread(target=self._refresh_loop, name="token-revocations", daemon=True).start()
+
+    def _refresh_once(self):
+        try:
+            self.refresh_revocations()
+        except Exception as e:
+            # DB 장애 중에도 인증은 계속 (마지막으로 읽은 폐기 목록 사용)
+            log.warning("token revocation refresh failed: %s", e)
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self._refresh_interval)
+            self._refresh_once()
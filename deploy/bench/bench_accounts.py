@@ -0,0 +1,82 @@
+# /api/accounts 처리량 벤치마크
+#   python bench/bench_accounts.py --base http://127.0.0.1:5000 --token $ACCESS_TOKEN --concurrency 32 --duration 20
+# 결과는 JSON 한 줄로 출력됨 (모드별로 실행해 비교)
+# --method GET --path /healthz 로 DB 없이 서버 실행 방식만의 차이를 잴 수 있음
+import argparse
+import json
+import os
+import threading
+import time
+
+import requests
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def run(base, token, concurrency, duration, label, method="POST", path="/api/accounts"):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def worker():
+        nonlocal errors
+        session = requests.Session()
+        session.headers["Authorization"] = f"Bearer {token}"
+        local, local_errors = [], 0
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                r = session.request(method, f"{base}{path}", json={} if method == "POST" else None, timeout=30)
+                ok = r.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            if ok:
+                local.append(elapsed)
+            else:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        "label": label,
+        "endpoint": path,
+        "concurrency": concurrency,
+        "duration_s": round(wall, 2),
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default="http://127.0.0.1:5000")
+    parser.add_argument("--token", default=os.getenv("ACCESS_TOKEN", ""), help="/api/login 이 발급한 액세스 토큰")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--method", default="POST", choices=["GET", "POST"])
+    parser.add_argument("--path", default="/api/accounts")
+    args = parser.parse_args()
+    result = run(args.base, args.token, args.concurrency, args.duration, args.label, args.method, args.path)
+    print(json.dumps(result, ensure_ascii=False))
@@ -0,0 +1,71 @@
+# /ask 동시 처리량 벤치마크 (Flask vs async 서버)
+#   1) 스텁 AI 서버:   AI_STUB_DELAY=2 uvicorn bench.stub_ai_server:app --port 8000
+#   2) 대상 서버를 AI_BASE_URL=http://127.0.0.1:8000 으로 실행
+#        Flask : gunicorn -c gunicorn.conf.py api_server:app
+#        async : uvicorn api_server_async:app --port 5001
+#   3) python bench/bench_ask.py --base http://127.0.0.1:5001 --token $ACCESS_TOKEN --concurrency 50 100 200 400
+# 동시 요청 수별로 성공 수, 처리량, 지연 시간 백분위를 JSON 한 줄씩 출력
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+async def one(client, base, latencies, errors):
+    start = time.perf_counter()
+    try:
+        r = await client.post(f"{base}/ask", json={"message": "내 계좌 요약해줘"})
+        if r.status_code == 200:
+            latencies.append(time.perf_counter() - start)
+            return
+    except httpx.HTTPError:
+        pass
+    errors.append(1)
+
+
+async def run_level(base, token, concurrency, timeout, label):
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits, headers={"Authorization": f"Bearer {token}"}) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(client, base, latencies, errors) for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "label": label,
+        "endpoint": "/ask",
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "errors": len(errors),
+        "wall_s": round(wall, 2),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+    }
+
+
+async def main(args):
+    for level in args.concurrency:
+        result = await run_level(args.base, args.token, level, args.timeout, args.label)
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default="http://127.0.0.1:5001")
+    parser.add_argument("--token", default=os.getenv("ACCESS_TOKEN", ""), help="/api/login 이 발급한 액세스 토큰")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 100, 200, 400])
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--label", default="")
+    asyncio.run(main(parser.parse_args()))
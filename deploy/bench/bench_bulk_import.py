@@ -0,0 +1,128 @@
+# 계좌 일괄 등록 처리량 벤치마크
+#   python bench/bench_bulk_import.py --base http://127.0.0.1:5000 --token $ACCESS_TOKEN --rows 10000 --mode csv
+#   --mode single 은 같은 행을 /api/add_account 로 한 건씩 보내는 기준선 (--concurrency 로 병렬도 지정)
+# 계좌번호는 실행마다 새 접두어를 붙여 생성하므로 같은 DB 에서 반복 실행 가능. 결과는 JSON 한 줄
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import random
+import threading
+import time
+import uuid
+
+import requests
+
+BANKS = ["국민은행", "신한은행", "우리은행", "하나은행", "농협은행", "카카오뱅크", "토스뱅크"]
+TYPES = ["입출금", "적금", "정기예금", "청약"]
+FIELDS = [
+    "account_number", "bank_name", "balance", "account_type", "interest_rate",
+    "maturity_date", "product_name", "is_fixed_term", "monthly_limit", "auto_transfer", "note",
+]
+
+
+def make_rows(count, seed=0):
+    rng = random.Random(seed)
+    prefix = uuid.uuid4().hex[:8]
+    today = datetime.date.today()
+    rows = []
+    for i in range(count):
+        account_type = rng.choice(TYPES)
+        fixed = account_type in ("적금", "정기예금")
+        rows.append({
+            "account_number": f"B{prefix}-{i:08d}",
+            "bank_name": rng.choice(BANKS),
+            "balance": rng.randrange(0, 50_000_000, 1000),
+            "account_type": account_type,
+            "interest_rate": round(rng.uniform(0.1, 5.0), 2),
+            "maturity_date": (today + datetime.timedelta(days=rng.randrange(30, 1500))).isoformat() if fixed else "",
+            "product_name": f"벤치 상품 {i % 50}",
+            "is_fixed_term": fixed,
+            "monthly_limit": rng.randrange(0, 2_000_000, 10000) if account_type == "적금" else 0,
+            "auto_transfer": rng.random() < 0.3,
+            "note": "",
+        })
+    return rows
+
+
+def to_csv(rows):
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({k: (int(v) if isinstance(v, bool) else v) for k, v in row.items()})
+    return buf.getvalue().encode("utf-8")
+
+
+def run_bulk(base, token, rows, mode):
+    headers = {"Authorization": f"Bearer {token}"}
+    if mode == "csv":
+        kwargs = {"data": to_csv(rows), "headers": {**headers, "Content-Type": "text/csv"}}
+    else:
+        kwargs = {"json": {"accounts": rows}, "headers": headers}
+    start = time.perf_counter()
+    r = requests.post(f"{base}/api/accounts/bulk", timeout=600, **kwargs)
+    elapsed = time.perf_counter() - start
+    r.raise_for_status()
+    body = r.json()
+    return elapsed, body["inserted"], body["failed"]
+
+
+def run_single(base, token, rows, concurrency):
+    inserted = failed = 0
+    lock = threading.Lock()
+    chunks = [rows[i::concurrency] for i in range(concurrency)]
+
+    def worker(chunk):
+        nonlocal inserted, failed
+        session = requests.Session()
+        session.headers["Authorization"] = f"Bearer {token}"
+        ok = bad = 0
+        for row in chunk:
+            try:
+                r = session.post(f"{base}/api/add_account", json=row, timeout=30)
+                if r.status_code == 200:
+                    ok += 1
+                else:
+                    bad += 1
+            except requests.RequestException:
+                bad += 1
+        with lock:
+            inserted += ok
+            failed += bad
+
+    threads = [threading.Thread(target=worker, args=(c,)) for c in chunks]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, inserted, failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default="http://127.0.0.1:5000")
+    parser.add_argument("--token", default=os.getenv("ACCESS_TOKEN", ""), help="/api/login 이 발급한 액세스 토큰")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--mode", choices=["csv", "json", "single"], default="csv")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--label", default="")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    if args.mode == "single":
+        elapsed, inserted, failed = run_single(args.base, args.token, rows, args.concurrency)
+    else:
+        elapsed, inserted, failed = run_bulk(args.base, args.token, rows, args.mode)
+    print(json.dumps({
+        "label": args.label or args.mode,
+        "mode": args.mode,
+        "rows": args.rows,
+        "inserted": inserted,
+        "failed": failed,
+        "wall_s": round(elapsed, 2),
+        "rows_per_s": round(inserted / elapsed, 1) if elapsed else 0.0,
+    }, ensure_ascii=False))
@@ -0,0 +1,230 @@
+# 전체 스택 부하 테스트 (사용자 여정 단위, 목표 RPS 로 여정을 시작하는 open-loop 방식)
+#   1) OpenAI 스텁 : OPENAI_STUB_DELAY=1.5 uvicorn bench.stub_openai_server:app --port 8080
+#   2) ai_server   : OPENAI_BASE_URL=http://127.0.0.1:8080/v1 OPENAI_API_KEY=stub AI_SERVICE_KEY=dev uvicorn ai_server:app --port 8000
+#   3) api_server  : AI_BASE_URL=http://127.0.0.1:8000 AI_SERVICE_KEY=dev gunicorn -c gunicorn.conf.py api_server:app
+#   4) (선택) 데이터: python bench/seed_data.py --users 10000 --users-file /tmp/seed_users.jsonl
+#   5) python bench/loadtest.py --base http://127.0.0.1:5000 --rps 20 --duration 60 \
+#          --seeded-users /tmp/seed_users.jsonl --returning-ratio 0.7 --output result.json
+# 여정
+#   new       : register → login → add_account x N → accounts → ask
+#   returning : login → accounts → summary → ask   (--seeded-users 가 있을 때 --returning-ratio 비율)
+#   로그인 이후 요청은 /api/login 이 발급한 토큰을 Authorization: Bearer 로 보냄
+# 결과: 엔드포인트별 요청 수/오류/처리량/지연 시간 백분위 JSON
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+
+import httpx
+
+from bench_bulk_import import make_rows
+
+QUESTIONS = [
+    "내 계좌 요약해줘",
+    "금리가 가장 높은 계좌가 뭐야?",
+    "다음 달에 만기되는 계좌 있어?",
+    "적금 이자는 얼마나 받을 수 있어?",
+    "자동이체 걸린 계좌 알려줘",
+]
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def add(self, name, status, elapsed):
+        self.statuses[name][status] += 1
+        if status == 200:
+            self.latencies[name].append(elapsed)
+
+    def report(self, wall):
+        result = {}
+        for name in sorted(self.statuses):
+            lat = sorted(self.latencies[name])
+            total = sum(self.statuses[name].values())
+            result[name] = {
+                "requests": total,
+                "ok": len(lat),
+                "errors": total - len(lat),
+                "status": {str(k): v for k, v in sorted(self.statuses[name].items(), key=lambda kv: str(kv[0]))},
+                "rps": round(len(lat) / wall, 2) if wall else 0.0,
+                "mean_ms": round(sum(lat) / len(lat) * 1000, 1) if lat else 0.0,
+                "p50_ms": round(percentile(lat, 50) * 1000, 1),
+                "p90_ms": round(percentile(lat, 90) * 1000, 1),
+                "p95_ms": round(percentile(lat, 95) * 1000, 1),
+                "p99_ms": round(percentile(lat, 99) * 1000, 1),
+                "max_ms": round(lat[-1] * 1000, 1) if lat else 0.0,
+            }
+        return result
+
+
+class JourneyFailed(Exception):
+    pass
+
+
+class Journey:
+    def __init__(self, client, base, recorder, args):
+        self.client = client
+        self.base = base
+        self.recorder = recorder
+        self.args = args
+
+    async def call(self, name, path, payload, token=None):
+        start = time.perf_counter()
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        try:
+            r = await self.client.post(f"{self.base}{path}", json=payload, headers=headers)
+            status = r.status_code
+        except httpx.TimeoutException:
+            status = "timeout"
+        except httpx.HTTPError:
+            status = "conn_error"
+        self.recorder.add(name, status, time.perf_counter() - start)
+        if status != 200:
+            raise JourneyFailed(name)
+        return r.json()
+
+    async def ask(self, token, session_id):
+        payload = {"message": random.choice(QUESTIONS), "session_id": session_id}
+        if not self.args.stream:
+            await self.call("/ask", "/ask", payload, token)
+            return
+        # 스트리밍은 첫 이벤트까지(TTFB)와 전체 완료 시간을 따로 기록
+        start = time.perf_counter()
+        status, first = "conn_error", None
+        try:
+            async with self.client.stream("POST", f"{self.base}/ask/stream", json=payload,
+                                          headers={"Authorization": f"Bearer {token}"}) as r:
+                status = r.status_code
+                async for line in r.aiter_lines():
+                    if first is None and line.startswith("data:"):
+                        first = time.perf_counter() - start
+                    if line.strip() == "data: [DONE]":
+                        break
+        except httpx.TimeoutException:
+            status = "timeout"
+        except httpx.HTTPError:
+            status = "conn_error"
+        if first is not None:
+            self.recorder.add("/ask/stream (ttfb)", status, first)
+        self.recorder.add("/ask/stream", status, time.perf_counter() - start)
+        if status != 200:
+            raise JourneyFailed("/ask/stream")
+
+    async def new_user(self):
+        username = f"lt_{uuid.uuid4().hex[:12]}"
+        password = "loadtest-pw"
+        await self.call("/register", "/register", {
+            "username": username, "password": password, "email": f"{username}@example.com",
+            "phone_number": "010-0000-0000", "address": "서울특별시", "birthdate": "1990-01-01",
+        })
+        login = await self.call("/api/login", "/api/login", {"username": username, "password": password})
+        token = login["token"]
+        for row in make_rows(self.args.accounts_per_journey, seed=random.random()):
+            await self.call("/api/add_account", "/api/add_account", row, token)
+        await self.call("/api/accounts", "/api/accounts", {}, token)
+        for _ in range(self.args.asks):
+            await self.ask(token, uuid.uuid4().hex)
+
+    async def returning(self, user):
+        login = await self.call("/api/login", "/api/login", {"username": user["username"], "password": user["password"]})
+        token = login["token"]
+        await self.call("/api/accounts", "/api/accounts", {}, token)
+        await self.call("/api/summary", "/api/summary", {}, token)
+        session_id = uuid.uuid4().hex
+        for _ in range(self.args.asks):
+            await self.ask(token, session_id)
+
+
+async def main(args):
+    seeded = []
+    if args.seeded_users:
+        with open(args.seeded_users, encoding="utf-8") as f:
+            seeded = [json.loads(line) for line in f if line.strip()]
+
+    recorder = Recorder()
+    journeys = Counter()
+    inflight = set()
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+
+    async def run_one(journey):
+        kind = "returning" if seeded and random.random() < args.returning_ratio else "new"
+        journeys[f"{kind}_started"] += 1
+        try:
+            if kind == "returning":
+                await journey.returning(random.choice(seeded))
+            else:
+                await journey.new_user()
+            journeys[f"{kind}_completed"] += 1
+        except JourneyFailed as e:
+            journeys[f"{kind}_failed"] += 1
+            journeys[f"failed_at {e}"] += 1
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        journey = Journey(client, args.base, recorder, args)
+        started = time.perf_counter()
+        interval = 1.0 / args.rps
+        next_at = started
+        while next_at < started + args.duration:
+            # 일정 간격(또는 포아송 도착)으로 여정 시작. 시스템이 못 따라오면 동시 여정 상한에서 버림
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(inflight) >= args.max_inflight:
+                journeys["dropped"] += 1
+            else:
+                task = asyncio.create_task(run_one(journey))
+                inflight.add(task)
+                task.add_done_callback(inflight.discard)
+            next_at += random.expovariate(args.rps) if args.poisson else interval
+        if inflight:
+            await asyncio.wait(inflight, timeout=args.timeout)
+        wall = time.perf_counter() - started
+
+    return {
+        "label": args.label,
+        "base": args.base,
+        "target_rps": args.rps,
+        "duration_s": args.duration,
+        "wall_s": round(wall, 2),
+        "stream": args.stream,
+        "journeys": dict(journeys),
+        "endpoints": recorder.report(wall),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", default="http://127.0.0.1:5000")
+    parser.add_argument("--rps", type=float, default=5, help="초당 시작할 여정 수")
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--poisson", action="store_true", help="고정 간격 대신 포아송 도착")
+    parser.add_argument("--stream", action="store_true", help="/ask 대신 /ask/stream 사용")
+    parser.add_argument("--asks", type=int, default=1, help="여정당 질문 수")
+    parser.add_argument("--accounts-per-journey", type=int, default=3)
+    parser.add_argument("--seeded-users", default="", help="seed_data.py --users-file 출력")
+    parser.add_argument("--returning-ratio", type=float, default=0.7)
+    parser.add_argument("--max-inflight", type=int, default=1000)
+    parser.add_argument("--max-connections", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--label", default="")
+    parser.add_argument("--output", default="", help="결과 JSON 파일 (없으면 stdout)")
+    args = parser.parse_args()
+
+    result = asyncio.run(main(args))
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
@@ -0,0 +1,158 @@
+# 부하 테스트용 합성 데이터 생성 (login / account / portfolio_summary)
+#   python bench/seed_data.py --users 10000 --accounts-per-user 5 --users-file /tmp/seed_users.jsonl
+# DB 접속 정보는 api_server 와 같은 .env (DB_HOST/DB_USER/DB_PASSWORD/DB_NAME) 를 사용
+# 모든 사용자의 비밀번호는 --password 로 같고, 해시는 한 번만 계산해서 재사용
+# --users-file 로 (username, password, user_id) 목록을 남기면 loadtest.py --seeded-users 에서 로그인 여정에 사용
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt   # noqa: E402
+import pymysql  # noqa: E402
+
+from db import DB_CONFIG  # noqa: E402
+
+BANKS = ["국민은행", "신한은행", "우리은행", "하나은행", "농협은행", "기업은행", "카카오뱅크", "토스뱅크", "케이뱅크"]
+TYPES = [("입출금", 0.45), ("적금", 0.25), ("정기예금", 0.2), ("청약", 0.1)]
+
+
+def _pick_type(rng):
+    r, acc = rng.random(), 0.0
+    for name, weight in TYPES:
+        acc += weight
+        if r < acc:
+            return name
+    return TYPES[-1][0]
+
+
+def make_account(rng, user_id, number, today):
+    account_type = _pick_type(rng)
+    fixed = account_type in ("적금", "정기예금")
+    return (
+        user_id,
+        number,
+        rng.choice(BANKS),
+        rng.randrange(0, 80_000_000, 1000),
+        account_type,
+        round(rng.uniform(0.1, 5.5), 2),
+        today + datetime.timedelta(days=rng.randrange(-60, 1800)) if fixed else None,
+        f"{account_type} 상품 {rng.randrange(1, 40)}",
+        fixed,
+        rng.randrange(100_000, 2_000_000, 10_000) if account_type == "적금" else None,
+        rng.random() < 0.3,
+        rng.choice([None, None, None, "급여 계좌", "비상금", "여행 자금", "주택 마련"]),
+    )
+
+
+def seed(conn, users, accounts_per_user, password, rounds, batch, seed_value):
+    rng = random.Random(seed_value)
+    prefix = uuid.uuid4().hex[:6]
+    today = datetime.date.today()
+    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+    seeded = []
+
+    with conn.cursor() as cursor:
+        for start in range(0, users, batch):
+            rows = [
+                (f"lt_{prefix}_{i}", hashed, f"lt_{prefix}_{i}@example.com", "010-0000-0000",
+                 "서울특별시", datetime.date(1970 + i % 40, 1 + i % 12, 1 + i % 28))
+                for i in range(start, min(start + batch, users))
+            ]
+            cursor.executemany(
+                """
+                INSERT INTO login (username, password, email, phone_number, address, birthdate)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                rows,
+            )
+            # 동시 INSERT 가 있으면 AUTO_INCREMENT 값이 연속이 아닐 수 있어 username 으로 다시 조회
+            names = [row[0] for row in rows]
+            cursor.execute(
+                f"SELECT id, username FROM login WHERE username IN ({', '.join(['%s'] * len(names))})", names
+            )
+            id_by_name = {r["username"]: r["id"] for r in cursor.fetchall()}
+            user_ids = [id_by_name[name] for name in names]
+
+            accounts = []
+            for uid in user_ids:
+                for _ in range(max(0, int(rng.gauss(accounts_per_user, accounts_per_user / 3)))):
+                    accounts.append(make_account(rng, uid, f"{prefix}-{uid}-{len(accounts)}", today))
+            if accounts:
+                cursor.executemany(
+                    """
+                    INSERT INTO account (
+                        user_id, account_number, bank_name, balance,
+                        account_type, interest_rate, maturity_date,
+                        product_name, is_fixed_term, monthly_limit,
+                        auto_transfer, note
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    accounts,
+                )
+            rebuild_summaries(cursor, min(user_ids), max(user_ids))
+            conn.commit()
+            seeded.extend(zip(names, user_ids))
+            print(f"seeded users {start + len(rows)}/{users}", file=sys.stderr, flush=True)
+    return seeded
+
+
+def rebuild_summaries(cursor, first_id, last_id):
+    # portfolio.rebuild_summary 와 같은 계산을 사용자 범위 단위로 한 번에 수행
+    cursor.execute(
+        """
+        REPLACE INTO portfolio_summary (
+            user_id, account_count, total_balance, rate_weighted_sum,
+            next_maturity_date, auto_transfer_count
+        )
+        SELECT l.id, COUNT(a.id), COALESCE(SUM(a.balance), 0),
+               COALESCE(SUM(a.balance * a.interest_rate), 0),
+               MIN(CASE WHEN a.maturity_date >= CURDATE() THEN a.maturity_date END),
+               COALESCE(SUM(a.auto_transfer <> 0), 0)
+        FROM login l LEFT JOIN account a ON a.user_id = l.id
+        WHERE l.id BETWEEN %s AND %s
+        GROUP BY l.id
+        """,
+        (first_id, last_id),
+    )
+    cursor.execute(
+        """
+        REPLACE INTO portfolio_summary_type (user_id, account_type, account_count, total_balance)
+        SELECT user_id, account_type, COUNT(*), SUM(balance)
+        FROM account WHERE user_id BETWEEN %s AND %s
+        GROUP BY user_id, account_type
+        """,
+        (first_id, last_id),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--accounts-per-user", type=float, default=5)
+    parser.add_argument("--password", default="loadtest-pw")
+    parser.add_argument("--bcrypt-rounds", type=int, default=int(os.getenv("BCRYPT_LOG_ROUNDS", "12")))
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--users-file", default="")
+    parser.add_argument("--db-port", type=int, default=int(os.getenv("DB_PORT", "3306")), help="docker-compose 의 db 는 호스트에서 3307")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    conn = pymysql.connect(**{**DB_CONFIG, "port": args.db_port})
+    try:
+        seeded = seed(conn, args.users, args.accounts_per_user, args.password,
+                      args.bcrypt_rounds, args.batch, args.seed)
+    finally:
+        conn.close()
+    if args.users_file:
+        with open(args.users_file, "w", encoding="utf-8") as f:
+            for username, uid in seeded:
+                f.write(json.dumps({"username": username, "password": args.password, "user_id": uid}) + "\n")
+    print(json.dumps({"users": len(seeded), "wall_s": round(time.perf_counter() - started, 2)}))
@@ -0,0 +1,39 @@
+# ai_server 의 /ai 를 흉내 내는 스텁 (OpenAI 호출 없이 지정한 시간만큼 대기 후 응답)
+#   AI_STUB_DELAY=2 uvicorn bench.stub_ai_server:app --port 8000
+import asyncio
+import json
+import os
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+app = FastAPI()
+DELAY = float(os.getenv("AI_STUB_DELAY", "2"))
+
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    return {"status": "ok"}
+
+
+@app.post("/ai")
+async def ai(payload: dict):
+    await asyncio.sleep(DELAY)
+    return {"response": f"stub answer ({len(payload.get('account_info', ''))} chars of context)"}
+
+
+@app.post("/ai/stream")
+async def ai_stream(payload: dict):
+    async def events():
+        words = ["stub", "streamed", "answer"]
+        for word in words:
+            await asyncio.sleep(DELAY / len(words))
+            yield "data: " + json.dumps({"delta": word + " "}) + "\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -0,0 +1,99 @@
+# OpenAI 호환 /v1/chat/completions 스텁 (부하 테스트에서 실제 API 대신 사용)
+#   OPENAI_STUB_DELAY=1.5 uvicorn bench.stub_openai_server:app --port 8080
+#   ai_server 는 OPENAI_BASE_URL=http://127.0.0.1:8080/v1 OPENAI_API_KEY=stub 으로 실행
+# 응답 전체 지연은 OPENAI_STUB_DELAY 초 (스트리밍이면 토큰 단위로 나눠 전송)
+# OPENAI_STUB_429_RATE 비율만큼 429 + Retry-After 를 돌려줘 재시도 경로도 확인 가능
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI()
+DELAY = float(os.getenv("OPENAI_STUB_DELAY", "1.5"))
+COMPLETION_TOKENS = int(os.getenv("OPENAI_STUB_TOKENS", "60"))
+RATE_LIMIT_RATE = float(os.getenv("OPENAI_STUB_429_RATE", "0"))
+
+WORDS = ["계좌", "잔액", "금리", "만기", "적금", "예금", "이자", "추천", "요약", "상담"]
+
+
+def _prompt_tokens(messages):
+    # 대략치 (글자 수 / 2)
+    return sum(len(str(m.get("content", ""))) for m in messages) // 2
+
+
+def _answer_tokens(n):
+    return [random.choice(WORDS) + " " for _ in range(n)]
+
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "stub")
+    prompt_tokens = _prompt_tokens(body.get("messages", []))
+    completion_tokens = min(COMPLETION_TOKENS, body.get("max_tokens") or COMPLETION_TOKENS)
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+
+    if RATE_LIMIT_RATE and random.random() < RATE_LIMIT_RATE:
+        return JSONResponse(
+            {"error": {"message": "stub rate limit", "type": "rate_limit_error", "code": "rate_limit_exceeded"}},
+            status_code=429,
+            headers={"Retry-After": "1"},
+        )
+
+    tokens = _answer_tokens(completion_tokens)
+    if not body.get("stream"):
+        await asyncio.sleep(DELAY)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+    def chunk(delta, finish_reason=None, with_usage=False):
+        data = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [] if with_usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        if with_usage:
+            data["usage"] = usage
+        return "data: " + json.dumps(data, ensure_ascii=False) + "\n\n"
+
+    async def events():
+        yield chunk({"role": "assistant", "content": ""})
+        for token in tokens:
+            await asyncio.sleep(DELAY / len(tokens))
+            yield chunk({"content": token})
+        yield chunk({}, finish_reason="stop")
+        if include_usage:
+            yield chunk(None, with_usage=True)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -0,0 +1,238 @@
+# 계좌 일괄 등록 (/api/accounts/bulk)
+#   행 검증 → 청크 단위 트랜잭션으로 다중 행 INSERT → 행별 오류 보고
+import csv
+import datetime
+import io
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+import pymysql
+
+import portfolio
+
+COLUMNS = (
+    "account_number", "bank_name", "balance", "account_type", "interest_rate",
+    "maturity_date", "product_name", "is_fixed_term", "monthly_limit", "auto_transfer", "note",
+)
+MAX_ERRORS_REPORTED = 1000
+DUPLICATE_ENTRY = 1062
+
+INSERT_SQL = """
+    INSERT INTO account (
+        user_id, account_number, bank_name, balance,
+        account_type, interest_rate, maturity_date,
+        product_name, is_fixed_term, monthly_limit,
+        auto_transfer, note
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+class RowError(Exception):
+    pass
+
+
+class ImportAborted(Exception):
+    # 행 오류가 아닌 오류(DB 장애, CSV 인코딩 오류 등)로 중간에 멈춤
+    # 앞선 청크는 이미 커밋되었으므로 result 에 그때까지의 결과를 담아 호출한 쪽이 보고하도록 함
+    def __init__(self, result, cause):
+        super().__init__(str(cause))
+        self.result = result
+
+
+# -----------------------------------------------------------
+# 입력 파싱 (JSON 배열 / CSV 스트림) → (행 번호, dict) 제너레이터
+# -----------------------------------------------------------
+def iter_json_rows(items):
+    for i, item in enumerate(items, start=1):
+        yield i, item
+
+
+def iter_csv_rows(stream, encoding="utf-8-sig"):
+    # 요청 본문을 한 번에 읽지 않고 줄 단위로 처리
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding=encoding, newline=""))
+    for i, row in enumerate(reader, start=1):
+        yield i, row
+
+
+# -----------------------------------------------------------
+# 행 검증
+# -----------------------------------------------------------
+def _text(row, field, max_len, required=False):
+    value = row.get(field)
+    value = value.strip() if isinstance(value, str) else value
+    if value in (None, ""):
+        if required:
+            raise RowError(f"{field} 누락")
+        return None
+    value = str(value)
+    if len(value) > max_len:
+        raise RowError(f"{field} 길이 초과 (최대 {max_len})")
+    return value
+
+
+def _decimal(row, field, default, max_abs):
+    value = row.get(field)
+    if value in (None, ""):
+        return Decimal(default)
+    try:
+        number = Decimal(str(value).replace(",", ""))
+    except InvalidOperation:
+        raise RowError(f"{field} 숫자 형식 오류: {value}")
+    if not number.is_finite() or abs(number) >= max_abs:
+        raise RowError(f"{field} 범위 초과: {value}")
+    return number
+
+
+def _bool(row, field):
+    value = row.get(field)
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "y", "yes", "예", "o")
+
+
+def _date(row, field):
+    value = row.get(field)
+    if value in (None, ""):
+        return None
+    try:
+        return datetime.date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        raise RowError(f"{field} 날짜 형식 오류(YYYY-MM-DD): {value}")
+
+
+def validate_row(row):
+    # init.sql 의 account 컬럼 제약에 맞춰 검증/변환
+    if not isinstance(row, dict):
+        raise RowError("행 형식 오류")
+    balance = _decimal(row, "balance", "0", Decimal("1e13"))
+    if balance < 0:
+        raise RowError("balance 는 0 이상이어야 합니다")
+    return {
+        "account_number": _text(row, "account_number", 30, required=True),
+        "bank_name": _text(row, "bank_name", 50, required=True),
+        "balance": balance,
+        "account_type": _text(row, "account_type", 20, required=True),
+        "interest_rate": _decimal(row, "interest_rate", "0", Decimal("1000")),
+        "maturity_date": _date(row, "maturity_date"),
+        "product_name": _text(row, "product_name", 100),
+        "is_fixed_term": _bool(row, "is_fixed_term"),
+        "monthly_limit": _decimal(row, "monthly_limit", "0", Decimal("1e13")),
+        "auto_transfer": _bool(row, "auto_transfer"),
+        "note": _text(row, "note", 65535),
+    }
+
+
+# -----------------------------------------------------------
+# 청크 단위 INSERT
+# -----------------------------------------------------------
+class ImportResult:
+    def __init__(self):
+        self.total = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        # 커밋이 끝난 마지막 청크의 마지막 행 번호 (중단 시 이 다음 행부터 다시 보내면 됨)
+        self.committed_through_row = None
+
+    def error(self, row_no, account_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS_REPORTED:
+            self.errors.append({"row": row_no, "account_number": account_number, "error": message})
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "committed_through_row": self.committed_through_row,
+        }
+
+
+def _params(user_id, acc):
+    return (user_id,) + tuple(acc[c] for c in COLUMNS)
+
+
+def _insert_chunk(conn, user_id, chunk, result):
+    # chunk: [(행 번호, 검증된 dict)]
+    with conn.cursor() as cursor:
+        numbers = [acc["account_number"] for _, acc in chunk]
+        placeholders = ", ".join(["%s"] * len(numbers))
+        cursor.execute(f"SELECT account_number FROM account WHERE account_number IN ({placeholders})", numbers)
+        existing = {r["account_number"] for r in cursor.fetchall()}
+
+        rows = []
+        for row_no, acc in chunk:
+            if acc["account_number"] in existing:
+                result.error(row_no, acc["account_number"], "이미 등록된 계좌번호입니다 (uk_account_account_number)")
+            else:
+                rows.append((row_no, acc))
+        if not rows:
+            return
+
+        try:
+            # pymysql 이 다중 행 VALUES 한 문장으로 묶어서 전송
+            cursor.executemany(INSERT_SQL, [_params(user_id, acc) for _, acc in rows])
+            portfolio.apply_accounts_added(cursor, user_id, [acc for _, acc in rows])
+            conn.commit()
+            result.inserted += len(rows)
+            return
+        except pymysql.err.IntegrityError:
+            # 조회 이후 다른 요청이 같은 계좌번호를 넣은 경우 → 이 청크만 행 단위로 재시도
+            conn.rollback()
+
+        inserted = []
+        for row_no, acc in rows:
+            try:
+                cursor.execute("SAVEPOINT bulk_row")
+                cursor.execute(INSERT_SQL, _params(user_id, acc))
+                inserted.append(acc)
+            except pymysql.err.IntegrityError as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT bulk_row")
+                if e.args and e.args[0] == DUPLICATE_ENTRY:
+                    message = "이미 등록된 계좌번호입니다 (uk_account_account_number)"
+                else:
+                    message = str(e)
+                result.error(row_no, acc["account_number"], message)
+        portfolio.apply_accounts_added(cursor, user_id, inserted)
+        conn.commit()
+        result.inserted += len(inserted)
+
+
+def import_rows(conn, user_id, numbered_rows, chunk_size=500):
+    result = ImportResult()
+    try:
+        _import(conn, user_id, numbered_rows, chunk_size, result)
+    except Exception as e:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise ImportAborted(result, e) from e
+    return result
+
+
+def _import(conn, user_id, numbered_rows, chunk_size, result):
+    seen = set()
+    numbered_rows = iter(numbered_rows)
+    while True:
+        batch = list(islice(numbered_rows, chunk_size))
+        if not batch:
+            break
+        chunk = []
+        for row_no, raw in batch:
+            result.total += 1
+            try:
+                acc = validate_row(raw)
+            except RowError as e:
+                result.error(row_no, raw.get("account_number") if isinstance(raw, dict) else None, str(e))
+                continue
+            if acc["account_number"] in seen:
+                result.error(row_no, acc["account_number"], "요청 안에서 중복된 계좌번호입니다")
+                continue
+            seen.add(acc["account_number"])
+            chunk.append((row_no, acc))
+        if chunk:
+            _insert_chunk(conn, user_id, chunk, result)
+        result.committed_through_row = batch[-1][0]
@@ -0,0 +1,123 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# -----------------------------------------------------------
+# 대화 기록 저장소
+#   - SQLite 에 영구 저장, 최근 대화는 메모리(LRU)에 보관
+#   - 최근 max_turns 개 메시지는 원문 그대로, 그보다 오래된 메시지는
+#     pending 으로 옮긴 뒤 요약(summary)에 합쳐짐
+#   (메모리 계층은 이 프로세스만 쓴다는 전제. 여러 워커로 띄우면 sticky 라우팅 필요)
+# -----------------------------------------------------------
+class Conversation:
+    def __init__(self, summary="", pending=None, turns=None):
+        self.summary = summary
+        self.pending = pending or []   # 요약 대기 중인 오래된 메시지
+        self.turns = turns or []       # [{"role": ..., "content": ...}]
+
+    def is_empty(self):
+        return not (self.summary or self.pending or self.turns)
+
+
+class ConversationStore:
+    def __init__(self, path="conversations.db", max_turns=6, hot_size=1000, ttl_days=30):
+        self.max_turns = max_turns
+        self.hot_size = hot_size
+        self.ttl_seconds = ttl_days * 86400
+        self._lock = threading.Lock()
+        self._hot = OrderedDict()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS conversation (
+                conv_key   TEXT PRIMARY KEY,
+                summary    TEXT NOT NULL DEFAULT '',
+                pending    TEXT NOT NULL DEFAULT '[]',
+                turns      TEXT NOT NULL DEFAULT '[]',
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(user_id, session_id):
+        return f"{user_id}:{session_id}"
+
+    # ---------------- 내부 ----------------
+    def _get_locked(self, key):
+        conv = self._hot.get(key)
+        if conv is not None:
+            self._hot.move_to_end(key)
+            return conv
+        row = self._db.execute(
+            "SELECT summary, pending, turns, updated_at FROM conversation WHERE conv_key = ?", (key,)
+        ).fetchone()
+        if row and time.time() - row[3] < self.ttl_seconds:
+            conv = Conversation(row[0], json.loads(row[1]), json.loads(row[2]))
+        else:
+            conv = Conversation()
+        self._hot[key] = conv
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+        return conv
+
+    def _save_locked(self, key, conv):
+        self._db.execute(
+            """
+            INSERT INTO conversation (conv_key, summary, pending, turns, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(conv_key) DO UPDATE SET
+                summary = excluded.summary, pending = excluded.pending,
+                turns = excluded.turns, updated_at = excluded.updated_at
+            """,
+            (key, conv.summary, json.dumps(conv.pending, ensure_ascii=False),
+             json.dumps(conv.turns, ensure_ascii=False), time.time()),
+        )
+        self._db.commit()
+
+    # ---------------- 공개 API ----------------
+    def load(self, key):
+        with self._lock:
+            conv = self._get_locked(key)
+            return Conversation(conv.summary, list(conv.pending), list(conv.turns))
+
+    def append(self, key, user_message, answer):
+        # 새 대화 한 쌍을 추가. 요약이 필요하면 True
+        with self._lock:
+            conv = self._get_locked(key)
+            conv.turns.append({"role": "user", "content": user_message})
+            conv.turns.append({"role": "assistant", "content": answer})
+            overflow = len(conv.turns) - self.max_turns
+            if overflow > 0:
+                conv.pending.extend(conv.turns[:overflow])
+                del conv.turns[:overflow]
+            self._save_locked(key, conv)
+            return bool(conv.pending)
+
+    def take_pending(self, key):
+        with self._lock:
+            conv = self._get_locked(key)
+            return conv.summary, list(conv.pending)
+
+    def commit_summary(self, key, summary, summarized_count):
+        # 요약에 반영한 만큼만 pending 에서 제거 (요약 중 새로 밀려난 메시지는 유지)
+        with self._lock:
+            conv = self._get_locked(key)
+            conv.summary = summary
+            del conv.pending[:summarized_count]
+            self._save_locked(key, conv)
+
+    def reset(self, key):
+        with self._lock:
+            self._hot.pop(key, None)
+            self._db.execute("DELETE FROM conversation WHERE conv_key = ?", (key,))
+            self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            return {"hot": len(self._hot), "hot_size": self.hot_size, "max_turns": self.max_turns}
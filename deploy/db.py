@@ -1,16 +1,71 @@
 import pymysql
 from dotenv import load_dotenv
 import os
+import threading
+
+from db_pool import ConnectionPool
+from metrics import span
 
 load_dotenv()
 
+
+class TimedDictCursor(pymysql.cursors.DictCursor):
+    # 쿼리 실행 시간을 metrics 의 "db" 구간으로 기록
+    # (executemany 는 내부에서 execute 를 호출하므로 따로 감싸면 같은 시간이 두 번 더해짐)
+    def execute(self, query, args=None):
+        with span("db"):
+            return super().execute(query, args)
+
+
 DB_CONFIG = {
     "host": os.getenv("DB_HOST"),
+    "port": int(os.getenv("DB_PORT", "3306")),
     "user": os.getenv("DB_USER"),
     "password": os.getenv("DB_PASSWORD"),
     "db": os.getenv("DB_NAME"),
     "charset": "utf8mb4",
-    "cursorclass": pymysql.cursors.DictCursor
+    "cursorclass": TimedDictCursor
 }
+
+POOL_CONFIG = {
+    "min_size": int(os.getenv("DB_POOL_MIN", "2")),
+    "max_size": int(os.getenv("DB_POOL_MAX", "10")),
+    "idle_timeout": float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300")),
+    "wait_timeout": float(os.getenv("DB_POOL_WAIT_TIMEOUT", "5")),
+    "ping_interval": float(os.getenv("DB_POOL_PING_INTERVAL", "30")),
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+                try:
+                    pool.fill()
+                except Exception:
+                    # DB 가 아직 준비되지 않았으면 첫 요청 때 다시 연결을 시도함
+                    pass
+                _pool = pool
+    return _pool
+
+
+def reset_pool():
+    # fork 이후 부모 프로세스의 커넥션을 버리고 새 풀을 쓰도록 초기화
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
 def get_connection():
-    return pymysql.connect(**DB_CONFIG)
\ No newline at end of file
+    # 풀에서 커넥션을 빌려옴. close() 또는 with 블록 종료 시 풀로 반납됨
+    with span("db_pool_wait"):
+        return get_pool().get()
+
+
+def pool_stats():
+    return get_pool().stats()
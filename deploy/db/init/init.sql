@@ -35,5 +35,47 @@ CREATE TABLE IF NOT EXISTS account (
   note           TEXT                   DEFAULT NULL,
   PRIMARY KEY (id),
   UNIQUE KEY uk_account_account_number (account_number),
-  KEY idx_account_user_id (user_id)
+  -- 보조 인덱스는 INSERT 마다 함께 갱신되므로(일괄 등록 비용) 조회 경로마다 하나만 둠
+  -- /api/accounts 정렬용 (보조 인덱스 끝에 PK id 가 붙어 keyset 조건까지 인덱스로 처리)
+  -- user_id 로 시작하므로 WHERE user_id = ? 조회(계좌 목록/요약 재계산/AI 컨텍스트)와
+  -- account_type/bank_name 필터(한 사용자 행 안에서 거름)도 이 인덱스들이 처리
+  KEY idx_account_user_balance (user_id, balance),
+  KEY idx_account_user_rate (user_id, interest_rate),
+  KEY idx_account_user_maturity (user_id, maturity_date),
+  -- 관리자 집계용 커버링 인덱스 (analytics.py 참고)
+  KEY idx_account_bank_type_balance (bank_name, account_type, balance),
+  KEY idx_account_maturity_balance (maturity_date, balance)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- 사용자별 포트폴리오 요약 (계좌 추가 시 증분 갱신, portfolio.py 참고)
+CREATE TABLE IF NOT EXISTS portfolio_summary (
+  user_id              INT            NOT NULL,
+  account_count        INT            NOT NULL DEFAULT 0,
+  total_balance        DECIMAL(17,2)  NOT NULL DEFAULT 0.00,
+  rate_weighted_sum    DECIMAL(22,4)  NOT NULL DEFAULT 0.0000,  -- SUM(balance * interest_rate)
+  next_maturity_date   DATE                   DEFAULT NULL,
+  auto_transfer_count  INT            NOT NULL DEFAULT 0,
+  updated_at           DATETIME               DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS portfolio_summary_type (
+  user_id        INT            NOT NULL,
+  account_type   VARCHAR(20)    NOT NULL,
+  account_count  INT            NOT NULL DEFAULT 0,
+  total_balance  DECIMAL(17,2)  NOT NULL DEFAULT 0.00,
+  PRIMARY KEY (user_id, account_type)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- 로그아웃으로 폐기된 액세스 토큰 (auth_tokens.py). 워커가 id 순서로 새 행만 주기적으로 읽음
+-- expires_at 이 지난 행은 토큰 자체가 만료되었으므로 삭제해도 됨
+CREATE TABLE IF NOT EXISTS revoked_token (
+  id          BIGINT    NOT NULL AUTO_INCREMENT,
+  jti         CHAR(32)  NOT NULL,
+  user_id     INT       NOT NULL,
+  expires_at  DATETIME  NOT NULL,
+  revoked_at  DATETIME  DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (id),
+  UNIQUE KEY uq_revoked_token_jti (jti),
+  KEY idx_revoked_token_expires (expires_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
@@ -0,0 +1,231 @@
+import threading
+import time
+from collections import deque
+
+import pymysql
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+# -----------------------------------------------------------
+# 풀에서 빌려준 커넥션 (close / with 종료 시 풀로 반납)
+# -----------------------------------------------------------
+class PooledConnection:
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise pymysql.err.InterfaceError("connection already returned to pool")
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw)
+
+
+# -----------------------------------------------------------
+# 커넥션 풀
+# -----------------------------------------------------------
+class ConnectionPool:
+    def __init__(self, connect_kwargs, min_size=2, max_size=10,
+                 idle_timeout=300, wait_timeout=5, ping_interval=30):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("invalid pool size")
+        self._connect_kwargs = dict(connect_kwargs)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition()
+        self._idle = deque()          # (raw, 마지막 사용 시각)
+        self._size = 0                # 생성된 커넥션 수 (idle + 대여 중)
+        self._closed = False
+
+        # 지표
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_timeouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "ping_failures": 0,
+            "reaped": 0,
+        }
+
+        self._reaper = threading.Thread(target=self._reap_loop, name="db-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    # ---------------- 내부 ----------------
+    def _connect(self):
+        raw = pymysql.connect(**self._connect_kwargs)
+        with self._cond:
+            self._stats["created"] += 1
+        return raw
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats["closed"] += 1
+            self._cond.notify()
+
+    def _is_alive(self, raw, last_used):
+        # 최근에 쓴 커넥션은 ping 생략 (체크아웃마다 왕복 1회를 아끼기 위함)
+        if time.monotonic() - last_used < self.ping_interval:
+            return True
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            with self._cond:
+                self._stats["ping_failures"] += 1
+            return False
+
+    def _release(self, raw):
+        try:
+            # 열린 트랜잭션/스냅샷이 다음 요청으로 새지 않도록 정리
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                self._stats["closed"] += 1
+                raw.close()
+                return
+            self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+
+    def _reap_loop(self):
+        interval = max(1, min(self.idle_timeout, 30))
+        while True:
+            time.sleep(interval)
+            if self._closed:
+                return
+            self.reap()
+
+    # ---------------- 공개 API ----------------
+    def get(self):
+        start = time.monotonic()
+        deadline = start + self.wait_timeout
+        waited = False
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise pymysql.err.InterfaceError("pool is closed")
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["wait_timeouts"] += 1
+                        raise PoolTimeout(
+                            f"DB 커넥션 대기 시간 초과 ({self.wait_timeout}s, max={self.max_size})"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+                if self._idle:
+                    # LIFO: 최근 사용한 커넥션을 우선 사용해 오래된 것은 자연스럽게 정리되게 함
+                    raw, last_used = self._idle.pop()
+                else:
+                    raw, last_used = None, None
+                    self._size += 1
+                self._record_checkout(start, waited)
+
+            if raw is None:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                return PooledConnection(self, raw)
+
+            if self._is_alive(raw, last_used):
+                return PooledConnection(self, raw)
+            self._discard(raw)
+
+    def _record_checkout(self, start, waited):
+        self._stats["checkouts"] += 1
+        if waited:
+            elapsed = time.monotonic() - start
+            self._stats["waits"] += 1
+            self._stats["wait_time_total"] += elapsed
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], elapsed)
+
+    def fill(self):
+        # 최소 커넥션 수까지 미리 채움
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+
+    def reap(self):
+        # idle_timeout 을 넘긴 유휴 커넥션을 min_size 까지 정리
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            while self._idle and self._size - len(expired) > self.min_size:
+                raw, last_used = self._idle[0]
+                if now - last_used < self.idle_timeout:
+                    break
+                self._idle.popleft()
+                expired.append(raw)
+            self._stats["reaped"] += len(expired)
+        for raw in expired:
+            self._discard(raw)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = [raw for raw, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._stats["closed"] += len(idle)
+            self._cond.notify_all()
+        for raw in idle:
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._cond:
+            s = dict(self._stats)
+            s.update(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._size - len(self._idle),
+                min_size=self.min_size,
+                max_size=self.max_size,
+            )
+        s["wait_time_avg"] = s["wait_time_total"] / s["waits"] if s["waits"] else 0.0
+        return s
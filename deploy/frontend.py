@@ -1,9 +1,24 @@
+import json
+import uuid
 import streamlit as st
 import requests
+import tracing
 import pandas as pd
 
 # API_BASE = "http://127.0.0.1:5000"  # 필요한 경우 실제 서버 주소로 변경
 API_BASE = "http://apiserver:5000"
+
+
+def api_post(path, **kwargs):
+    # 요청마다 UI span 을 열고 traceparent 헤더로 API 서버에 전달 (분산 추적의 시작점)
+    # 로그인 후에는 발급받은 액세스 토큰을 Authorization 헤더로 보냄
+    headers = kwargs.pop("headers", None) or {}
+    if st.session_state.get("token"):
+        headers["Authorization"] = f"Bearer {st.session_state.token}"
+    with tracing.start_span(f"ui POST {path}"):
+        return requests.post(f"{API_BASE}{path}", headers=tracing.inject(headers), **kwargs)
+
+
 # 세션 상태 초기화
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
@@ -15,12 +30,42 @@ if "user_id" not in st.session_state:
     st.session_state.user_id = None
 if "accounts" not in st.session_state:
     st.session_state.accounts = []
+if "accounts_cursor" not in st.session_state:
+    st.session_state.accounts_cursor = None
 if "ai_mode" not in st.session_state:
     st.session_state.ai_mode = False
 if "messages" not in st.session_state:
     st.session_state.messages = []
 if "login_pw" not in st.session_state:
     st.session_state.login_pw = ""
+if not st.session_state.get("chat_session_id"):
+    # 서버 측 대화 기록을 구분하는 키 (탭/세션마다 새로 생성)
+    st.session_state.chat_session_id = uuid.uuid4().hex
+
+# 대시보드 표에 쓰는 컬럼만 한 페이지씩 조회 (메모 등 큰 컬럼은 제외)
+ACCOUNTS_PAGE_SIZE = 50
+ACCOUNT_TABLE_FIELDS = [
+    "account_number", "bank_name", "product_name", "account_type", "balance",
+    "interest_rate", "maturity_date", "monthly_limit", "auto_transfer",
+]
+
+
+def load_accounts(cursor=None):
+    res = api_post("/api/accounts", json={
+        "fields": ACCOUNT_TABLE_FIELDS,
+        "sort": "-balance",
+        "limit": ACCOUNTS_PAGE_SIZE,
+        "cursor": cursor,
+    })
+    if res.status_code != 200:
+        return False
+    data = res.json()
+    page = data.get("accounts", [])
+    st.session_state.accounts = (st.session_state.accounts or []) + page if cursor else page
+    st.session_state.accounts_cursor = data.get("next_cursor")
+    return True
+
+
 # 🔐 로그인 화면
 def show_login():
     st.header("🔐 나만의 용돈관리 프로그램")
@@ -38,7 +83,7 @@ def show_login():
             st.error("아이디와 비밀번호를 입력하세요.")
         else:
             try:
-                res = requests.post(f"{API_BASE}/api/login", json={
+                res = api_post("/api/login", json={
                     "username": username,
                     "password": password
                 })
@@ -47,7 +92,8 @@ def show_login():
                     st.session_state.logged_in = True
                     st.session_state.current_user = username
                     st.session_state.user_id = data["user_id"]
-                    st.session_state.accounts = data.get("accounts", [])
+                    st.session_state.token = data.get("token")
+                    load_accounts()
                     st.success("✅ 로그인 성공!")
                     st.rerun()
                 else:
@@ -84,7 +130,7 @@ def show_register():
             st.error("❌ 비밀번호가 일치하지 않습니다.")
         else:
             try:
-                res = requests.post(f"{API_BASE}/register", json={
+                res = api_post("/register", json={
                     "username": username,
                     "password": password,
                     "email": email,
@@ -134,8 +180,7 @@ def show_main():
     if submitted:
         try:
             # 👉 POST 요청으로 계좌 등록
-            res = requests.post(f"{API_BASE}/api/add_account", json={
-                "user_id": st.session_state.user_id,
+            res = api_post("/api/add_account", json={
                 "account_number": account_number,
                 "bank_name": bank_name,
                 "balance": balance,
@@ -153,19 +198,13 @@ def show_main():
                 st.success("✅ 계좌가 등록되었습니다!")
 
                 # 🔄 계좌 다시 불러오기 (📌 이게 핵심!)
-                acc_res = requests.post(f"{API_BASE}/api/accounts", json={
-                    "user_id": st.session_state.user_id
-                })
-
-                if acc_res.status_code == 200:
-                    st.session_state.accounts = acc_res.json().get("accounts", [])
-                else:
+                if not load_accounts():
                     st.warning("계좌 새로고침 실패")
 
                 st.rerun()  # 📢 화면 갱신!
 
                 # 🔄 계좌 정보 갱신을 위해 로그인 다시 호출
-                login_res = requests.post(f"{API_BASE}/api/login", json={
+                login_res = api_post("/api/login", json={
                     "username": st.session_state.current_user,
                     "password": st.session_state.login_pw  # 주의: session_state에 있어야 함
                 })
@@ -190,6 +229,20 @@ def show_main():
 
     st.markdown("---")
 
+    # 📈 포트폴리오 요약 (서버에서 미리 집계된 값)
+    if st.session_state.accounts:
+        try:
+            sum_res = api_post("/api/summary", json={})
+            if sum_res.status_code == 200:
+                summary = sum_res.json()["summary"]
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("총 잔액", f"{float(summary['total_balance']):,.0f}원")
+                col2.metric("평균 금리(잔액가중)", f"{float(summary['weighted_avg_interest_rate']):.2f}%")
+                col3.metric("다음 만기일", summary["next_maturity_date"] or "-")
+                col4.metric("자동이체", f"{summary['auto_transfer_count']}건")
+        except Exception:
+            st.warning("요약 정보를 불러오지 못했습니다.")
+
     # ▶ 기존 계좌 출력
     if st.session_state.accounts:
         st.subheader("📒 현재 계좌 정보")
@@ -207,6 +260,9 @@ def show_main():
             "note": "비고"
         })
         st.dataframe(df, use_container_width=True)
+        if st.session_state.accounts_cursor and st.button("더 보기"):
+            load_accounts(st.session_state.accounts_cursor)
+            st.rerun()
     else:
         st.info("등록된 계좌 정보가 없습니다.")
 
@@ -219,10 +275,41 @@ def show_main():
 
     with col2:
         if st.button("🔓 로그아웃", use_container_width=True):
+            try:
+                # 서버에서 토큰 폐기 (실패해도 화면 상태는 초기화)
+                api_post("/api/logout", timeout=5)
+            except requests.RequestException:
+                pass
             for key in list(st.session_state.keys()):
                 if not key.startswith("FormSubmitter"):
                     st.session_state[key] = None
             st.rerun()
+def iter_sse(res):
+    # "data: {...}" 줄 단위로 이벤트를 꺼냄 ("data: [DONE]" 에서 종료)
+    for line in res.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        yield json.loads(data)
+
+
+def answer_bubble(content):
+    return f"""
+                      <div style='
+                          background-color:#D8F6CE;
+                          padding:10px;
+                          border-radius:8px;
+                          margin-bottom:10px;
+                          width:fit-content;
+                          max-width:80%;
+                          '>
+                          <b>답변:</b><br>{content}
+                      </div>
+                      """
+
+
 def show_ai_chat():
     st.title("💬 AI 금융 분석 챗봇")
     st.markdown("💡 질문을 입력하시면 AI가 분석하여 답변을 제공합니다.")
@@ -241,21 +328,7 @@ def show_ai_chat():
                     unsafe_allow_html=True
                 )
             else:
-                st.markdown(
-                      f"""
-                      <div style='
-                          background-color:#D8F6CE;
-                          padding:10px;
-                          border-radius:8px;
-                          margin-bottom:10px;
-                          width:fit-content;
-                          max-width:80%;
-                          '>
-                          <b>답변:</b><br>{msg["content"]}
-                      </div>
-                      """,
-                      unsafe_allow_html=True
-                  )
+                st.markdown(answer_bubble(msg["content"]), unsafe_allow_html=True)
 
     # ✍️ 사용자 입력
     user_input = st.text_area("질문 입력", height=100, key="input_box")
@@ -265,18 +338,29 @@ def show_ai_chat():
             # 사용자 질문 추가
             st.session_state.messages.append({"role": "user", "content": user_input})
 
-            # 서버로 질문 전송
-            try:
-                res = requests.post(f"{API_BASE}/ask", json={
-                    "user_id": st.session_state.user_id,
-                    "message": user_input
-                })
-                if res.status_code == 200:
-                    answer = res.json()["response"]
-                else:
-                    answer = "❗ 서버 응답 오류가 발생했습니다."
-            except Exception as e:
-                answer = f"❌ 서버 오류: {e}"
+            # 서버로 질문 전송 (스트리밍으로 받아 도착하는 대로 표시)
+            placeholder = st.empty()
+            answer = ""
+            # 질문 한 번(스트림 수신 완료까지)을 하나의 trace 로 묶음
+            with tracing.start_span("ui chat_turn"):
+                try:
+                    with api_post("/ask/stream", json={
+                        "session_id": st.session_state.chat_session_id,
+                        "message": user_input
+                    }, stream=True, timeout=(5, 120)) as res:
+                        if res.status_code != 200:
+                            answer = "❗ 서버 응답 오류가 발생했습니다."
+                        elif not res.headers.get("Content-Type", "").startswith("text/event-stream"):
+                            answer = res.json()["response"]
+                        else:
+                            for event in iter_sse(res):
+                                if "error" in event:
+                                    answer += f"\n\n❗ {event['error']}"
+                                    break
+                                answer += event.get("delta", "")
+                                placeholder.markdown(answer_bubble(answer), unsafe_allow_html=True)
+                except Exception as e:
+                    answer = f"❌ 서버 오류: {e}"
 
             # 답변 저장
             st.session_state.messages.append({"role": "assistant", "content": answer})
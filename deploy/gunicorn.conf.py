@@ -0,0 +1,66 @@
+# gunicorn 설정 (api_server 운영 모드)
+#   실행: gunicorn -c gunicorn.conf.py api_server:app
+#   무중단 재시작: kill -HUP <master pid>
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+
+# CPU 코어 기준 워커 수 (WEB_CONCURRENCY 로 덮어쓰기 가능)
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# 워커마다 만드는 bcrypt 프로세스 풀/대기 상한을 호스트 전체 기준으로 나누는 데 사용 (password_hasher.py)
+os.environ.setdefault("GUNICORN_WORKERS", str(workers))
+
+# /ask 처럼 I/O 대기가 긴 요청이 있어 스레드 워커 사용
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# 앱 코드는 마스터에서 한 번만 로드하고, DB 풀은 워커마다 fork 이후 새로 채움
+preload_app = True
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "90"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+# nginx.conf 에 upstream keepalive 풀이 없어 요청마다 새 커넥션을 쓰므로 keep-alive 는 끔.
+# 켜 두면 max_requests 로 교체되는 워커가 유휴 keep-alive 소켓을 닫는 순간 같은 소켓으로
+# 보낸 요청이 연결 오류가 됨 (README 의 벤치마크 참고)
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "0"))
+
+# 메모리 누수 대비 주기적 워커 교체 (동시에 재시작되지 않도록 지터 추가)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = 200
+
+# 요청 로그는 앱의 JSON 접근 로그(access_log.py)가 남김
+accesslog = None
+errorlog = "-"
+
+# 워커별 메트릭을 합쳐서 /metrics 로 보여주기 위한 공유 디렉터리 (앱 로드 전에 설정)
+os.environ.setdefault("METRICS_DIR", "/dev/shm/account_system_metrics" if os.path.isdir("/dev/shm")
+                      else os.path.join(tempfile.gettempdir(), "account_system_metrics"))
+
+
+def on_starting(server):
+    # 이전 실행의 워커 스냅샷 정리
+    shutil.rmtree(os.environ["METRICS_DIR"], ignore_errors=True)
+
+
+def post_fork(server, worker):
+    # 마스터에서 만든 소켓을 워커끼리 공유하지 않도록 풀을 새로 만들고 미리 채움
+    import db
+
+    db.reset_pool()
+    try:
+        db.get_pool()
+    except Exception as e:
+        server.log.warning("DB pool warm-up failed in worker %s: %s", worker.pid, e)
+
+
+def worker_exit(server, worker):
+    # max_requests 교체/종료 시 마지막 주기(METRICS_FLUSH_INTERVAL) 동안 쌓인 카운트를 스냅샷에 남김
+    import metrics
+
+    try:
+        metrics.flush()
+    except OSError as e:
+        server.log.warning("metrics flush failed in worker %s: %s", worker.pid, e)
@@ -0,0 +1,396 @@
+# 공용 계측 모듈 (api_server / ai_server)
+#   - Counter / Histogram 과 Prometheus 텍스트 형식 /metrics
+#   - 요청 미들웨어: 라우트별 요청 수, 처리 시간
+#   - span("db") 처럼 구간 시간을 재서 히스토그램 + 현재 요청의 구간별 누적 시간(request_timings)에 기록
+#   - OpenAI usage 토큰 카운터
+# gunicorn 처럼 여러 프로세스로 뜨는 경우 METRICS_DIR 을 지정하면 워커마다 주기적으로 스냅샷을 쓰고,
+# /metrics 는 모든 워커(종료된 워커 누적분 포함)를 합쳐서 보여줌
+# /metrics 는 X-Admin-Token 헤더가 ADMIN_TOKEN 과 같을 때만 응답 (미설정 시 403)
+import contextlib
+import contextvars
+import fcntl
+import json
+import math
+import os
+import threading
+import time
+
+import tracing
+from service_auth import is_admin_token
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+
+# -----------------------------------------------------------
+# 메트릭 타입
+# -----------------------------------------------------------
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.register(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(k), v] for k, v in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help_text, labelnames)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[0][i] += 1
+                    break
+            data[1] += value
+            data[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(k), [list(d[0]), d[1], d[2]]] for k, d in self._values.items()]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+
+    def snapshot(self):
+        return {
+            m.name: {
+                "type": m.kind,
+                "help": m.help,
+                "labelnames": list(m.labelnames),
+                "buckets": list(getattr(m, "buckets", ())),
+                "values": m.snapshot(),
+            }
+            for m in self._metrics.values()
+        }
+
+
+REGISTRY = Registry()
+
+
+# -----------------------------------------------------------
+# 여러 워커 합치기 (METRICS_DIR)
+# -----------------------------------------------------------
+def _merge(target, snapshot):
+    for name, metric in snapshot.items():
+        entry = target.setdefault(name, {**metric, "values": {}})
+        values = entry["values"] if isinstance(entry["values"], dict) else {}
+        entry["values"] = values
+        for labels, value in metric["values"]:
+            key = tuple(labels)
+            if metric["type"] == "counter":
+                values[key] = values.get(key, 0) + value
+            else:
+                prev = values.get(key)
+                if prev is None:
+                    values[key] = [list(value[0]), value[1], value[2]]
+                else:
+                    prev[0] = [a + b for a, b in zip(prev[0], value[0])]
+                    prev[1] += value[1]
+                    prev[2] += value[2]
+    return target
+
+
+def _to_list(merged):
+    return {
+        name: {**metric, "values": [[list(k), v] for k, v in metric["values"].items()]}
+        for name, metric in merged.items()
+    }
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _write_json(path, data):
+    # 주기 flush 스레드와 worker_exit 의 flush 가 겹쳐도 임시 파일이 섞이지 않도록 스레드별 이름 사용
+    tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def flush():
+    if METRICS_DIR:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        _write_json(os.path.join(METRICS_DIR, f"{os.getpid()}.json"), REGISTRY.snapshot())
+
+
+def _collect_all():
+    own = os.getpid()
+    merged = _merge({}, REGISTRY.snapshot())
+    if not METRICS_DIR or not os.path.isdir(METRICS_DIR):
+        return _to_list(merged)
+
+    archive_path = os.path.join(METRICS_DIR, "_archive.json")
+    with open(os.path.join(METRICS_DIR, "_lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            archive = {}
+            if os.path.exists(archive_path):
+                with open(archive_path, encoding="utf-8") as f:
+                    archive = _merge({}, json.load(f))
+            archive_changed = False
+            for name in os.listdir(METRICS_DIR):
+                if not name.endswith(".json") or name.startswith("_"):
+                    continue
+                pid = int(name[:-5])
+                if pid == own:
+                    continue
+                path = os.path.join(METRICS_DIR, name)
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        snapshot = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if _pid_alive(pid):
+                    _merge(merged, snapshot)
+                else:
+                    # 종료된 워커 값은 누적 파일로 옮겨 카운터가 줄어들지 않게 함
+                    _merge(archive, snapshot)
+                    os.unlink(path)
+                    archive_changed = True
+            if archive_changed:
+                _write_json(archive_path, _to_list(archive))
+            _merge(merged, _to_list(archive))
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    return _to_list(merged)
+
+
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+def _ensure_flusher():
+    # fork 이후 워커마다 한 번씩 시작 (preload 된 마스터의 스레드는 fork 되지 않음)
+    global _flusher_pid
+    if not METRICS_DIR or _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+
+        def loop():
+            while True:
+                time.sleep(FLUSH_INTERVAL)
+                try:
+                    flush()
+                except OSError:
+                    pass
+
+        threading.Thread(target=loop, name="metrics-flush", daemon=True).start()
+
+
+# -----------------------------------------------------------
+# 텍스트 출력
+# -----------------------------------------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + [f'{n}="{v}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value):
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    lines = []
+    for name, metric in sorted(_collect_all().items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        names = metric["labelnames"]
+        for labels, value in sorted(metric["values"]):
+            if metric["type"] == "counter":
+                lines.append(f"{name}{_labels(names, labels)} {_fmt(value)}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, c in zip(metric["buckets"], counts):
+                cumulative += c
+                lines.append(f"{name}_bucket{_labels(names, labels, [('le', _fmt(float(bound)))])} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(names, labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{_labels(names, labels)} {_fmt(float(total))}")
+            lines.append(f"{name}_count{_labels(names, labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------------------------------------
+# 공용 메트릭 / 구간(span) 측정
+# -----------------------------------------------------------
+_server = os.getenv("METRICS_SERVER_NAME", "")
+
+http_requests = Counter(
+    "http_requests_total", "HTTP 요청 수", ("server", "method", "route", "status"))
+http_duration = Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간 (스트리밍은 응답 시작까지)", ("server", "method", "route"))
+span_duration = Histogram(
+    "span_duration_seconds", "요청 내부 구간별 소요 시간", ("server", "span"))
+openai_tokens = Counter(
+    "openai_tokens_total", "OpenAI usage 기준 토큰 수", ("model", "type"))
+
+_request = contextvars.ContextVar("metrics_request", default=None)
+
+
+def start_request():
+    # 현재 요청의 구간별 누적 시간/토큰 기록 시작. reset_request 에 넘길 토큰 반환
+    return _request.set({"spans": {}, "tokens": {}})
+
+
+def reset_request(token):
+    _request.reset(token)
+
+
+def request_timings():
+    # {"spans": {"db": 초, ...}, "tokens": {"prompt": n, "completion": n}} (요청 밖이면 None)
+    return _request.get()
+
+
+def observe_span(name, elapsed):
+    span_duration.observe(elapsed, server=_server, span=name)
+    current = _request.get()
+    if current is not None:
+        current["spans"][name] = current["spans"].get(name, 0.0) + elapsed
+
+
+@contextlib.contextmanager
+def span(name):
+    # 같은 구간을 분산 추적(tracing)에도 하위 span 으로 기록
+    start = time.perf_counter()
+    try:
+        with tracing.start_span(name):
+            yield
+    finally:
+        observe_span(name, time.perf_counter() - start)
+
+
+def record_usage(model, usage):
+    # OpenAI 응답의 usage (prompt_tokens / completion_tokens)
+    if usage is None:
+        return
+    current = _request.get()
+    for kind in ("prompt", "completion"):
+        n = getattr(usage, f"{kind}_tokens", None) or 0
+        if n:
+            openai_tokens.inc(n, model=model, type=kind)
+            if current is not None:
+                current["tokens"][kind] = current["tokens"].get(kind, 0) + n
+
+
+def observe_request(method, route, status, elapsed):
+    http_requests.inc(server=_server, method=method, route=route, status=status)
+    http_duration.observe(elapsed, server=_server, method=method, route=route)
+    _ensure_flusher()
+
+
+# -----------------------------------------------------------
+# 프레임워크 연동
+# -----------------------------------------------------------
+def init_flask(app, server):
+    from flask import Response, g, request
+
+    global _server
+    _server = server
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_start = time.perf_counter()
+        g._metrics_token = start_request()
+
+    @app.after_request
+    def _metrics_finish(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            observe_request(request.method, route, response.status_code, time.perf_counter() - start)
+        return response
+
+    @app.teardown_request
+    def _metrics_teardown(exc):
+        token = g.pop("_metrics_token", None)
+        if token is not None:
+            reset_request(token)
+
+    @app.get("/metrics")
+    def metrics_endpoint():
+        if not is_admin_token(request.headers.get("X-Admin-Token")):
+            return Response("관리자 권한이 필요합니다.\n", status=403, mimetype="text/plain")
+        return Response(render(), mimetype=CONTENT_TYPE)
+
+
+def init_fastapi(app, server):
+    from fastapi import Request
+    from fastapi.responses import PlainTextResponse
+
+    global _server
+    _server = server
+
+    @app.middleware("http")
+    async def _metrics_middleware(request, call_next):
+        token = start_request()
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            observe_request(request.method, getattr(route, "path", "unmatched"), status,
+                            time.perf_counter() - start)
+            reset_request(token)
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics_endpoint(request: Request):
+        if not is_admin_token(request.headers.get("x-admin-token")):
+            return PlainTextResponse("관리자 권한이 필요합니다.\n", status_code=403)
+        return PlainTextResponse(render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+from metrics import span
+
+
+class HasherBusyError(Exception):
+    pass
+
+
+# -----------------------------------------------------------
+# 워커 프로세스에서 실행되는 함수 (pickle 가능하도록 모듈 최상위에 둠)
+# -----------------------------------------------------------
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _verify(hashed: str, password: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except ValueError:
+        # 잘못된 형식의 해시
+        return False
+
+
+def hash_rounds(hashed: str) -> int:
+    # "$2b$12$..." → 12
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def server_workers() -> int:
+    # 같은 호스트에서 해셔를 따로 띄우는 웹 워커 수 (gunicorn.conf.py 가 GUNICORN_WORKERS 로 알려줌)
+    return max(1, int(os.getenv("GUNICORN_WORKERS", "1")))
+
+
+def process_share(total: int) -> int:
+    # 호스트 전체 상한을 웹 워커 하나의 몫으로 나눔
+    return max(1, total // server_workers())
+
+
+# -----------------------------------------------------------
+# bcrypt 연산을 프로세스 풀로 넘겨 요청 스레드를 막지 않도록 함
+#   풀과 대기 상한은 웹 워커(프로세스)마다 따로 있으므로, 기본값은 호스트 전체가
+#   CPU 코어 수만큼의 bcrypt 프로세스를 쓰도록 웹 워커 수로 나눈 값
+# -----------------------------------------------------------
+class PasswordHasher:
+    def __init__(self, rounds=12, workers=None, max_pending=64,
+                 acquire_timeout=5, timeout=30):
+        self.rounds = rounds
+        self.workers = workers or process_share(os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self.acquire_timeout = acquire_timeout
+        self.timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = 0
+        self._stats = {"hashed": 0, "verified": 0, "rejected": 0, "peak_pending": 0}
+
+    def _get_executor(self):
+        # 첫 사용 시 생성 (gunicorn 등에서 fork 이후에 만들어지도록)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise HasherBusyError("인증 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.")
+        with self._lock:
+            self._pending += 1
+            self._stats["peak_pending"] = max(self._stats["peak_pending"], self._pending)
+        try:
+            with span("bcrypt" + fn.__name__):
+                return self._get_executor().submit(fn, *args).result(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        result = self._run(_hash, password, self.rounds)
+        with self._lock:
+            self._stats["hashed"] += 1
+        return result
+
+    def verify(self, hashed: str, password: str) -> bool:
+        result = self._run(_verify, hashed, password)
+        with self._lock:
+            self._stats["verified"] += 1
+        return result
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return hash_rounds(hashed) != self.rounds
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s.update(
+                pending=self._pending,
+                # 워커 수를 넘는 요청은 풀 내부 큐에서 대기 중
+                queued=max(0, self._pending - self.workers),
+                workers=self.workers,
+                max_pending=self.max_pending,
+                rounds=self.rounds,
+            )
+        return s
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
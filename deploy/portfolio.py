@@ -0,0 +1,230 @@
+# 사용자별 포트폴리오 요약 (portfolio_summary / portfolio_summary_type)
+#   계좌 추가 트랜잭션 안에서 증분 갱신하고, 조회는 PK 조회만으로 처리
+#   기존 데이터 백필: python portfolio.py --rebuild-all
+import datetime
+from decimal import Decimal
+
+
+def _to_date(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def _dec(value):
+    return Decimal(str(value or 0))
+
+
+# -----------------------------------------------------------
+# 증분 갱신 (호출한 쪽의 트랜잭션 안에서 실행, commit 은 호출한 쪽에서)
+# -----------------------------------------------------------
+def apply_accounts_added(cursor, user_id, accounts):
+    if not accounts:
+        return
+    # 요약 행이 없는 기존 사용자(백필 전)에 증분만 더하면 방금 넣은 계좌만 센 행이 생기고,
+    # 그 뒤로는 get_summary 가 재계산하지 않으므로 이 경우 전체 계산
+    # (새 계좌 행은 같은 트랜잭션 안이라 재계산에 포함됨)
+    cursor.execute("SELECT user_id FROM portfolio_summary WHERE user_id = %s FOR UPDATE", (user_id,))
+    if cursor.fetchone() is None:
+        rebuild_summary(cursor, user_id)
+        return
+
+    today = datetime.date.today()
+    total = sum(_dec(acc.get("balance")) for acc in accounts)
+    weighted = sum(_dec(acc.get("balance")) * _dec(acc.get("interest_rate")) for acc in accounts)
+    future = [d for d in (_to_date(acc.get("maturity_date")) for acc in accounts) if d and d >= today]
+    next_maturity = min(future) if future else None
+    auto_count = sum(1 for acc in accounts if acc.get("auto_transfer"))
+
+    # 저장된 다음 만기일이 이미 지났으면(stale) 그대로 두고 조회 시 다시 계산
+    cursor.execute(
+        """
+        INSERT INTO portfolio_summary (
+            user_id, account_count, total_balance, rate_weighted_sum,
+            next_maturity_date, auto_transfer_count
+        ) VALUES (%s, %s, %s, %s, %s, %s) AS new
+        ON DUPLICATE KEY UPDATE
+            account_count = portfolio_summary.account_count + new.account_count,
+            total_balance = portfolio_summary.total_balance + new.total_balance,
+            rate_weighted_sum = portfolio_summary.rate_weighted_sum + new.rate_weighted_sum,
+            auto_transfer_count = portfolio_summary.auto_transfer_count + new.auto_transfer_count,
+            next_maturity_date = CASE
+                WHEN new.next_maturity_date IS NULL THEN portfolio_summary.next_maturity_date
+                WHEN portfolio_summary.next_maturity_date IS NULL THEN new.next_maturity_date
+                WHEN portfolio_summary.next_maturity_date < CURDATE() THEN portfolio_summary.next_maturity_date
+                ELSE LEAST(portfolio_summary.next_maturity_date, new.next_maturity_date)
+            END
+        """,
+        (user_id, len(accounts), total, weighted, next_maturity, auto_count),
+    )
+
+    by_type = {}
+    for acc in accounts:
+        count, balance = by_type.get(acc.get("account_type"), (0, Decimal(0)))
+        by_type[acc.get("account_type")] = (count + 1, balance + _dec(acc.get("balance")))
+    cursor.executemany(
+        """
+        INSERT INTO portfolio_summary_type (user_id, account_type, account_count, total_balance)
+        VALUES (%s, %s, %s, %s) AS new
+        ON DUPLICATE KEY UPDATE
+            account_count = portfolio_summary_type.account_count + new.account_count,
+            total_balance = portfolio_summary_type.total_balance + new.total_balance
+        """,
+        [(user_id, t, count, balance) for t, (count, balance) in by_type.items()],
+    )
+
+
+def init_summary(cursor, user_id):
+    # 회원가입 시 빈 요약 행 생성 (행이 없으면 백필이 필요한 기존 사용자로 간주)
+    cursor.execute("INSERT IGNORE INTO portfolio_summary (user_id) VALUES (%s)", (user_id,))
+
+
+# -----------------------------------------------------------
+# 전체 재계산 (백필/불일치 복구용)
+# -----------------------------------------------------------
+def rebuild_summary(cursor, user_id):
+    cursor.execute(
+        """
+        SELECT COUNT(*) AS account_count,
+               COALESCE(SUM(balance), 0) AS total_balance,
+               COALESCE(SUM(balance * interest_rate), 0) AS rate_weighted_sum,
+               MIN(CASE WHEN maturity_date >= CURDATE() THEN maturity_date END) AS next_maturity_date,
+               COALESCE(SUM(auto_transfer <> 0), 0) AS auto_transfer_count
+        FROM account WHERE user_id = %s
+        """,
+        (user_id,),
+    )
+    row = cursor.fetchone()
+    cursor.execute(
+        """
+        REPLACE INTO portfolio_summary (
+            user_id, account_count, total_balance, rate_weighted_sum,
+            next_maturity_date, auto_transfer_count
+        ) VALUES (%s, %s, %s, %s, %s, %s)
+        """,
+        (user_id, row["account_count"], row["total_balance"], row["rate_weighted_sum"],
+         row["next_maturity_date"], row["auto_transfer_count"]),
+    )
+    cursor.execute("DELETE FROM portfolio_summary_type WHERE user_id = %s", (user_id,))
+    cursor.execute(
+        """
+        INSERT INTO portfolio_summary_type (user_id, account_type, account_count, total_balance)
+        SELECT user_id, account_type, COUNT(*), SUM(balance)
+        FROM account WHERE user_id = %s GROUP BY user_id, account_type
+        """,
+        (user_id,),
+    )
+
+
+def refresh_next_maturity(cursor, user_id):
+    cursor.execute(
+        """
+        UPDATE portfolio_summary
+        SET next_maturity_date = (
+            SELECT MIN(maturity_date) FROM account
+            WHERE user_id = %s AND maturity_date >= CURDATE()
+        )
+        WHERE user_id = %s
+        """,
+        (user_id, user_id),
+    )
+
+
+# -----------------------------------------------------------
+# 조회
+# -----------------------------------------------------------
+def _load(cursor, user_id):
+    cursor.execute(
+        """
+        SELECT account_count, total_balance, rate_weighted_sum,
+               next_maturity_date, auto_transfer_count, updated_at
+        FROM portfolio_summary WHERE user_id = %s
+        """,
+        (user_id,),
+    )
+    return cursor.fetchone()
+
+
+def get_summary(conn, user_id):
+    with conn.cursor() as cursor:
+        row = _load(cursor, user_id)
+        if row is None:
+            # 요약 행이 없는 기존 사용자 → 한 번만 전체 계산
+            rebuild_summary(cursor, user_id)
+            conn.commit()
+            row = _load(cursor, user_id)
+        elif row["next_maturity_date"] is not None and row["next_maturity_date"] < datetime.date.today():
+            # 다음 만기일이 지났으면 그 필드만 다시 계산
+            refresh_next_maturity(cursor, user_id)
+            conn.commit()
+            row = _load(cursor, user_id)
+
+        cursor.execute(
+            """
+            SELECT account_type, account_count, total_balance
+            FROM portfolio_summary_type WHERE user_id = %s
+            """,
+            (user_id,),
+        )
+        types = cursor.fetchall()
+    return _summary_dict(row, types)
+
+
+def summarize_accounts(accounts):
+    # 이미 읽어 온 계좌 행으로 get_summary 와 같은 값을 계산 (요약 테이블을 읽을 수 없는 api_server_async 용)
+    today = datetime.date.today()
+    future = [d for d in (_to_date(acc.get("maturity_date")) for acc in accounts) if d and d >= today]
+    row = {
+        "account_count": len(accounts),
+        "total_balance": sum((_dec(acc.get("balance")) for acc in accounts), Decimal(0)),
+        "rate_weighted_sum": sum(
+            (_dec(acc.get("balance")) * _dec(acc.get("interest_rate")) for acc in accounts), Decimal(0)),
+        "next_maturity_date": min(future) if future else None,
+        "auto_transfer_count": sum(1 for acc in accounts if acc.get("auto_transfer")),
+    }
+    by_type = {}
+    for acc in accounts:
+        count, balance = by_type.get(acc.get("account_type"), (0, Decimal(0)))
+        by_type[acc.get("account_type")] = (count + 1, balance + _dec(acc.get("balance")))
+    types = [
+        {"account_type": t, "account_count": count, "total_balance": balance}
+        for t, (count, balance) in by_type.items()
+    ]
+    return _summary_dict(row, types)
+
+
+def _summary_dict(row, types):
+    total = row["total_balance"]
+    return {
+        "account_count": row["account_count"],
+        "total_balance": total,
+        "balance_by_type": {
+            t["account_type"]: {"count": t["account_count"], "balance": t["total_balance"]}
+            for t in types if t["account_count"]
+        },
+        "weighted_avg_interest_rate": (
+            round(row["rate_weighted_sum"] / total, 4) if total else Decimal(0)
+        ),
+        "next_maturity_date": row["next_maturity_date"],
+        "auto_transfer_count": row["auto_transfer_count"],
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    from db import get_connection
+
+    if "--rebuild-all" not in sys.argv:
+        print("usage: python portfolio.py --rebuild-all")
+        sys.exit(1)
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT id FROM login")
+            user_ids = [r["id"] for r in cursor.fetchall()]
+            for uid in user_ids:
+                rebuild_summary(cursor, uid)
+                conn.commit()
+    print(f"rebuilt {len(user_ids)} summaries")
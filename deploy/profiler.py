@@ -0,0 +1,176 @@
+# 관리자용 런타임 프로파일러 (/api/admin/profile/...)
+#   샘플링: POST /api/admin/profile/start {"seconds": 30, "hz": 100}
+#     요청을 받은 워커 프로세스에서 별도 스레드가 hz 간격으로 모든 스레드의 스택(sys._current_frames)을 모아
+#     seconds 뒤 PROFILE_DIR 에 collapsed-stack 파일(<pid>-<시각>.folded)로 저장
+#     (flamegraph.pl / speedscope 에서 바로 열림). 진행 상태는 GET /api/admin/profile/status
+#   요청 단위: X-Profile: 1 헤더(+ X-Admin-Token) 를 붙인 요청만 cProfile 로 측정해 .prof 로 저장하고
+#     파일 이름을 X-Profile-File 응답 헤더로 돌려줌 (python -m pstats / snakeviz 로 확인)
+#   꺼져 있을 때는 요청마다 헤더 확인 한 번 외에 비용 없음
+#   gunicorn 워커가 여럿이면 샘플링은 요청을 받은 워커만 대상 (응답의 pid 로 확인)
+import cProfile
+import collections
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+from flask import Blueprint, g, jsonify, request
+
+from service_auth import is_admin_token
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "account_system_profiles"))
+PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", "300"))
+DEFAULT_HZ = 100
+MAX_HZ = 1000
+
+bp = Blueprint("profiler", __name__, url_prefix="/api/admin/profile")
+
+
+class ProfileError(ValueError):
+    pass
+
+
+# -----------------------------------------------------------
+# 샘플링 프로파일러 (프로세스당 하나)
+# -----------------------------------------------------------
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.last = None
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds, hz):
+        with self._lock:
+            if self.running():
+                raise ProfileError("이미 샘플링 중입니다.")
+            path = os.path.join(PROFILE_DIR, f"{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+            self.last = {"pid": os.getpid(), "file": path, "seconds": seconds, "hz": hz,
+                         "started_at": time.time(), "samples": 0, "done": False}
+            self._thread = threading.Thread(
+                target=self._run, args=(seconds, hz, self.last), name="sampling-profiler", daemon=True)
+            self._thread.start()
+            return self.last
+
+    def _run(self, seconds, hz, state):
+        own = threading.get_ident()
+        interval = 1.0 / hz
+        stacks = collections.Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    stacks[_collapse(names.get(ident, str(ident)), frame)] += 1
+            state["samples"] += 1
+            time.sleep(interval)
+        _write_folded(state["file"], stacks)
+        state["done"] = True
+
+
+def _frame_label(code):
+    # 줄 단위가 아니라 함수 단위로 묶음
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(thread_name, frame):
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+def _write_folded(path, stacks):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    os.replace(tmp, path)
+
+
+sampler = SamplingProfiler()
+
+
+def _int_arg(data, name, default, low, high):
+    value = data.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ProfileError(f"{name} 는 정수여야 합니다.")
+    if not low <= value <= high:
+        raise ProfileError(f"{name} 는 {low}~{high} 범위여야 합니다.")
+    return value
+
+
+@bp.before_request
+def require_admin():
+    if not is_admin_token(request.headers.get("X-Admin-Token")):
+        return jsonify({"message": "관리자 권한이 필요합니다."}), 403
+
+
+@bp.errorhandler(ProfileError)
+def bad_request(e):
+    return jsonify({"message": str(e)}), 400
+
+
+@bp.post("/start")
+def start_sampling():
+    data = request.get_json(silent=True) or {}
+    seconds = _int_arg(data, "seconds", 30, 1, PROFILE_MAX_SECONDS)
+    hz = _int_arg(data, "hz", DEFAULT_HZ, 1, MAX_HZ)
+    try:
+        state = sampler.start(seconds, hz)
+    except ProfileError as e:
+        return jsonify({"message": str(e), **(sampler.last or {})}), 409
+    return jsonify(state), 202
+
+
+@bp.get("/status")
+def sampling_status():
+    return jsonify({"pid": os.getpid(), "running": sampler.running(), "last": sampler.last})
+
+
+# -----------------------------------------------------------
+# 요청 단위 cProfile (X-Profile 헤더)
+# -----------------------------------------------------------
+@bp.before_app_request
+def _start_request_profile():
+    if "X-Profile" not in request.headers or not is_admin_token(request.headers.get("X-Admin-Token")):
+        return
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # 같은 스레드에서 다른 프로파일러가 이미 동작 중
+        return
+    g._request_profile = profile
+
+
+@bp.after_app_request
+def _finish_request_profile(response):
+    profile = g.pop("_request_profile", None)
+    if profile is None:
+        return response
+    profile.disable()
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    name = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    path = os.path.join(PROFILE_DIR, f"req-{name}-{os.getpid()}-{time.time_ns()}.prof")
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile.dump_stats(path)
+    response.headers["X-Profile-File"] = path
+    return response
+
+
+@bp.teardown_app_request
+def _abort_request_profile(exc):
+    # 예외로 after_request 를 건너뛴 경우에도 프로파일러는 꺼 둠
+    profile = g.pop("_request_profile", None)
+    if profile is not None:
+        profile.disable()
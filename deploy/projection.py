@@ -0,0 +1,226 @@
+# 계좌별 만기/이자 예측 (/api/projection, AI 프롬프트의 [전망] 항목)
+#   기간은 이번 달(오늘~말일)부터 months 개의 달력 월. 이자는 단리, 일수 기준(실제 일수/365)
+#   - 적금     : 가입일(created_at)부터 매월 같은 날 납입. 지금까지 납입분은 현재 잔액을 지난 납입 횟수로
+#                나눠 가입일 이후 각 납입일에 들어온 것으로 보고, 오늘 이후 만기 전 납입일마다 monthly_limit 납입
+#   - 정기예금 : 가입일에 잔액 전액 예치
+#   - 그 외    : 잔액 고정, 오늘부터 금리만큼 이자 (만기 없음, 지난 이자는 잔액에 반영된 것으로 봄)
+#   적금/정기예금 이자는 각 납입일부터 만기일까지 쌓이고, 만기일이 속한 달에 원금+이자(가입일부터 계산)를 지급
+#   만기 지급 이후 그 계좌 잔액은 0 으로 봄 (재예치 가정 없음)
+#   만기일이 오늘 이전인 계좌는 이자 없이 잔액만 유지 (지급액은 이미 받은 것으로 보고 집계하지 않음)
+#   가입일을 모르면 오늘 가입한 것으로 봄
+import datetime
+
+import numpy as np
+
+TAX_RATE = 0.154           # 이자소득세 (지방세 포함)
+DEFAULT_MONTHS = 12
+MAX_MONTHS = 120
+DAYS_PER_YEAR = 365
+
+KIND_OTHER, KIND_TERM, KIND_INSTALLMENT = 0, 1, 2
+
+
+def _kind(acc):
+    account_type = acc.get("account_type") or ""
+    if "적금" in account_type:
+        return KIND_INSTALLMENT
+    if "예금" in account_type and ("정기" in account_type or acc.get("is_fixed_term")):
+        return KIND_TERM
+    if acc.get("is_fixed_term") and acc.get("maturity_date"):
+        return KIND_TERM
+    return KIND_OTHER
+
+
+def _to_date(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def _add_months(day, months):
+    # 같은 날짜의 n 개월 뒤 (그 달에 없는 날이면 말일)
+    index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(index, 12)
+    month += 1
+    next_month = datetime.date(year + (month == 12), month % 12 + 1, 1)
+    last_day = (next_month - datetime.timedelta(days=1)).day
+    return datetime.date(year, month, min(day.day, last_day))
+
+
+def _month_index(today, day):
+    # day 가 속한 달이 몇 번째 기간인지 (이번 달 = 0)
+    return (day.year - today.year) * 12 + (day.month - today.month)
+
+
+def _month_labels(today, months):
+    return [_add_months(today.replace(day=1), m).strftime("%Y-%m") for m in range(months)]
+
+
+def _boundaries(today, months):
+    # 기간 경계 (오늘, 다음 달 1일, ..., 마지막 기간 다음 달 1일) → months + 1 개
+    first = today.replace(day=1)
+    return [today] + [_add_months(first, m) for m in range(1, months + 1)]
+
+
+def _deposits(acc, kind, today, opened, maturity):
+    # [(납입일, 금액, 오늘 이후 납입 여부)]
+    balance = float(acc.get("balance") or 0)
+    if kind == KIND_TERM:
+        return [(opened, balance, False)]
+    if kind == KIND_OTHER:
+        return [(today, balance, False)]
+
+    past = []
+    k = 0
+    while True:
+        day = _add_months(opened, k)
+        if day > today or day >= maturity:
+            break
+        past.append(day)
+        k += 1
+    past = past or [opened]
+    events = [(day, balance / len(past), False) for day in past]
+    monthly = float(acc.get("monthly_limit") or 0)
+    while monthly:
+        day = _add_months(opened, k)
+        if day >= maturity:
+            break
+        events.append((day, monthly, True))
+        k += 1
+    return events
+
+
+def _money(values):
+    return [int(v) for v in np.rint(values)]
+
+
+def project(accounts, months=DEFAULT_MONTHS, today=None):
+    today = today or datetime.date.today()
+    months = max(1, min(int(months), MAX_MONTHS))
+    n = len(accounts)
+    bounds = _boundaries(today, months)
+    horizon_end = bounds[-1].toordinal()
+
+    balance = np.zeros(n)
+    rate = np.zeros(n)                                  # 일 이율
+    accrual_end = np.full(n, horizon_end, dtype=np.int64)   # 이자가 멈추는 날 (만기일)
+    payout_period = np.full(n, -1, dtype=np.int64)      # 만기 지급 기간 (없거나 horizon 밖이면 -1)
+    kind = np.empty(n, dtype=np.int8)
+    matured = np.zeros(n, dtype=bool)
+
+    # 납입 이벤트를 계좌 순서대로 이어 붙임 (계좌마다 최소 1개)
+    owner, event_day, amount, future = [], [], [], []
+    for i, acc in enumerate(accounts):
+        balance[i] = float(acc.get("balance") or 0)
+        kind[i] = _kind(acc)
+        maturity = _to_date(acc.get("maturity_date")) if kind[i] != KIND_OTHER else None
+        # 만기일이 없는 적금/예금은 만기 없는 계좌처럼 계산
+        model = kind[i] if maturity is not None else KIND_OTHER
+        if maturity is not None and maturity < today:
+            matured[i] = True
+        else:
+            rate[i] = float(acc.get("interest_rate") or 0) / 100 / DAYS_PER_YEAR
+        if maturity is not None and not matured[i]:
+            accrual_end[i] = min(maturity.toordinal(), horizon_end)
+            if _month_index(today, maturity) < months:
+                payout_period[i] = _month_index(today, maturity)
+
+        if matured[i]:
+            events = [(today, balance[i], False)]
+        else:
+            opened = min(_to_date(acc.get("created_at")) or today, today)
+            events = _deposits(acc, model, today, opened, maturity)
+        for day, value, is_future in events:
+            owner.append(i)
+            event_day.append(day.toordinal())
+            amount.append(value)
+            future.append(is_future)
+
+    starts = np.flatnonzero(np.r_[True, np.diff(owner) != 0]) if n else np.zeros(0, dtype=np.int64)
+    owner = np.asarray(owner, dtype=np.int64)
+    event_day = np.asarray(event_day, dtype=np.int64)
+    amount = np.asarray(amount, dtype=float)
+    future = np.asarray(future, dtype=bool)
+    points = np.array([d.toordinal() for d in bounds], dtype=np.int64)           # (months + 1,)
+
+    def accrued_at(days):
+        # 각 계좌의 가입일부터 days (1, k) 까지 쌓인 이자 (n, k). 만기일 이후로는 늘지 않음
+        if not n:
+            return np.zeros((0, days.shape[-1]))
+        end = np.minimum(days, accrual_end[owner][:, None])
+        held = np.clip(end - event_day[:, None], 0, None)
+        per_event = amount[:, None] * held * rate[owner][:, None]
+        return np.add.reduceat(per_event, starts, axis=0)
+
+    def deposited_before(days):
+        # 오늘 이후 납입분 중 days (1, k) 이전에 납입된 금액 (n, k)
+        if not n:
+            return np.zeros((0, days.shape[-1]))
+        paid = np.where(future[:, None] & (event_day[:, None] < days), amount[:, None], 0.0)
+        return np.add.reduceat(paid, starts, axis=0)
+
+    accrued = accrued_at(points[None, :])                       # (n, months + 1)
+    paid_in = deposited_before(points[None, :])
+    interest = np.diff(accrued, axis=1)                         # 기간별 발생 이자 (오늘 이후분)
+    deposits = np.diff(paid_in, axis=1)
+    value = balance[:, None] + paid_in[:, 1:] + accrued[:, 1:]
+    period = np.arange(months)
+    paid_out = (payout_period[:, None] >= 0) & (period[None, :] >= payout_period[:, None])
+    projected = np.where(paid_out, 0.0, value)                  # 만기 지급 후 0
+
+    # 만기 지급액: 전체 원금 + 가입일부터 만기일까지 이자
+    #   horizon 안에 만기가 있는 계좌는 만기일에 이자/납입이 멈추므로 마지막 경계 값이 곧 만기 시점 값
+    total_interest_at_maturity = accrued[:, -1]
+    principal_at_maturity = balance + paid_in[:, -1]
+    payout = np.zeros((n, months))
+    due = np.flatnonzero(payout_period >= 0)
+    payout[due, payout_period[due]] = principal_at_maturity[due] + total_interest_at_maturity[due]
+
+    labels = _month_labels(today, months)
+    maturities = []
+    for i in due[np.argsort(accrual_end[due], kind="stable")]:
+        acc = accounts[i]
+        principal_paid = float(principal_at_maturity[i])
+        total_interest = float(total_interest_at_maturity[i])
+        maturities.append({
+            "month": labels[payout_period[i]],
+            "maturity_date": str(_to_date(acc.get("maturity_date"))),
+            "bank_name": acc.get("bank_name"),
+            "product_name": acc.get("product_name"),
+            "account_type": acc.get("account_type"),
+            "principal": round(principal_paid),
+            "interest": round(total_interest),
+            "payout": round(principal_paid + total_interest),
+            "payout_after_tax": round(principal_paid + total_interest * (1 - TAX_RATE)),
+        })
+
+    total_interest = float(interest.sum())
+    return {
+        "as_of": today.isoformat(),
+        "months": labels,
+        "monthly": {
+            "projected_balance": _money(projected.sum(axis=0)),
+            "interest": _money(interest.sum(axis=0)),
+            "deposits": _money(deposits.sum(axis=0)),
+            "maturity_payout": _money(payout.sum(axis=0)),
+        },
+        "maturities": maturities,
+        "totals": {
+            "current_balance": round(float(balance.sum())),
+            "deposits": round(float(deposits.sum())),
+            "interest": round(total_interest),
+            "interest_after_tax": round(total_interest * (1 - TAX_RATE)),
+            "maturity_payout": round(float(payout.sum())),
+            "end_balance": round(float(projected[:, -1].sum())) if n else 0,
+        },
+        "counts": {
+            "installment": int((kind == KIND_INSTALLMENT).sum()),
+            "term": int((kind == KIND_TERM).sum()),
+            "other": int((kind == KIND_OTHER).sum()),
+            "matured": int(matured.sum()),
+        },
+    }
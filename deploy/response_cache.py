@@ -0,0 +1,87 @@
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_message(message: str) -> str:
+    # 공백/대소문자/전각문자/끝 문장부호 차이는 같은 질문으로 취급
+    text = unicodedata.normalize("NFKC", message).lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(" ?!.~")
+
+
+def make_key(message: str, account_info: str, model: str, prompt_version: str) -> str:
+    h = hashlib.sha256()
+    for part in (normalize_message(message), account_info, model, prompt_version):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+# -----------------------------------------------------------
+# AI 응답 캐시 (TTL + LRU, 사용자 단위 무효화)
+# -----------------------------------------------------------
+class ResponseCache:
+    def __init__(self, maxsize=1024, ttl=600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()     # key -> (answer, expires_at, scope)
+        self._by_scope = {}            # scope -> set(key)
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def _drop(self, key):
+        _, _, scope = self._data.pop(key)
+        keys = self._by_scope.get(scope)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_scope[scope]
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            answer, expires_at, _ = item
+            if expires_at < time.monotonic():
+                self._drop(key)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return answer
+
+    def set(self, key, answer, scope=None):
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (answer, time.monotonic() + self.ttl, scope)
+            self._by_scope.setdefault(scope, set()).add(key)
+            while len(self._data) > self.maxsize:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, scope):
+        # 해당 사용자(scope)의 캐시를 모두 제거
+        with self._lock:
+            keys = list(self._by_scope.get(scope, ()))
+            for key in keys:
+                self._drop(key)
+            self._stats["invalidations"] += 1
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["size"] = len(self._data)
+            s["maxsize"] = self.maxsize
+        lookups = s["hits"] + s["misses"]
+        s["hit_rate"] = round(s["hits"] / lookups, 4) if lookups else 0.0
+        return s
@@ -0,0 +1,212 @@
+import math
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+
+from response_cache import normalize_message
+
+
+# -----------------------------------------------------------
+# 문자 n-gram 해싱 임베딩 (외부 모델 없이 로컬에서 계산)
+#   의미 임베딩이 아니므로 단어가 거의 같으면 뜻이 반대여도 유사도가 높음
+#   ("가장 이자율이 높은 정기예금" vs "낮은" 0.95 이상). 그래서 적중으로 보려면
+#     1) 숫자, 부정(안/않/못), 비교/최상급 표현이 정확히 같고 (key_terms)
+#     2) 유사도가 질문 길이에 따라 올라가는 임계값 이상이어야 함 (required_similarity)
+#   같은 요청을 뜻하는 어미("알려줘"/"얼마야"/"보여줘" 등)는 한 단어로 맞춰 바꿔 말한 질문도 묶음
+# -----------------------------------------------------------
+PARTICLES = ("에서", "으로", "이랑", "하고", "을", "를", "이", "가", "은", "는", "의", "도", "로", "요")
+FILLERS = {"좀", "혹시", "그럼", "나의"}
+ASK_WORDS = {"알려줘", "알려줄래", "알려주세요", "얼마야", "얼마지", "얼마임", "얼마", "보여줘", "보여주세요",
+             "뭐야", "궁금해"}
+ASK_TOKEN = "알려줘"
+
+NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+NEGATION_WORDS = {"안", "못", "않", "없는", "없어", "아닌", "아니"}
+NEGATION_PREFIXES = ("안된", "안되", "안돼", "안한", "안하", "안했", "안받", "못한", "못하", "못받", "않", "없")
+COMPARATIVE_WORDS = {"가장", "제일", "최고", "최저", "최대", "최소", "더", "덜", "최근", "오래된", "큰", "작은"}
+COMPARATIVE_RE = re.compile(r"^(높|낮|많|적|크|작|길|짧|비싸|싸)(은|게|고|다|아|아요|을|지)?$")
+
+# 질문이 길수록 단어 한두 개 차이가 유사도에 덜 반영되므로 임계값을 올림
+SHORT_QUESTION_TOKENS = 4
+LENGTH_STEP = 0.01
+MAX_THRESHOLD = 0.98
+
+
+def tokenize(message: str):
+    tokens = []
+    for token in normalize_message(message).split():
+        if token in FILLERS:
+            continue
+        for p in PARTICLES:
+            if len(token) > len(p) + 1 and token.endswith(p):
+                token = token[:-len(p)]
+                break
+        if token in ASK_WORDS:
+            token = ASK_TOKEN
+        tokens.append(token)
+    return tokens
+
+
+def _is_negation(token):
+    return token in NEGATION_WORDS or token.startswith(NEGATION_PREFIXES) or "않" in token
+
+
+def key_terms(message: str):
+    # 하나라도 다르면 답이 달라지는 표현: (숫자들, 부정 표현 수, 비교/최상급 표현)
+    tokens = tokenize(message)
+    numbers = tuple(NUMBER_RE.findall(normalize_message(message)))
+    negations = sum(1 for t in tokens if _is_negation(t))
+    comparatives = frozenset(t for t in tokens if t in COMPARATIVE_WORDS or COMPARATIVE_RE.match(t))
+    return numbers, negations, comparatives
+
+
+def required_similarity(threshold, n_tokens):
+    # 짧은 질문은 threshold 그대로, 그보다 긴 만큼 LENGTH_STEP 씩 올리되 MAX_THRESHOLD 까지만
+    extra = max(0, n_tokens - SHORT_QUESTION_TOKENS) * LENGTH_STEP
+    return min(max(threshold, MAX_THRESHOLD), threshold + extra)
+
+
+def embed(message: str, dim: int = 1024):
+    # 단어 + 단어 내부 문자 1/2-gram 을 dim 개 버킷에 해싱한 뒤 L2 정규화한 희소 벡터
+    vec = {}
+
+    def add(feature, weight):
+        bucket = zlib.crc32(feature.encode("utf-8")) % dim
+        vec[bucket] = vec.get(bucket, 0.0) + weight
+
+    for token in tokenize(message):
+        add("w:" + token, 2.0)
+        for n in (1, 2):
+            for i in range(len(token) - n + 1):
+                add(token[i:i + n], 1.0)
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+    if norm == 0:
+        return {}
+    return {k: v / norm for k, v in vec.items()}
+
+
+def cosine(a, b) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+def _features(message: str):
+    # 캐시 항목/조회에 쓰는 값 (벡터가 비면 None)
+    vec = embed(message)
+    if not vec:
+        return None
+    return {"vec": vec, "terms": key_terms(message), "length": len(tokenize(message))}
+
+
+# -----------------------------------------------------------
+# 의미 유사도 캐시
+#   scope(사용자 + 계좌 스냅샷) 안에서만 비슷한 질문을 찾음
+#   적중 내역은 감사 로그에 남기고, 잘못된 적중은 신고받아 제거/집계
+# -----------------------------------------------------------
+class SemanticCache:
+    def __init__(self, threshold=0.9, ttl=600, max_scopes=2048,
+                 max_entries_per_scope=64, audit_size=500):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_scopes = max_scopes
+        self.max_entries_per_scope = max_entries_per_scope
+        self._lock = threading.Lock()
+        self._scopes = OrderedDict()   # scope -> list[entry]
+        self._audit = deque(maxlen=audit_size)
+        self._stats = {"lookups": 0, "hits": 0, "false_hits": 0, "evictions": 0}
+
+    def _similarity(self, query, entry):
+        # 적중 조건을 만족하면 유사도, 아니면 None
+        if query["terms"] != entry["terms"]:
+            return None
+        sim = cosine(query["vec"], entry["vec"])
+        if sim < required_similarity(self.threshold, max(query["length"], entry["length"])):
+            return None
+        return sim
+
+    def lookup(self, scope, message):
+        # (answer, similarity) 또는 None
+        query = _features(message)
+        now = time.monotonic()
+        with self._lock:
+            self._stats["lookups"] += 1
+            entries = self._scopes.get(scope)
+            if not entries or not query:
+                return None
+            entries[:] = [e for e in entries if e["expires_at"] > now]
+            best, best_sim = None, 0.0
+            for entry in entries:
+                sim = self._similarity(query, entry)
+                if sim is not None and sim > best_sim:
+                    best, best_sim = entry, sim
+            if best is None:
+                return None
+            self._scopes.move_to_end(scope)
+            self._stats["hits"] += 1
+            best["hits"] += 1
+            self._audit.append({
+                "scope": scope,
+                "query": message,
+                "matched": best["message"],
+                "similarity": round(best_sim, 4),
+                "at": time.time(),
+            })
+            return best["answer"], best_sim
+
+    def add(self, scope, message, answer):
+        features = _features(message)
+        if not features:
+            return
+        with self._lock:
+            entries = self._scopes.setdefault(scope, [])
+            self._scopes.move_to_end(scope)
+            entries.append({
+                **features,
+                "message": message,
+                "answer": answer,
+                "expires_at": time.monotonic() + self.ttl,
+                "hits": 0,
+            })
+            if len(entries) > self.max_entries_per_scope:
+                del entries[0]
+                self._stats["evictions"] += 1
+            while len(self._scopes) > self.max_scopes:
+                _, dropped = self._scopes.popitem(last=False)
+                self._stats["evictions"] += len(dropped)
+
+    def invalidate_prefix(self, prefix):
+        # 사용자 단위 무효화 (scope 는 "<user>|<snapshot>" 형식)
+        with self._lock:
+            for scope in [s for s in self._scopes if s.startswith(prefix)]:
+                del self._scopes[scope]
+
+    def report_false_hit(self, scope, message):
+        # 감사 결과 잘못된 적중으로 판정된 질문 → 해당 질문이 적중한 항목 제거
+        query = _features(message)
+        with self._lock:
+            self._stats["false_hits"] += 1
+            entries = (self._scopes.get(scope) or []) if query else []
+            scored = [(self._similarity(query, e), e) for e in entries]
+            scored = [(sim, e) for sim, e in scored if sim is not None]
+            if not scored:
+                return False
+            _, worst = max(scored, key=lambda x: x[0])
+            entries.remove(worst)
+            return True
+
+    def audit_log(self, limit=100):
+        with self._lock:
+            return list(self._audit)[-limit:]
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["scopes"] = len(self._scopes)
+            s["entries"] = sum(len(e) for e in self._scopes.values())
+            s["threshold"] = self.threshold
+        s["hit_rate"] = round(s["hits"] / s["lookups"], 4) if s["lookups"] else 0.0
+        s["false_hit_rate"] = round(s["false_hits"] / s["hits"], 4) if s["hits"] else 0.0
+        return s
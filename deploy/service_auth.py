@@ -0,0 +1,59 @@
+# API → AI 서버 호출 서명 (서비스 간 공유 키 AI_SERVICE_KEY)
+#   AI 서버는 본문의 user_id / session_id 로 캐시와 대화 기록을 나누므로, 서명된 API 서버 호출만 받음
+#   요청 헤더
+#     X-Service-Timestamp : 보낸 시각 (epoch 초)
+#     X-Service-Signature : hex HMAC-SHA256(AI_SERVICE_KEY, "<timestamp>\n<METHOD>\n<path>\n<sha256(body)>")
+#   시각이 MAX_SKEW 초 넘게 차이 나면 거부 (가로챈 요청을 나중에 다시 보내는 것 방지)
+#   키가 없으면 서명도 검증도 하지 않으므로 AI 서버는 모든 요청을 거부함
+# 관리자 API 의 X-Admin-Token 확인 (ADMIN_TOKEN, 미설정 시 항상 거부) 도 여기서 함께 처리
+import hashlib
+import hmac
+import os
+import time
+
+MAX_SKEW = int(os.getenv("AI_SERVICE_MAX_SKEW", "60"))
+
+TIMESTAMP_HEADER = "X-Service-Timestamp"
+SIGNATURE_HEADER = "X-Service-Signature"
+
+
+def service_key():
+    # 서버가 import 뒤에 load_dotenv() 를 부르므로 호출 시점에 읽음
+    return os.getenv("AI_SERVICE_KEY", "")
+
+
+def is_admin_token(token):
+    # /metrics, 집계/프로파일러, 시맨틱 캐시 감사 API 가 같은 비교를 쓰도록 한 곳에 둠
+    admin_token = os.getenv("ADMIN_TOKEN", "")
+    return bool(admin_token) and hmac.compare_digest((token or "").encode("utf-8"), admin_token.encode("utf-8"))
+
+
+def _signature(key, timestamp, method, path, body):
+    digest = hashlib.sha256(body or b"").hexdigest()
+    message = f"{timestamp}\n{method.upper()}\n{path}\n{digest}".encode("utf-8")
+    return hmac.new(key.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+
+def sign(method, path, body=b"", headers=None, key=None):
+    # 서명 헤더를 더한 헤더 dict 반환 (키가 없으면 그대로)
+    headers = dict(headers or {})
+    key = service_key() if key is None else key
+    if key:
+        timestamp = str(int(time.time()))
+        headers[TIMESTAMP_HEADER] = timestamp
+        headers[SIGNATURE_HEADER] = _signature(key, timestamp, method, path, body)
+    return headers
+
+
+def verify(method, path, body, timestamp, signature, key=None):
+    key = service_key() if key is None else key
+    if not (key and timestamp and signature):
+        return False
+    try:
+        skew = abs(time.time() - int(timestamp))
+    except ValueError:
+        return False
+    if skew > MAX_SKEW:
+        return False
+    expected = _signature(key, timestamp, method, path, body)
+    return hmac.compare_digest(signature.encode("utf-8"), expected.encode("ascii"))
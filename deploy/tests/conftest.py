@@ -0,0 +1,37 @@
+# deploy/ 의 모듈은 같은 디렉터리에서 바로 import 하는 구조이므로 경로에 추가
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SERVICE_KEY = "test-service-key"
+# api_server / api_server_async 는 import 시점에 SECRET_KEY 가 없으면 실패
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+
+@pytest.fixture
+def ai_server(monkeypatch):
+    # ai_server 는 import 시점에 환경 변수를 읽으므로 처음 import 전에 설정
+    os.environ.setdefault("OPENAI_API_KEY", "test")
+    os.environ.setdefault("CONVERSATION_DB", os.path.join(tempfile.mkdtemp(), "conversations.db"))
+    monkeypatch.setenv("AI_SERVICE_KEY", SERVICE_KEY)
+    import ai_server
+
+    return ai_server
+
+
+@pytest.fixture
+def signed_post():
+    # API 서버처럼 서비스 서명을 붙여 JSON 을 보냄
+    import service_auth
+
+    def post(client, path, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = service_auth.sign("POST", path, body, {"Content-Type": "application/json"}, key=SERVICE_KEY)
+        return client.post(path, content=body, headers=headers)
+
+    return post
@@ -0,0 +1,94 @@
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from ai_client import AIClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    # 실제 소켓 위의 urllib3 HTTPResponse 로 읽도록 로컬 HTTP 서버를 띄움
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path == "/json":
+            self._send(json.dumps({"response": "안녕"}).encode("utf-8"))
+        elif self.path == "/gzip":
+            self._send(gzip.compress(json.dumps({"response": "압축"}).encode("utf-8")), {"Content-Encoding": "gzip"})
+        elif self.path == "/chunks":
+            self._chunked([b"data: 1\n\n", b"data: 2\n\n", b"data: [DONE]\n\n"], delay=0.01)
+        elif self.path == "/drip":
+            self._chunked(iter(lambda: b".", None), delay=0.05)
+
+    def _send(self, body, headers=None):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunked(self, chunks, delay):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+                time.sleep(delay)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_post_reads_real_response(base_url):
+    client = AIClient(base_url)
+    assert client.post("/json", {"message": "m"}).json() == {"response": "안녕"}
+    assert client.post("/gzip", {"message": "m"}).json() == {"response": "압축"}
+    assert client.breaker.state == "closed"
+
+
+def test_post_total_deadline_on_slow_drip(base_url):
+    client = AIClient(base_url, timeout=0.5, failure_threshold=1)
+    started = time.monotonic()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.post("/drip", {"message": "m"})
+    assert time.monotonic() - started < 2
+    assert client.breaker.state == "open"
+    assert client.stats()["in_flight"] == 0
+
+
+def test_stream_yields_chunks(base_url):
+    client = AIClient(base_url)
+    assert b"".join(client.stream("/chunks", {"message": "m"})) == b"data: 1\n\ndata: 2\n\ndata: [DONE]\n\n"
+
+
+def test_stream_total_deadline_on_slow_drip(base_url):
+    client = AIClient(base_url, timeout=5, stream_timeout=0.5)
+    received = []
+    started = time.monotonic()
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        for chunk in client.stream("/drip", {"message": "m"}):
+            received.append(chunk)
+    assert received
+    assert time.monotonic() - started < 2
@@ -0,0 +1,52 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from conversation_store import ConversationStore
+
+STORE_DELAY = 0.5
+
+
+def completion(text):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=SimpleNamespace(prompt_tokens=1, completion_tokens=1),
+    )
+
+
+def test_slow_store_does_not_block_other_requests(ai_server, signed_post, monkeypatch):
+    store = ai_server.conversations
+    real_load = store.load
+
+    def slow_load(key):
+        time.sleep(STORE_DELAY)   # 느린 디스크 I/O
+        return real_load(key)
+
+    async def create(**kwargs):
+        return completion("답변")
+
+    monkeypatch.setattr(store, "load", slow_load)
+    monkeypatch.setattr(ai_server.client.chat.completions, "create", create)
+
+    payload = {"message": "대화 진행 테스트", "account_info": "[합계] 계좌 0개", "user_id": "u1", "session_id": "s1"}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=ai_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://ai") as client:
+            chat = asyncio.create_task(signed_post(client, "/ai", payload))
+            await asyncio.sleep(0.1)          # chat 요청이 대화 기록을 읽는 중
+            started = time.monotonic()
+            health = await client.get("/healthz")
+            health_elapsed = time.monotonic() - started
+            chat_done_first = chat.done()
+            return await chat, health, health_elapsed, chat_done_first
+
+    chat, health, health_elapsed, chat_done_first = asyncio.run(scenario())
+    assert health.status_code == 200
+    assert health_elapsed < STORE_DELAY / 2
+    assert not chat_done_first
+    assert chat.status_code == 200
+    assert chat.json()["response"] == "답변"
+    assert real_load(ConversationStore.make_key("u1", "s1")).turns[-1]["content"] == "답변"
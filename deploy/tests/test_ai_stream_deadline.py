@@ -0,0 +1,71 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+def delta_chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], usage=None)
+
+
+class StallingStream:
+    # 주어진 청크를 보낸 뒤 응답 없이 멈추는 OpenAI 스트림 대역
+    def __init__(self, chunks=(), stall=30):
+        self.chunks = list(chunks)
+        self.stall = stall
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self.chunks:
+            yield chunk
+        await asyncio.sleep(self.stall)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def stream_with(ai_server, monkeypatch):
+    monkeypatch.setattr(ai_server, "AI_DEADLINE", 0.3)
+
+    def install(stream=None, create_delay=0):
+        async def create(**kwargs):
+            await asyncio.sleep(create_delay)
+            return stream
+
+        monkeypatch.setattr(ai_server.client.chat.completions, "create", create)
+        return stream
+
+    return install
+
+
+def ask(ai_server, signed_post, message):
+    client = TestClient(ai_server.app)
+    started = time.monotonic()
+    resp = signed_post(client, "/ai/stream", {"message": message, "account_info": "[합계] 계좌 0개"})
+    return resp, time.monotonic() - started
+
+
+@pytest.mark.parametrize("chunks", [[], [delta_chunk("안녕")]], ids=["before_first_token", "between_tokens"])
+def test_stalled_stream_ends_at_deadline(ai_server, signed_post, stream_with, chunks):
+    stream = stream_with(StallingStream(chunks))
+    resp, elapsed = ask(ai_server, signed_post, f"stall {len(chunks)}")
+    assert resp.status_code == 200
+    assert "기한 내에 끝나지 않았습니다" in resp.text
+    assert resp.text.endswith("data: [DONE]\n\n")
+    assert elapsed < 3
+    assert stream.closed
+    assert ai_server.scheduler.stats()["active"] == 0
+
+
+def test_stalled_create_ends_at_deadline(ai_server, signed_post, stream_with):
+    stream_with(StallingStream(), create_delay=30)
+    resp, elapsed = ask(ai_server, signed_post, "stall create")
+    assert "기한 내에 끝나지 않았습니다" in resp.text
+    assert elapsed < 3
+    assert ai_server.scheduler.stats()["active"] == 0
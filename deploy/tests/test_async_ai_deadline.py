@@ -0,0 +1,89 @@
+import asyncio
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+import api_server_async
+from ai_client import CircuitBreaker
+
+
+async def drip(request):
+    # 응답 헤더는 바로 보내고 본문은 0.05초마다 한 바이트씩 끝없이 흘려보내는 AI 서버 대역
+    async def body():
+        while True:
+            yield b"."
+            await asyncio.sleep(0.05)
+
+    return StreamingResponse(body(), media_type="text/event-stream")
+
+
+@pytest.fixture(scope="module")
+def drip_url():
+    app = Starlette(routes=[Route("/ai", drip, methods=["POST"]), Route("/ai/stream", drip, methods=["POST"])])
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(5)
+
+
+@pytest.fixture
+def upstream(drip_url, monkeypatch):
+    monkeypatch.setattr(api_server_async, "AI_TIMEOUT", 0.3)
+    monkeypatch.setattr(api_server_async, "AI_STREAM_TIMEOUT", 0.3)
+    monkeypatch.setitem(api_server_async.state, "breaker", CircuitBreaker(failure_threshold=1, reset_timeout=30))
+
+    async def run(scenario):
+        # 연결 풀이 이벤트 루프에 묶이므로 시나리오마다 클라이언트를 새로 만듦
+        async with httpx.AsyncClient(base_url=drip_url, timeout=httpx.Timeout(5, connect=3)) as client:
+            api_server_async.state["http"] = client
+            api_server_async.state["ai_slots"] = asyncio.Semaphore(4)
+            return await scenario()
+
+    yield lambda scenario: asyncio.run(run(scenario))
+    api_server_async.state.pop("http", None)
+    api_server_async.state.pop("ai_slots", None)
+
+
+def test_call_ai_has_total_deadline(upstream):
+    started = time.monotonic()
+    with pytest.raises(httpx.TimeoutException):
+        upstream(lambda: api_server_async.call_ai({"message": "m", "account_info": "a"}))
+    assert time.monotonic() - started < 2
+    assert api_server_async.state["breaker"].state == "open"
+
+
+def test_stream_has_total_deadline(upstream, monkeypatch):
+    async def fetch_accounts(user_id):
+        return [{"balance": 1}]
+
+    monkeypatch.setattr(api_server_async, "authenticate", lambda request: 1)
+    monkeypatch.setattr(api_server_async, "fetch_accounts", fetch_accounts)
+    monkeypatch.setattr(api_server_async, "build_account_info", lambda accounts: "[합계] 계좌 1개")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=api_server_async.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            return await client.post("/ask/stream", json={"message": "m"})
+
+    started = time.monotonic()
+    resp = upstream(scenario)
+    assert time.monotonic() - started < 2
+    assert resp.status_code == 200
+    assert resp.text.startswith(".")
+    assert "전체 기한을 넘었습니다" in resp.text
+    assert resp.text.endswith("data: [DONE]\n\n")
+    assert api_server_async.state["breaker"].state == "open"
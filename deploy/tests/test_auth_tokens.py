@@ -0,0 +1,48 @@
+import pytest
+
+import auth_tokens
+from auth_tokens import AuthError, TokenAuthority
+
+
+class Store:
+    # revoked_token 테이블 대역
+    def __init__(self, rows=(), fail=False):
+        self.rows = list(rows)
+        self.fail = fail
+        self.calls = 0
+
+    def add(self, jti, user_id, expires_at):
+        self.rows.append((len(self.rows) + 1, jti, expires_at))
+
+    def load_since(self, last_id):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("db down")
+        return [row for row in self.rows if row[0] > last_id]
+
+
+def test_first_verify_sees_revocations_from_other_workers():
+    token, claims = TokenAuthority("k").issue(1)
+    # 다른 워커에서 로그아웃한 토큰 (이 워커는 아직 폐기 목록을 읽은 적 없음)
+    store = Store([(1, claims["jti"], claims["exp"])])
+    authority = TokenAuthority("k", revocation_store=store, refresh_interval=3600)
+    with pytest.raises(AuthError):
+        authority.verify(token)
+    authority.verify(authority.issue(2)[0])
+    assert store.calls == 1
+
+
+def test_first_refresh_failure_does_not_block_auth():
+    store = Store(fail=True)
+    authority = TokenAuthority("k", revocation_store=store, refresh_interval=3600)
+    token, claims = authority.issue(1)
+    assert authority.verify(token)["uid"] == 1
+    assert store.calls == 1
+
+
+def test_secret_key_is_required(monkeypatch):
+    monkeypatch.delenv("SECRET_KEY", raising=False)
+    with pytest.raises(RuntimeError):
+        auth_tokens.secret_key()
+    monkeypatch.setenv("SECRET_KEY", "k")
+    assert auth_tokens.secret_key() == "k"
@@ -0,0 +1,86 @@
+import datetime
+
+import pytest
+
+from projection import project
+
+TODAY = datetime.date(2026, 1, 15)
+
+
+def term(balance=1_000_000, rate=3.6, maturity="2026-01-20", opened="2025-01-20"):
+    return {"account_type": "정기예금", "balance": balance, "interest_rate": rate,
+            "maturity_date": maturity, "created_at": opened}
+
+
+def test_same_month_maturity_pays_interest_since_open_date():
+    result = project([term()], months=3, today=TODAY)
+    (item,) = result["maturities"]
+    # 2025-01-20 ~ 2026-01-20 (365일) * 3.6%
+    assert item["month"] == "2026-01"
+    assert item["interest"] == 36_000
+    assert item["payout"] == 1_036_000
+    assert result["monthly"]["maturity_payout"] == [1_036_000, 0, 0]
+    # 오늘 이후 쌓이는 이자는 만기일까지 5일분뿐
+    assert result["monthly"]["interest"] == [493, 0, 0]
+    assert result["monthly"]["projected_balance"] == [0, 0, 0]
+
+
+def test_payout_lands_in_maturity_month_across_boundaries():
+    accounts = [
+        term(maturity="2026-02-20", opened="2025-02-20"),
+        term(maturity="2026-03-01", opened="2025-03-01"),
+        term(maturity="2026-12-31", opened="2025-12-31"),
+    ]
+    result = project(accounts, months=12, today=TODAY)
+    assert result["months"][0] == "2026-01"
+    assert result["months"][-1] == "2026-12"
+    assert [m["month"] for m in result["maturities"]] == ["2026-02", "2026-03", "2026-12"]
+    payouts = result["monthly"]["maturity_payout"]
+    assert payouts[1] == payouts[2] == 1_036_000
+    assert payouts[11] == 1_036_000
+    # 다음 해로 넘어가는 만기는 horizon 밖
+    assert not project([term(maturity="2027-01-01")], months=12, today=TODAY)["maturities"]
+
+
+def test_already_matured_account_stops_accruing():
+    result = project([term(maturity="2025-12-01", opened="2024-12-01")], months=12, today=TODAY)
+    assert result["maturities"] == []
+    assert result["totals"]["interest"] == 0
+    assert result["totals"]["maturity_payout"] == 0
+    assert result["monthly"]["projected_balance"] == [1_000_000] * 12
+    assert result["counts"]["matured"] == 1
+
+
+def test_installment_deposits_until_maturity():
+    account = {"account_type": "적금", "balance": 300_000, "interest_rate": 3.65, "monthly_limit": 100_000,
+               "maturity_date": "2026-04-10", "created_at": "2025-10-10"}
+    result = project([account], months=6, today=TODAY)
+    # 2/10, 3/10 두 번 납입 (만기일 4/10 에는 납입하지 않음)
+    assert result["monthly"]["deposits"] == [0, 100_000, 100_000, 0, 0, 0]
+    (item,) = result["maturities"]
+    assert item["month"] == "2026-04"
+    assert item["principal"] == 500_000
+    # 지난 납입 4회(각 75,000원) + 앞으로 2회, 각 납입일부터 만기일까지 일수 기준 단리
+    days = [182, 151, 121, 90, 59, 31]
+    amounts = [75_000] * 4 + [100_000] * 2
+    assert item["interest"] == round(sum(a * d for a, d in zip(amounts, days)) * 0.0365 / 365)
+    assert result["monthly"]["projected_balance"][3:] == [0, 0, 0]
+
+
+def test_demand_account_accrues_from_today_only():
+    account = {"account_type": "보통예금", "balance": 3_650_000, "interest_rate": 1.0}
+    result = project([account], months=2, today=TODAY)
+    # 1/15 ~ 2/1 (17일), 2/1 ~ 3/1 (28일)
+    assert result["monthly"]["interest"] == [1_700, 2_800]
+    assert result["totals"]["end_balance"] == 3_654_500
+
+
+def test_missing_open_date_counts_from_today():
+    account = term(opened=None)
+    assert project([account], months=1, today=TODAY)["maturities"][0]["interest"] == pytest.approx(493, abs=1)
+
+
+def test_empty():
+    result = project([], months=3, today=TODAY)
+    assert result["totals"]["end_balance"] == 0
+    assert result["monthly"]["interest"] == [0, 0, 0]
@@ -0,0 +1,55 @@
+import pytest
+
+from semantic_cache import SemanticCache, key_terms, required_similarity
+
+SCOPE = "1|snapshot"
+
+
+def cached(question, answer="cached"):
+    cache = SemanticCache(threshold=0.9)
+    cache.add(SCOPE, question, answer)
+    return cache
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("내 계좌 중에서 가장 이자율이 높은 정기예금은 어떤 상품이고 만기는 언제야",
+     "내 계좌 중에서 가장 이자율이 낮은 정기예금은 어떤 상품이고 만기는 언제야"),
+    ("내년 3월까지 만기되는 적금 계좌가 몇 개 있는지 알려줘",
+     "내년 9월까지 만기되는 적금 계좌가 몇 개 있는지 알려줘"),
+    ("자동이체가 설정된 계좌 목록 알려줘", "자동이체가 설정 안된 계좌 목록 알려줘"),
+    ("이자를 받을 수 있는 계좌 알려줘", "이자를 받을 수 없는 계좌 알려줘"),
+    ("잔액이 많은 계좌 알려줘", "잔액이 더 많은 계좌 알려줘"),
+])
+def test_opposite_meaning_misses(stored, asked):
+    assert cached(stored).lookup(SCOPE, asked) is None
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("잔액 알려줘", "잔액이 얼마야"),
+    ("잔액 알려줘", "잔액을 좀 알려줘"),
+    ("적금 이자는 얼마나 받을 수 있어?", "적금 이자는 얼마나 받을 수 있어"),
+])
+def test_paraphrase_hits(stored, asked):
+    assert cached(stored, "answer").lookup(SCOPE, asked)[0] == "answer"
+
+
+def test_key_terms():
+    numbers, negations, comparatives = key_terms("3월까지 만기 안되는 가장 높은 적금")
+    assert numbers == ("3",)
+    assert negations == 1
+    assert comparatives == {"가장", "높은"}
+    assert key_terms("적금 이자") == ((), 0, frozenset())
+
+
+def test_required_similarity_grows_with_length():
+    assert required_similarity(0.9, 2) == 0.9
+    assert required_similarity(0.9, 4) == 0.9
+    assert required_similarity(0.9, 7) == pytest.approx(0.93)
+    assert required_similarity(0.9, 40) == 0.98
+
+
+def test_scope_isolation_and_report():
+    cache = cached("잔액 알려줘")
+    assert cache.lookup("2|snapshot", "잔액 알려줘") is None
+    assert cache.report_false_hit(SCOPE, "잔액이 얼마야") is True
+    assert cache.lookup(SCOPE, "잔액 알려줘") is None
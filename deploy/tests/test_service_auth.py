@@ -0,0 +1,16 @@
+import pytest
+
+from service_auth import is_admin_token
+
+
+@pytest.mark.parametrize("configured, token, expected", [
+    ("", "", False),
+    ("", None, False),
+    ("secret", "secret", True),
+    ("secret", "secreT", False),
+    ("secret", None, False),
+    ("비밀", "비밀", True),
+])
+def test_is_admin_token(monkeypatch, configured, token, expected):
+    monkeypatch.setenv("ADMIN_TOKEN", configured)
+    assert is_admin_token(token) is expected
@@ -0,0 +1,275 @@
+# 분산 추적 (W3C traceparent: 00-<trace_id 32hex>-<span_id 16hex>-<flags 2hex>)
+#   UI → api_server → ai_server 로 traceparent 헤더를 전달하고, 각 서버는 자기 구간(span)을
+#   TRACE_EXPORT_FILE (JSON Lines) 에 기록. 파일은 여러 서비스가 같이 써도 되고, 아래 CLI 로 다시 묶어 봄
+#     python tracing.py /traces/*.jsonl --slowest 10        # 가장 느린 trace 10개
+#     python tracing.py /traces/*.jsonl --trace <trace_id>  # 한 trace 의 구간별 트리
+#   TRACE_EXPORT_FILE 이 없으면 헤더 전달만 하고 기록하지 않음
+import contextlib
+import contextvars
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "")
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class SpanContext:
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id, span_id, sampled=True):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+_current = contextvars.ContextVar("trace_span", default=None)
+
+
+def _new_id(nbytes):
+    value = random.getrandbits(nbytes * 8) or 1
+    return f"{value:0{nbytes * 2}x}"
+
+
+def parse_traceparent(header):
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return SpanContext(match.group(1), match.group(2), int(match.group(3), 16) & 1 == 1)
+
+
+def current():
+    return _current.get()
+
+
+def inject(headers=None):
+    # 나가는 요청 헤더에 현재 span 의 traceparent 추가
+    headers = dict(headers or {})
+    ctx = _current.get()
+    if ctx is not None:
+        headers["traceparent"] = ctx.traceparent()
+    return headers
+
+
+# -----------------------------------------------------------
+# 내보내기 (백그라운드 스레드가 파일에 한 줄씩 추가, 요청 스레드는 큐에 넣기만 함)
+# -----------------------------------------------------------
+class _FileExporter:
+    def __init__(self, path, maxsize=10000):
+        self.path = path
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self):
+        # fork 된 워커마다 한 번 시작
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                threading.Thread(target=self._loop, name="trace-export", daemon=True).start()
+                self._pid = os.getpid()
+
+    def export(self, record):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _loop(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        q = self._queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < 256:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in batch)
+            # O_APPEND 로 한 번에 써서 여러 프로세스가 같은 파일에 써도 줄이 섞이지 않게 함
+            os.write(fd, data.encode("utf-8"))
+
+
+_exporter = _FileExporter(TRACE_EXPORT_FILE) if TRACE_EXPORT_FILE else None
+
+
+# -----------------------------------------------------------
+# span
+# -----------------------------------------------------------
+class Span:
+    __slots__ = ("context", "parent_id", "name", "attrs", "start", "_start_perf", "_token")
+
+    def __init__(self, name, parent=None, attrs=None):
+        if parent is None:
+            parent = _current.get()
+        if parent is None:
+            self.context = SpanContext(_new_id(16), _new_id(8), random.random() < TRACE_SAMPLE_RATE)
+            self.parent_id = None
+        else:
+            self.context = SpanContext(parent.trace_id, _new_id(8), parent.sampled)
+            self.parent_id = parent.span_id
+        self.name = name
+        self.attrs = dict(attrs or {})
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self._token = _current.set(self.context)
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def end(self):
+        duration = time.perf_counter() - self._start_perf
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # 다른 컨텍스트에서 끝나는 경우 (스트리밍 응답 등)
+            pass
+        if _exporter is not None and self.context.sampled:
+            _exporter.export({
+                "trace_id": self.context.trace_id,
+                "span_id": self.context.span_id,
+                "parent_id": self.parent_id,
+                "service": SERVICE_NAME,
+                "name": self.name,
+                "start": round(self.start, 6),
+                "duration_ms": round(duration * 1000, 3),
+                "attrs": self.attrs,
+            })
+
+
+@contextlib.contextmanager
+def start_span(name, parent=None, **attrs):
+    span = Span(name, parent, attrs)
+    try:
+        yield span
+    except BaseException as e:
+        span.set(error=type(e).__name__)
+        raise
+    finally:
+        span.end()
+
+
+# -----------------------------------------------------------
+# 프레임워크 연동 (들어온 traceparent 를 부모로 서버 span 시작)
+# -----------------------------------------------------------
+def init_flask(app, service):
+    from flask import g, request
+
+    global SERVICE_NAME
+    SERVICE_NAME = SERVICE_NAME or service
+
+    @app.before_request
+    def _trace_start():
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        g._trace_span = Span(f"{request.method} {route}", parse_traceparent(request.headers.get("traceparent")))
+
+    @app.after_request
+    def _trace_status(response):
+        span = g.get("_trace_span")
+        if span is not None:
+            span.set(status=response.status_code)
+            response.headers["traceparent"] = span.context.traceparent()
+        return response
+
+    @app.teardown_request
+    def _trace_end(exc):
+        span = g.pop("_trace_span", None)
+        if span is not None:
+            if exc is not None:
+                span.set(error=type(exc).__name__)
+            span.end()
+
+
+def init_fastapi(app, service):
+    global SERVICE_NAME
+    SERVICE_NAME = SERVICE_NAME or service
+
+    @app.middleware("http")
+    async def _trace_middleware(request, call_next):
+        span = Span(f"{request.method} {request.url.path}", parse_traceparent(request.headers.get("traceparent")))
+        try:
+            response = await call_next(request)
+            route = request.scope.get("route")
+            span.name = f"{request.method} {getattr(route, 'path', request.url.path)}"
+            span.set(status=response.status_code)
+            response.headers["traceparent"] = span.context.traceparent()
+            return response
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.end()
+
+
+# -----------------------------------------------------------
+# CLI: 내보낸 파일에서 trace 재구성
+# -----------------------------------------------------------
+def _load(paths):
+    traces = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    traces.setdefault(record["trace_id"], []).append(record)
+    return traces
+
+
+def _print_tree(spans):
+    by_parent = {}
+    ids = {s["span_id"] for s in spans}
+    for s in spans:
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        by_parent.setdefault(parent, []).append(s)
+    t0 = min(s["start"] for s in spans)
+
+    def walk(parent, depth):
+        for s in sorted(by_parent.get(parent, []), key=lambda s: s["start"]):
+            offset = (s["start"] - t0) * 1000
+            attrs = " ".join(f"{k}={v}" for k, v in s["attrs"].items())
+            print(f"{'  ' * depth}+{offset:8.1f}ms {s['duration_ms']:9.1f}ms  [{s['service']}] {s['name']} {attrs}")
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--trace")
+    parser.add_argument("--slowest", type=int, default=10)
+    args = parser.parse_args()
+
+    traces = _load(args.files)
+    if args.trace:
+        if not traces.get(args.trace):
+            print(f"trace not found: {args.trace}", file=sys.stderr)
+            sys.exit(1)
+        _print_tree(traces[args.trace])
+    else:
+        def total(spans):
+            return max(s["start"] * 1000 + s["duration_ms"] for s in spans) - min(s["start"] for s in spans) * 1000
+
+        for trace_id, spans in sorted(traces.items(), key=lambda kv: total(kv[1]), reverse=True)[:args.slowest]:
+            root = min(spans, key=lambda s: s["start"])
+            print(f"{trace_id} {total(spans):9.1f}ms {len(spans):3d} spans  {root['service']} {root['name']}")